@@ -0,0 +1,109 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from craw_data.address_parser import parse_location, classify_part
+
+# Benchmark parse_location: bản quét token cũ vs bản compiled + memo
+
+
+# ------------------ BẢN CŨ (baseline) ------------------
+def parse_location_scan(address):
+    """Tách địa chỉ thành Đường, Phường, Quận, Thành phố"""
+    ward = ''
+    district = ''
+    city = ''
+    street = ''
+
+    parts = [p.strip() for p in address.split(',') if p.strip()]
+    parts_lower = [p.lower() for p in parts]
+
+    ward_tokens = ['phường', 'p.', 'phuong', 'xã', 'xa']
+    district_tokens = ['quận', 'q.', 'quan', 'huyện', 'h.']
+    street_tokens = ['đường', 'duong', 'đ.', 'đường số', 'đường vào', 'đường lớn', 'đường nhỏ']
+    city_tokens = ['thành phố', 'tp', 'tp.', 'thanh pho', 'tp hcm', 'hồ chí minh', 'ho chi minh']
+
+    for i, p in enumerate(parts):
+        low = parts_lower[i]
+        if any(tok in low for tok in city_tokens):
+            city = p
+            continue
+        if any(tok in low for tok in district_tokens):
+            district = p
+            continue
+        if any(tok in low for tok in ward_tokens):
+            ward = p
+            continue
+        if any(tok in low for tok in street_tokens):
+            street = p
+            continue
+
+    if not city:
+        city = "Hồ Chí Minh"
+
+    # Nếu thiếu phường/quận thì lấy theo thứ tự từ cuối
+    if not district or not ward:
+        candidates = [p for p in parts if p and p != city]
+        if len(candidates) >= 1 and not district:
+            district = candidates[-1]
+        if len(candidates) >= 2 and not ward:
+            ward = candidates[-2]
+
+    # Nếu chưa có đường thì lấy phần đầu
+    if not street:
+        if parts:
+            first = parts[0]
+            if first not in (ward, district, city):
+                street = first
+
+    # Xử lý trùng lặp
+    if ward == district:
+        ward = ''
+
+    ward = ward.strip() if ward else ''
+    district = district.strip() if district else ''
+    city = city.strip() if city else 'Hồ Chí Minh'
+    street = street.strip() if street else ''
+
+    return street, ward, district, city
+
+
+# ------------------ CORPUS TỪ data/*.xlsx ------------------
+parser = argparse.ArgumentParser(description="Benchmark parse_location")
+parser.add_argument("--files", default=os.path.join(ROOT_DIR, "data", "bds_*.xlsx"))
+parser.add_argument("--size", type=int, default=200_000, help="Số địa chỉ trong corpus")
+args = parser.parse_args()
+
+addresses = []
+for path in sorted(glob.glob(args.files)):
+    df = pd.read_excel(path, engine="openpyxl")
+    col = "Địa chỉ" if "Địa chỉ" in df.columns else df.columns[0]
+    addresses.extend(a for a in df[col].dropna().astype(str) if a != "N/A")
+if not addresses:
+    raise SystemExit(f"Không có địa chỉ nào trong {args.files}")
+
+unique = len(set(addresses))
+corpus = (addresses * (args.size // len(addresses) + 1))[:args.size]
+print(f"Corpus: {len(corpus)} địa chỉ ({unique} địa chỉ khác nhau từ {args.files})")
+
+start = time.perf_counter()
+expected = [parse_location_scan(a) for a in corpus]
+scan_time = time.perf_counter() - start
+
+parse_location.cache_clear()
+classify_part.cache_clear()
+start = time.perf_counter()
+actual = [parse_location(a) for a in corpus]
+compiled_time = time.perf_counter() - start
+
+mismatches = sum(1 for e, a in zip(expected, actual) if e != a)
+print(f"Quét token : {len(corpus) / scan_time:,.0f} địa chỉ/s ({scan_time:.2f}s)")
+print(f"Compiled   : {len(corpus) / compiled_time:,.0f} địa chỉ/s ({compiled_time:.2f}s) — {parse_location.cache_info()}")
+print(f"Tăng tốc x{scan_time / compiled_time:.1f}, số kết quả khác nhau: {mismatches}")
+sys.exit(1 if mismatches else 0)
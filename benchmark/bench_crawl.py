@@ -0,0 +1,98 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from multiprocessing import Process, Queue
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from benchmark.replay_server import start_server, add_server_args, server_options
+
+# Benchmark end-to-end crawler trên replay server cục bộ (không gọi alonhadat thật)
+parser = argparse.ArgumentParser(description="Benchmark crawl_all / crawl_all_concurrent")
+parser.add_argument("--pages", type=int, default=20, help="Số trang crawl (trang cuối rỗng)")
+parser.add_argument("--delay", type=float, default=1.5, help="delay của crawl_all tuần tự")
+parser.add_argument("--workers", type=int, default=8)
+parser.add_argument("--rate", type=float, default=10.0)
+parser.add_argument("--modes", default="serial,concurrent", help="Các chế độ cần đo, cách nhau bởi dấu phẩy")
+parser.add_argument("--cache", action="store_true", help="Bật HTTP cache (mặc định tắt để đo đúng tải mạng)")
+parser.add_argument("--runs", type=int, default=1, help="Số lần chạy mỗi chế độ (lần sau dùng lại cache nếu bật)")
+add_server_args(parser)
+args = parser.parse_args()
+
+# Phải set trước khi import crawler vì http_client đọc biến môi trường lúc import
+if args.cache:
+    os.environ["CRAWL_CACHE_DIR"] = tempfile.mkdtemp(prefix="crawl_cache_")
+else:
+    os.environ["CRAWL_CACHE"] = "off"
+
+import craw_data.stagging as stagging
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[idx]
+
+
+def run_mode(mode, base_url, queue):
+    latencies = []
+    original = stagging.crawl_page
+
+    def timed_crawl_page(*a, **kw):
+        start = time.perf_counter()
+        try:
+            return original(*a, **kw)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    stagging.crawl_page = timed_crawl_page
+    start = time.perf_counter()
+    if mode == "serial":
+        props = stagging.crawl_all(pages=args.pages, delay=args.delay, base_url=base_url)
+    else:
+        props = stagging.crawl_all_concurrent(pages=args.pages, max_workers=args.workers,
+                                              rate=args.rate, burst=args.workers, base_url=base_url)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss trên Linux tính bằng KB
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put({
+        "mode": mode, "elapsed": elapsed, "pages": len(latencies), "listings": len(props),
+        "keys": [p["Key"] for p in props], "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99), "rss": peak_rss_mb,
+    })
+
+
+if __name__ == "__main__":
+    server, base_url = start_server(max_pages=args.pages - 1, latency=args.latency,
+                                    items=args.items, **server_options(args))
+
+    results = []
+    for mode in args.modes.split(","):
+        for run in range(args.runs):
+            # Mỗi lần chạy 1 process riêng để peak RSS không bị cộng dồn
+            queue = Queue()
+            proc = Process(target=run_mode, args=(mode.strip(), base_url, queue))
+            proc.start()
+            result = queue.get()
+            proc.join()
+            result["run"] = run + 1
+            results.append(result)
+
+    server.shutdown()
+
+    print("=" * 86)
+    print(f"{'mode':<12}{'run':>4}{'time(s)':>9}{'pages/s':>9}{'tin/s':>9}"
+          f"{'p50(ms)':>10}{'p99(ms)':>10}{'RSS(MB)':>10}{'tin':>7}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['run']:>4}{r['elapsed']:>9.2f}{r['pages'] / r['elapsed']:>9.1f}"
+              f"{r['listings'] / r['elapsed']:>9.1f}{r['p50'] * 1000:>10.0f}{r['p99'] * 1000:>10.0f}"
+              f"{r['rss']:>10.1f}{r['listings']:>7}")
+    print(f"Status từ server: {dict(server.state.status_counts)}")
+    same = all(r["keys"] == results[0]["keys"] for r in results)
+    print(f"Mọi chế độ cho cùng danh sách tin theo thứ tự trang: {same}")
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import mysql.connector
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from loadData.bulk_loader import insert_batches, load_data_infile
+
+# Benchmark load Property_Temp: từng dòng (cách cũ) vs INSERT theo lô vs LOAD DATA.
+# Ghi vào bảng nháp Property_Temp_bench (CREATE TABLE ... LIKE Property_Temp) trên DB staging.
+parser = argparse.ArgumentParser(description="Benchmark các cách load Property_Temp")
+parser.add_argument("--sizes", default="10000,100000,1000000", help="Số dòng, cách nhau bởi dấu phẩy")
+parser.add_argument("--batch-size", type=int, default=1000)
+parser.add_argument("--methods", default="row,insert,infile")
+parser.add_argument("--row-limit", type=int, default=10000,
+                    help="Cách từng dòng chỉ chạy trên tối đa N dòng rồi ngoại suy (1M dòng mất hàng giờ)")
+args = parser.parse_args()
+
+TABLE = "Property_Temp_bench"
+COLUMNS = ["key", "url", "create_date", "name", "price", "area", "old_address", "street", "ward",
+           "district", "city", "bedrooms", "floors", "street_width", "description", "posting_date",
+           "property_type"]
+DISTRICTS = ["Quận 1", "Quận 3", "Quận 7", "Bình Thạnh", "Gò Vấp", "Thủ Đức", "Tân Bình"]
+
+
+def synthetic_rows(n, seed=42):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        district = rnd.choice(DISTRICTS)
+        rows.append((
+            f"bench{i}", f"https://alonhadat.com.vn/nha-dat/can-ban/nha-{i}.html", "2025-11-20",
+            f"Bán nhà \"mặt tiền\" {district} số {i}", f"{rnd.randint(1, 300) / 10} tỷ",
+            f"{rnd.randint(20, 300)} m²", f"Đường {i % 97}, Phường {i % 20}, {district}, Hồ Chí Minh",
+            f"Đường {i % 97}", f"Phường {i % 20}", district, "Hồ Chí Minh",
+            str(rnd.randint(1, 6)), str(rnd.randint(1, 5)), f"{rnd.randint(3, 20)}m",
+            "Nhà đẹp, sổ hồng riêng,\nhẻm xe hơi." if i % 3 else None, "2025-11-19", "Nhà phố",
+        ))
+    return rows
+
+
+def load_row_by_row(conn, cursor, rows):
+    placeholders = ", ".join(["%s"] * len(COLUMNS))
+    sql = f"INSERT INTO {TABLE} ({', '.join(f'`{c}`' for c in COLUMNS)}) VALUES ({placeholders})"
+    for row in rows:
+        cursor.execute(sql, row)
+    conn.commit()
+
+
+def run(method, conn, cursor, rows):
+    cursor.execute(f"TRUNCATE TABLE {TABLE}")
+    start = time.perf_counter()
+    if method == "row":
+        load_row_by_row(conn, cursor, rows)
+    elif method == "insert":
+        insert_batches(conn, cursor, TABLE, COLUMNS, rows, args.batch_size)
+    else:
+        load_data_infile(conn, cursor, TABLE, COLUMNS, rows)
+    elapsed = time.perf_counter() - start
+    cursor.execute(f"SELECT COUNT(*) FROM {TABLE}")
+    loaded = cursor.fetchone()[0]
+    if loaded != len(rows):
+        raise RuntimeError(f"{method}: load {loaded}/{len(rows)} dòng")
+    return elapsed
+
+
+if __name__ == "__main__":
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        staging_cfg = json.load(f)["staging"]
+    conn = mysql.connector.connect(**staging_cfg, allow_local_infile=True)
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} LIKE Property_Temp")
+
+    results = []
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            rows = synthetic_rows(size)
+            for method in args.methods.split(","):
+                method = method.strip()
+                sample = rows[:args.row_limit] if method == "row" else rows
+                elapsed = run(method, conn, cursor, sample)
+                # Ngoại suy tuyến tính khi chỉ chạy trên 1 phần dữ liệu
+                estimated = elapsed * size / len(sample)
+                results.append((size, method, len(sample), estimated))
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.close()
+        conn.close()
+
+    print("=" * 60)
+    print(f"{'số dòng':>10}{'cách':>8}{'đã chạy':>10}{'time(s)':>12}{'dòng/s':>14}")
+    for size, method, ran, elapsed in results:
+        mark = "*" if ran < size else " "
+        print(f"{size:>10}{method:>8}{ran:>10}{elapsed:>11.2f}{mark}{size / elapsed:>14,.0f}")
+    print("* = ngoại suy từ số dòng đã chạy")
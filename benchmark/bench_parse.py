@@ -0,0 +1,55 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from benchmark.replay_server import make_listing_page
+from craw_data.listing_parser import BACKENDS, parse_listing_html
+
+# Micro-benchmark parse trang danh sách: so sánh tốc độ + kiểm tra các backend ra cùng record
+parser = argparse.ArgumentParser(description="Benchmark các parser backend của crawler")
+parser.add_argument("--fixtures", default=os.path.join(ROOT_DIR, "benchmark", "fixtures", "*.html"),
+                    help="Glob các trang HTML đã lưu từ alonhadat")
+parser.add_argument("--repeat", type=int, default=20)
+parser.add_argument("--min-speedup", type=float, default=None,
+                    help="Thoát với mã lỗi nếu lxml không nhanh hơn bs4 ít nhất chừng này lần")
+args = parser.parse_args()
+
+pages = []
+for path in sorted(glob.glob(args.fixtures)):
+    with open(path, "r", encoding="utf-8") as f:
+        pages.append(f.read())
+if not pages:
+    print("Không tìm thấy fixture, dùng trang giả lập của replay server.")
+    pages = [make_listing_page(i) for i in range(1, 11)]
+
+timings = {}
+outputs = {}
+for backend in BACKENDS:
+    outputs[backend] = [parse_listing_html(html, backend) for html in pages]
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for html in pages:
+            parse_listing_html(html, backend)
+    timings[backend] = time.perf_counter() - start
+
+total_pages = len(pages) * args.repeat
+listings = sum(len(r) for r in outputs["bs4"])
+print(f"{len(pages)} trang, {listings} tin, lặp {args.repeat} lần")
+for backend, elapsed in timings.items():
+    print(f"  {backend:5s}: {elapsed:.3f}s — {total_pages / elapsed:.1f} trang/s")
+
+exit_code = 0
+if "lxml" in timings:
+    same = outputs["lxml"] == outputs["bs4"]
+    speedup = timings["bs4"] / timings["lxml"]
+    print(f"lxml nhanh hơn x{speedup:.1f} — record giống hệt bs4: {same}")
+    if not same:
+        exit_code = 1
+    if args.min_speedup and speedup < args.min_speedup:
+        print(f"Speedup thấp hơn ngưỡng {args.min_speedup}")
+        exit_code = 1
+sys.exit(exit_code)
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import mysql.connector
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from loadData.bulk_loader import insert_batches
+from loadData.scd2_merge import FACT_COLUMNS, TRACKED_COLUMNS, hashdiff_sql
+
+# Benchmark tra bản hiện hành (SCD2) trên PropertyListing ở 100k / 1M dòng lịch sử:
+# - cũ: không index, SELECT * WHERE `key` AND isCurrent rồi so 11 cột trong Python
+# - mới: hashdiff + index (`key`, isCurrent, hashdiff), chỉ đọc sk + hashdiff từ index
+# Ghi vào 2 bảng nháp trên DB datawarehouse, xóa khi chạy xong.
+parser = argparse.ArgumentParser(description="Benchmark tra bản hiện hành PropertyListing")
+parser.add_argument("--sizes", default="100000,1000000", help="Số dòng lịch sử, cách nhau bởi dấu phẩy")
+parser.add_argument("--versions", type=int, default=4, help="Số phiên bản mỗi key (1 hiện hành)")
+parser.add_argument("--lookups", type=int, default=200, help="Số key tra từng cái một")
+parser.add_argument("--batch-keys", type=int, default=10000, help="Số key trong lô set-based")
+args = parser.parse_args()
+
+OLD_TABLE = "PropertyListing_bench_old"
+NEW_TABLE = "PropertyListing_bench"
+COLUMNS = FACT_COLUMNS + ["startDay", "endDay", "isCurrent"]
+
+
+def create_tables(cursor):
+    body = """
+        sk BIGINT AUTO_INCREMENT PRIMARY KEY,
+        `key` VARCHAR(100), url TEXT, create_date DATE, name VARCHAR(255),
+        price DOUBLE, area DOUBLE, bedrooms INT, floors INT, description TEXT,
+        street_width VARCHAR(255), property_type_id INT, location_id INT, date_id INT,
+        startDay DATE NOT NULL, endDay DATE DEFAULT NULL, isCurrent TINYINT(1) DEFAULT 1
+    """
+    for table in (OLD_TABLE, NEW_TABLE):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(f"CREATE TABLE {OLD_TABLE} ({body}) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4")
+    cursor.execute(f"""
+        CREATE TABLE {NEW_TABLE} ({body},
+            hashdiff CHAR(40) AS ({hashdiff_sql()}) STORED,
+            INDEX idx_listing_current (`key`, isCurrent, hashdiff)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+def synthetic_history(n, versions, seed=42):
+    rnd = random.Random(seed)
+    rows = []
+    keys = max(1, n // versions)
+    for i in range(n):
+        key_no, version = i % keys, i // keys
+        is_current = version == (n - 1 - key_no) // keys
+        rows.append((
+            f"bench{key_no}", f"https://alonhadat.com.vn/nha-dat/can-ban/nha-{key_no}.html", "2025-11-20",
+            f"Bán nhà số {key_no}", rnd.randint(1, 300) * 100_000_000.0, float(rnd.randint(20, 300)),
+            rnd.randint(1, 6), rnd.randint(1, 5), "Nhà đẹp, sổ hồng riêng." if i % 3 else None,
+            f"{rnd.randint(3, 20)}m", rnd.randint(1, 5), rnd.randint(1, 5000), rnd.randint(1, 365),
+            "2025-01-01", None if is_current else "2025-06-01", 1 if is_current else 0,
+        ))
+    return rows, keys
+
+
+def lookup_old(cursor, keys):
+    start = time.perf_counter()
+    for key in keys:
+        cursor.execute(f"SELECT * FROM {OLD_TABLE} WHERE `key`=%s AND isCurrent=1", (key,))
+        cursor.fetchall()
+    return (time.perf_counter() - start) / len(keys)
+
+def lookup_new(cursor, keys):
+    start = time.perf_counter()
+    for key in keys:
+        cursor.execute(f"SELECT sk, hashdiff FROM {NEW_TABLE} WHERE `key`=%s AND isCurrent=1", (key,))
+        cursor.fetchall()
+    return (time.perf_counter() - start) / len(keys)
+
+def lookup_batch(cursor, keys):
+    """Tra + so hashdiff cho cả lô key bằng 1 câu JOIN (như merge_set)"""
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS bench_keys")
+    cursor.execute("CREATE TEMPORARY TABLE bench_keys (`key` VARCHAR(100) PRIMARY KEY, hashdiff CHAR(40))")
+    cursor.executemany("INSERT INTO bench_keys (`key`, hashdiff) VALUES (%s, SHA1(%s))",
+                       [(k, k) for k in keys])
+    start = time.perf_counter()
+    cursor.execute(f"""
+        SELECT COUNT(p.sk), SUM(NOT (p.hashdiff <=> b.hashdiff))
+        FROM bench_keys b LEFT JOIN {NEW_TABLE} p ON p.`key` = b.`key` AND p.isCurrent = 1
+    """)
+    cursor.fetchall()
+    elapsed = time.perf_counter() - start
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS bench_keys")
+    return elapsed
+
+def explain(cursor, table, columns):
+    cursor.execute(f"EXPLAIN SELECT {columns} FROM {table} WHERE `key`='bench1' AND isCurrent=1")
+    names = [d[0] for d in cursor.description]
+    row = dict(zip(names, cursor.fetchone()))
+    cursor.fetchall()
+    return f"type={row['type']}, key={row['key']}, rows={row['rows']}, extra={row['Extra']}"
+
+
+if __name__ == "__main__":
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        dw_cfg = json.load(f)["datawarehouse"]
+    conn = mysql.connector.connect(**dw_cfg)
+    cursor = conn.cursor()
+    print(f"Cột so sánh ({len(TRACKED_COLUMNS)}): {', '.join(TRACKED_COLUMNS)}")
+
+    results = []
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            create_tables(cursor)
+            rows, key_count = synthetic_history(size, args.versions)
+            for table in (OLD_TABLE, NEW_TABLE):
+                insert_batches(conn, cursor, table, COLUMNS, rows, label=f"{table} ({size})")
+                cursor.execute(f"ANALYZE TABLE {table}")
+                cursor.fetchall()
+            del rows
+
+            rnd = random.Random(size)
+            sample = [f"bench{rnd.randrange(key_count)}" for _ in range(args.lookups)]
+            batch = [f"bench{rnd.randrange(key_count)}" for _ in range(min(args.batch_keys, key_count))]
+            print(f"[{size}] cũ : {explain(cursor, OLD_TABLE, '*')}")
+            print(f"[{size}] mới: {explain(cursor, NEW_TABLE, 'sk, hashdiff')}")
+            results.append((size, lookup_old(cursor, sample), lookup_new(cursor, sample),
+                            len(set(batch)), lookup_batch(cursor, sorted(set(batch)))))
+    finally:
+        for table in (OLD_TABLE, NEW_TABLE):
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.close()
+        conn.close()
+
+    print("=" * 72)
+    print(f"{'dòng lịch sử':>13}{'cũ ms/key':>12}{'mới ms/key':>12}{'x':>8}{'lô key':>9}{'lô (s)':>10}{'µs/key':>10}")
+    for size, old, new, batch_keys, batch in results:
+        print(f"{size:>13}{old * 1000:>12.3f}{new * 1000:>12.3f}{old / new:>8.1f}"
+              f"{batch_keys:>9}{batch:>10.3f}{batch / batch_keys * 1e6:>10.1f}")
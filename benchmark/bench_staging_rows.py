@@ -0,0 +1,93 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from loadData.staging_rows import build_property_rows, parse_date, clean_text
+
+# Benchmark + đối chiếu: dựng tham số Property_Temp theo cột vs iterrows + parse_date 2 lần (cách cũ)
+parser = argparse.ArgumentParser(description="So sánh build_property_rows với vòng lặp iterrows cũ")
+parser.add_argument("--files", default="data/bds_*.xlsx")
+parser.add_argument("--repeat", type=int, default=20, help="Nhân bản dữ liệu để đo trên tập lớn hơn")
+args = parser.parse_args()
+
+DATA_DATE = "2025-11-25"
+
+
+# ------------------ BẢN CŨ (baseline) ------------------
+def build_rows_iterrows(df, data_date):
+    df = df.copy()
+    bedroom_col = next((c for c in df.columns if "PN" in c or "Phòng ngủ" in c), "PN")
+    area_col = next((c for c in df.columns if "DT" in c or "Diện tích" in c), "DT")
+    if 'Ngày đăng' in df.columns:
+        df['Ngày đăng'] = df['Ngày đăng'].apply(parse_date)
+    if 'Ngày cào' in df.columns:
+        df['Ngày cào'] = df['Ngày cào'].apply(parse_date)
+    rows = []
+    for _, row in df.iterrows():
+        rows.append((
+            clean_text(row.get('Key')),
+            clean_text(row.get('URL')),
+            parse_date(row.get('Ngày cào')),
+            clean_text(row.get('Tên')),
+            clean_text(row.get('Giá')),
+            clean_text(row.get(area_col)),
+            clean_text(row.get('Địa chỉ')),
+            clean_text(row.get('Đường')) if 'Đường' in df.columns else 'N/A',
+            clean_text(row.get('Phường')),
+            clean_text(row.get('Quận')),
+            clean_text(row.get('Thành phố', 'Hồ Chí Minh')),
+            clean_text(row.get(bedroom_col)),
+            clean_text(row.get('Tầng')),
+            clean_text(row.get('Lộ giới')),
+            clean_text(row.get('Mô tả')),
+            parse_date(row.get('Ngày đăng')),
+            clean_text(row.get('Loại nhà', 'Khác')),
+            data_date,
+        ))
+    return rows
+
+
+def edge_cases():
+    """Các giá trị khó: rỗng, 'nan', khoảng trắng, số, datetime có/không múi giờ, chuỗi có múi giờ"""
+    return pd.DataFrame({
+        "Key": ["a", None, np.nan, "  ", " nan ", 12, 3.5, "x"],
+        "Tên": ["Nhà ", "NaN", "", None, "b", "c", "d", "e"],
+        "Ngày đăng": ["2025-11-20", "N/A", None, "2025-11-20 23:30:00", "2025-02-30",
+                      datetime(2025, 11, 20, 1, 0), datetime(2025, 11, 20, 20, 0, tzinfo=timezone.utc),
+                      "hôm nay"],
+        "Ngày cào": ["2025-11-20"] * 7 + ["2025-11-21T02:00:00+07:00"],
+        "Phòng ngủ": [3, np.nan, 2, 1, 4, 5, 6, 7],
+    })
+
+
+if __name__ == "__main__":
+    frames = [pd.read_excel(p, engine="openpyxl") for p in sorted(glob.glob(args.files))]
+    if not frames:
+        raise SystemExit(f"Không tìm thấy file nào khớp {args.files}")
+
+    mismatches = 0
+    for df in frames + [edge_cases()]:
+        df.columns = df.columns.str.strip()
+        if build_property_rows(df, DATA_DATE) != build_rows_iterrows(df, DATA_DATE):
+            mismatches += 1
+    print(f"Khác biệt so với cách cũ: {mismatches} / {len(frames) + 1} bảng")
+    if mismatches:
+        # Kết quả sai thì số đo tốc độ không còn ý nghĩa
+        sys.exit(1)
+
+    big = pd.concat(frames * args.repeat, ignore_index=True)
+    big.columns = big.columns.str.strip()
+    print(f"Đo trên {len(big)} dòng")
+    for name, fn in (("iterrows", build_rows_iterrows), ("theo cột", build_property_rows)):
+        start = time.perf_counter()
+        fn(big, DATA_DATE)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<10}{elapsed:>8.2f}s {len(big) / elapsed:>12,.0f} dòng/s")
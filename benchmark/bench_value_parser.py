@@ -0,0 +1,108 @@
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from transform.value_parser import (parse_price, parse_area, parse_int_from_str,
+                                    parse_prices, parse_areas, parse_ints,
+                                    clear_caches, format_cache_stats)
+from loadData.xlsx_reader import iter_xlsx_batches
+from loadData.staging_rows import PROPERTY_TEMP_COLUMNS, build_property_rows
+
+# Benchmark chuẩn hóa giá / diện tích / số nguyên trên các snapshot thật trong data/:
+# bản cũ (re.findall mỗi lần) vs bản memo từng giá trị vs bản theo lô.
+parser = argparse.ArgumentParser(description="Benchmark transform/value_parser.py")
+parser.add_argument("--files", default="data/bds_*.xlsx")
+parser.add_argument("--repeat", type=int, default=50, help="Nhân bản dữ liệu (mô phỏng nhiều ngày)")
+args = parser.parse_args()
+
+
+# ------------------ BẢN CŨ (baseline) ------------------
+def parse_price_old(price_str):
+    if not price_str:
+        return 0.0
+    price_str = price_str.lower().replace(',', '.').strip()
+    try:
+        if "triệu" in price_str:
+            number = float(re.findall(r"\d+\.?\d*", price_str)[0])
+            return number * 1_000_000
+        elif "tỷ" in price_str:
+            number = float(re.findall(r"\d+\.?\d*", price_str)[0])
+            return number * 1_000_000_000
+        else:
+            cleaned = "".join(c for c in price_str if c.isdigit() or c == ".")
+            return float(cleaned)
+    except:
+        return 0.0
+
+def parse_area_old(area_str):
+    if not area_str:
+        return 0.0
+    area_str = area_str.lower().replace(",", ".").strip()
+    try:
+        return float(re.findall(r"\d+\.?\d*", area_str)[0])
+    except:
+        return 0.0
+
+def parse_int_old(value_str):
+    if not value_str:
+        return 0
+    match = re.search(r"\d+", value_str)
+    return int(match.group()) if match else 0
+
+
+def load_columns():
+    """Chuỗi price/area/bedrooms/floors đúng như trong Property_Temp"""
+    idx = {c: PROPERTY_TEMP_COLUMNS.index(c) for c in ("price", "area", "bedrooms", "floors")}
+    cols = {c: [] for c in idx}
+    for path in sorted(glob.glob(args.files)):
+        for df in iter_xlsx_batches(path):
+            df.columns = df.columns.str.strip()
+            for row in build_property_rows(df, None):
+                for c, i in idx.items():
+                    cols[c].append(row[i])
+    return cols
+
+def run_rows(cols, price, area, to_int):
+    return ([price(v) for v in cols["price"]], [area(v) for v in cols["area"]],
+            [to_int(v) for v in cols["bedrooms"]], [to_int(v) for v in cols["floors"]])
+
+def run_batch(cols):
+    return (parse_prices(cols["price"]), parse_areas(cols["area"]),
+            parse_ints(cols["bedrooms"]), parse_ints(cols["floors"]))
+
+
+if __name__ == "__main__":
+    base = load_columns()
+    if not base["price"]:
+        raise SystemExit(f"Không tìm thấy dữ liệu trong {args.files}")
+    cols = {c: values * args.repeat for c, values in base.items()}
+    n = len(cols["price"])
+    distinct = {c: len(set(v)) for c, v in base.items()}
+    print(f"{n} dòng ({len(base['price'])} dòng gốc x {args.repeat}), giá trị khác nhau: {distinct}")
+
+    results = {}
+    timings = []
+    for name, fn in (
+        ("cũ", lambda: run_rows(cols, parse_price_old, parse_area_old, parse_int_old)),
+        ("memo", lambda: run_rows(cols, parse_price, parse_area, parse_int_from_str)),
+        ("theo lô", lambda: run_batch(cols)),
+    ):
+        clear_caches()
+        start = time.perf_counter()
+        results[name] = fn()
+        elapsed = time.perf_counter() - start
+        timings.append((name, elapsed))
+        if name == "memo":
+            print(f"Cache sau bản memo: {format_cache_stats()}")
+
+    print("=" * 48)
+    baseline = timings[0][1]
+    for name, elapsed in timings:
+        print(f"{name:<10}{elapsed:>9.3f}s {n * 4 / elapsed:>14,.0f} giá trị/s  x{baseline / elapsed:.1f}")
+    same = all(list(map(list, r)) == list(map(list, results["cũ"])) for r in results.values())
+    print(f"Kết quả giống bản cũ: {same}")
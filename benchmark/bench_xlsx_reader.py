@@ -0,0 +1,77 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from multiprocessing import Process, Queue
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from loadData.xlsx_reader import iter_xlsx_batches
+from loadData.staging_rows import build_property_rows
+
+# Benchmark đọc file Excel: pd.read_excel cả file vs iter_xlsx_batches từng lô.
+# Đo thời gian tới lô đầu tiên, tổng thời gian và peak RSS (mỗi cách 1 process riêng).
+parser = argparse.ArgumentParser(description="So sánh pd.read_excel với đọc xlsx theo lô")
+parser.add_argument("--source", default="data/bds_25_11_2025.xlsx")
+parser.add_argument("--sizes", default="10000,100000", help="Số dòng file thử, nhân bản từ --source")
+parser.add_argument("--chunk-size", type=int, default=5000)
+args = parser.parse_args()
+
+
+def make_workbook(rows):
+    src = pd.read_excel(args.source, engine="openpyxl", dtype=object)
+    big = pd.concat([src] * (rows // len(src) + 1), ignore_index=True).head(rows)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_xlsx_"), f"bds_{rows}.xlsx")
+    big.to_excel(path, index=False)
+    return path
+
+
+def run(mode, path, queue):
+    start = time.perf_counter()
+    first = None
+    rows = []
+    if mode == "read_excel":
+        df = pd.read_excel(path, engine="openpyxl")
+        df.columns = df.columns.str.strip()
+        first = time.perf_counter() - start
+        rows = build_property_rows(df, "2025-11-25")
+        total = len(rows)
+    else:
+        total = 0
+        for df in iter_xlsx_batches(path, args.chunk_size):
+            df.columns = df.columns.str.strip()
+            batch = build_property_rows(df, "2025-11-25")
+            if first is None:
+                first = time.perf_counter() - start
+            # Loader thật insert xong là bỏ lô, ở đây cũng không giữ lại
+            total += len(batch)
+    queue.put({
+        "mode": mode, "rows": total, "first": first or 0.0,
+        "elapsed": time.perf_counter() - start,
+        "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+
+if __name__ == "__main__":
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        path = make_workbook(size)
+        for mode in ("read_excel", "stream"):
+            queue = Queue()
+            proc = Process(target=run, args=(mode, path, queue))
+            proc.start()
+            result = queue.get()
+            proc.join()
+            result["size"] = size
+            results.append(result)
+        os.remove(path)
+
+    print("=" * 66)
+    print(f"{'số dòng':>10}{'cách':>12}{'lô đầu(s)':>12}{'tổng(s)':>10}{'RSS(MB)':>10}{'dòng':>10}")
+    for r in results:
+        print(f"{r['size']:>10}{r['mode']:>12}{r['first']:>12.2f}{r['elapsed']:>10.2f}"
+              f"{r['rss']:>10.1f}{r['rows']:>10}")
@@ -0,0 +1,35 @@
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from benchmark.replay_server import FIXTURE_DIR
+from craw_data.stagging import page_url, SITE_URL
+
+# Lưu các trang danh sách thật của alonhadat làm fixture cho replay server / bench_parse
+parser = argparse.ArgumentParser(description="Ghi trang alonhadat thành fixture HTML")
+parser.add_argument("--pages", type=int, default=5)
+parser.add_argument("--delay", type=float, default=1.5)
+parser.add_argument("--out", default=FIXTURE_DIR)
+args = parser.parse_args()
+
+os.makedirs(args.out, exist_ok=True)
+session = requests.Session()
+session.headers.update({"User-Agent": "Mozilla/5.0"})
+
+for page in range(1, args.pages + 1):
+    url = page_url(page, SITE_URL)
+    resp = session.get(url, timeout=30)
+    resp.encoding = "utf-8"
+    if resp.status_code != 200:
+        print(f"Không lấy được trang {page} — status: {resp.status_code}")
+        break
+    path = os.path.join(args.out, f"trang-{page}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(resp.text)
+    print(f"Đã lưu {path} ({len(resp.text):,} ký tự)")
+    time.sleep(args.delay)
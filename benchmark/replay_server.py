@@ -0,0 +1,201 @@
+import argparse
+import glob
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Server giả lập alonhadat.com.vn để benchmark crawler mà không gọi trang thật
+LIST_PATH = "/can-ban-nha-dat/ho-chi-minh"
+PAGE_RE = re.compile(r"^/can-ban-nha-dat/ho-chi-minh(?:/trang-(\d+))?/?$")
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ITEM_TEMPLATE = """
+<article class="property-item">
+  <a href="/nha-pho-quan-{n}-ban-gap-{key}.html">
+    <h3 class="property-title">Bán nhà phố hẻm xe hơi số {key}</h3>
+  </a>
+  <span class="price"><span itemprop="price">{price} tỷ</span></span>
+  <span class="area"><span itemprop="value">{area}</span></span>
+  <p class="new-address"><span>Phường {ward}</span><span>Quận {n}</span><span>Hồ Chí Minh</span></p>
+  <p class="old-address"><span>Đường số {ward}</span><span>Phường {ward}</span><span>Quận {n}</span><span>Hồ Chí Minh</span></p>
+  <span class="bedroom"><span itemprop="value">{bedrooms}</span></span>
+  <span class="floors">{floors} tầng</span>
+  <span class="street-width">{width}m</span>
+  <p class="brief">Nhà mới xây, sổ hồng riêng, khu dân cư an ninh, gần chợ và trường học.<span class="view-detail">Xem chi tiết</span></p>
+  <time class="created-date" datetime="2025-11-{day:02d}T08:00:00"></time>
+</article>
+"""
+
+
+def make_listing_page(page_num, items=20):
+    """Sinh HTML 1 trang danh sách có cấu trúc giống alonhadat"""
+    articles = []
+    for i in range(items):
+        key = page_num * 1000 + i
+        articles.append(ITEM_TEMPLATE.format(
+            n=(key % 12) + 1, key=key, price=f"{(key % 90) / 10 + 1:.1f}".replace(".", ","),
+            area=40 + key % 80, ward=key % 20 + 1, bedrooms=key % 5 + 1,
+            floors=key % 4 + 1, width=key % 10 + 2, day=key % 28 + 1,
+        ))
+    return ("<html><body><section class=\"list-property-box\">"
+            + "".join(articles) + "</section></body></html>")
+
+
+def load_fixtures(pattern=os.path.join(FIXTURE_DIR, "*.html")):
+    """Trang thật đã ghi bằng record_fixtures.py, sắp theo số trang"""
+    def page_of(path):
+        m = re.search(r"(\d+)", os.path.basename(path))
+        return int(m.group(1)) if m else 0
+
+    pages = []
+    for path in sorted(glob.glob(pattern), key=page_of):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+# ------------------ GIỚI HẠN PHÍA SERVER (429) ------------------
+class Throttle:
+    def __init__(self, rps):
+        self.rps = rps
+        self._tokens = rps
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self):
+        if not self.rps:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rps, self._tokens + (now - self._last) * self.rps)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+def make_handler(server_state):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body=b"", headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            server_state.record(status)
+
+        def do_GET(self):
+            m = PAGE_RE.match(self.path)
+            if not m:
+                self._send(404)
+                return
+            page_num = int(m.group(1) or 1)
+
+            cfg = server_state
+            delay = cfg.latency + random.uniform(0, cfg.jitter)
+            time.sleep(delay)
+
+            if not cfg.throttle.allow():
+                self._send(429, b"Too Many Requests", {"Retry-After": str(cfg.retry_after)})
+                return
+            if cfg.error_rate and random.random() < cfg.error_rate:
+                self._send(503, b"Service Unavailable")
+                return
+
+            body = cfg.page_body(page_num).encode("utf-8")
+            headers = {"Content-Type": "text/html; charset=utf-8"}
+            if cfg.etag:
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                headers["ETag"] = etag
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, b"", {"ETag": etag})
+                    return
+            self._send(200, body, headers)
+
+        def log_message(self, *args):
+            pass
+
+    return ReplayHandler
+
+
+class ReplayState:
+    """Cấu hình + thống kê status code của replay server"""
+
+    def __init__(self, max_pages=50, latency=0.2, jitter=0.0, items=20, error_rate=0.0,
+                 throttle_rps=0.0, retry_after=1, etag=False, fixtures=None):
+        self.max_pages = max_pages
+        self.latency = latency
+        self.jitter = jitter
+        self.items = items
+        self.error_rate = error_rate
+        self.throttle = Throttle(throttle_rps)
+        self.retry_after = retry_after
+        self.etag = etag
+        self.fixtures = fixtures or []
+        self.status_counts = Counter()
+        self._lock = threading.Lock()
+
+    def page_body(self, page_num):
+        if page_num > self.max_pages:
+            return "<html><body></body></html>"
+        if self.fixtures:
+            return self.fixtures[(page_num - 1) % len(self.fixtures)]
+        return make_listing_page(page_num, self.items)
+
+    def record(self, status):
+        with self._lock:
+            self.status_counts[status] += 1
+
+
+def start_server(port=0, max_pages=50, latency=0.2, items=20, **options):
+    """Chạy server trong luồng nền, trả về (server, base_url); server.state chứa thống kê"""
+    state = ReplayState(max_pages=max_pages, latency=latency, items=items, **options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def add_server_args(parser):
+    parser.add_argument("--latency", type=float, default=0.2, help="Độ trễ mỗi request (giây)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Độ trễ ngẫu nhiên cộng thêm (giây)")
+    parser.add_argument("--items", type=int, default=20, help="Số tin mỗi trang (trang giả lập)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Tỉ lệ trả 503")
+    parser.add_argument("--throttle-rps", type=float, default=0.0, help="Quá số request/giây này thì trả 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--etag", action="store_true", help="Gửi ETag và trả 304 khi trang không đổi")
+    parser.add_argument("--fixtures", default=None, help="Glob fixture HTML (mặc định benchmark/fixtures/*.html)")
+
+
+def server_options(args):
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else load_fixtures()
+    return dict(jitter=args.jitter, error_rate=args.error_rate, throttle_rps=args.throttle_rps,
+                retry_after=args.retry_after, etag=args.etag, fixtures=fixtures)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay server cho crawler")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--pages", type=int, default=50, help="Số trang có dữ liệu")
+    add_server_args(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.pages, args.latency, args.items, **server_options(args))
+    source = f"{len(server.state.fixtures)} fixture" if server.state.fixtures else "trang giả lập"
+    print(f"Replay server chạy tại {base_url}{LIST_PATH} ({source})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"Status: {dict(server.state.status_counts)}")
@@ -0,0 +1,83 @@
+import re
+from functools import lru_cache
+
+WARD_TOKENS = ['phường', 'p.', 'phuong', 'xã', 'xa']
+DISTRICT_TOKENS = ['quận', 'q.', 'quan', 'huyện', 'h.']
+STREET_TOKENS = ['đường', 'duong', 'đ.', 'đường số', 'đường vào', 'đường lớn', 'đường nhỏ']
+CITY_TOKENS = ['thành phố', 'tp', 'tp.', 'thanh pho', 'tp hcm', 'hồ chí minh', 'ho chi minh']
+
+
+def _marker(name, tokens):
+    # Lookahead tùy chọn: group được set nếu có token xuất hiện ở bất kỳ đâu trong chuỗi
+    alternation = '|'.join(re.escape(t) for t in sorted(tokens, key=len, reverse=True))
+    return f"(?:(?=.*?(?P<{name}>{alternation})))?"
+
+# 1 pattern duy nhất, 1 lần match cho biết phần địa chỉ chứa loại token nào
+_MARKERS = re.compile(
+    _marker('city', CITY_TOKENS)
+    + _marker('district', DISTRICT_TOKENS)
+    + _marker('ward', WARD_TOKENS)
+    + _marker('street', STREET_TOKENS),
+    re.DOTALL,
+)
+
+
+@lru_cache(maxsize=1024)
+def classify_part(low):
+    """Loại của 1 phần địa chỉ (đã lowercase), theo thứ tự ưu tiên city > district > ward > street"""
+    m = _MARKERS.match(low)
+    for kind in ('city', 'district', 'ward', 'street'):
+        if m.group(kind) is not None:
+            return kind
+    return None
+
+
+@lru_cache(maxsize=65536)
+def parse_location(address):
+    """Tách địa chỉ thành Đường, Phường, Quận, Thành phố"""
+    ward = ''
+    district = ''
+    city = ''
+    street = ''
+
+    parts = [p.strip() for p in address.split(',') if p.strip()]
+
+    for p in parts:
+        kind = classify_part(p.lower())
+        if kind == 'city':
+            city = p
+        elif kind == 'district':
+            district = p
+        elif kind == 'ward':
+            ward = p
+        elif kind == 'street':
+            street = p
+
+    if not city:
+        city = "Hồ Chí Minh"
+
+    # Nếu thiếu phường/quận thì lấy theo thứ tự từ cuối
+    if not district or not ward:
+        candidates = [p for p in parts if p and p != city]
+        if len(candidates) >= 1 and not district:
+            district = candidates[-1]
+        if len(candidates) >= 2 and not ward:
+            ward = candidates[-2]
+
+    # Nếu chưa có đường thì lấy phần đầu
+    if not street:
+        if parts:
+            first = parts[0]
+            if first not in (ward, district, city):
+                street = first
+
+    # Xử lý trùng lặp
+    if ward == district:
+        ward = ''
+
+    ward = ward.strip() if ward else ''
+    district = district.strip() if district else ''
+    city = city.strip() if city else 'Hồ Chí Minh'
+    street = street.strip() if street else ''
+
+    return street, ward, district, city
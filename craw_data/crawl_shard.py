@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import socket
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from multiprocessing import Process
+from zoneinfo import ZoneInfo
+
+import mysql.connector
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from template.notification import send_error_email
+from template.control_log import get_control_log
+from craw_data.stagging import crawl_page
+from craw_data.snapshot_store import SnapshotWriter, snapshot_path, snapshot_exists, compact_snapshot
+from craw_data.fetch_controller import FetchController
+
+# Chạy gửi mail báo lỗi tại local
+env_path = os.path.join(os.path.dirname(__file__), '.env')
+load_dotenv(env_path)
+
+VN_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
+MAX_ATTEMPTS = 3
+
+# Crawl phân mảnh: mỗi worker (1 hoặc nhiều máy) nhận 1 dải trang qua bảng
+# crawl_lease trong control DB, ghi vào chung snapshot của data_date.
+# Yêu cầu: thư mục data/snapshots phải dùng chung giữa các máy (vd NFS).
+
+
+def connect_control():
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    conn = mysql.connector.connect(**cfg["control"])
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SET time_zone = '+07:00';")
+    return conn, cursor
+
+# ------------------ LEASE ------------------
+def plan_shards(conn, cursor, data_date, pages, shard_size):
+    """Tạo các dải trang cho data_date (INSERT IGNORE nên worker nào gọi cũng được)"""
+    rows = [(data_date, start, min(start + shard_size - 1, pages))
+            for start in range(1, pages + 1, shard_size)]
+    cursor.executemany("""
+        INSERT IGNORE INTO crawl_lease (data_date, page_start, page_end, status)
+        VALUES (%s, %s, %s, 'PENDING')
+    """, rows)
+    conn.commit()
+
+def claim_shard(conn, cursor, data_date, worker_id, lease_seconds):
+    """Lấy 1 dải còn trống hoặc đã hết hạn lease (worker cũ chết)"""
+    cursor.execute("""
+        SELECT lease_id, page_start, page_end FROM crawl_lease
+        WHERE data_date = %s AND attempts < %s
+          AND (status IN ('PENDING', 'FL') OR (status = 'RUNNING' AND lease_until < NOW()))
+        ORDER BY page_start
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    """, (data_date, MAX_ATTEMPTS))
+    shard = cursor.fetchone()
+    if not shard:
+        conn.commit()
+        return None
+    cursor.execute("""
+        UPDATE crawl_lease
+        SET status = 'RUNNING', worker_id = %s, attempts = attempts + 1,
+            lease_until = NOW() + INTERVAL %s SECOND, updated_at = NOW()
+        WHERE lease_id = %s
+    """, (worker_id, lease_seconds, shard["lease_id"]))
+    conn.commit()
+    return shard
+
+def renew_lease(conn, cursor, lease_id, worker_id, lease_seconds):
+    cursor.execute("""
+        UPDATE crawl_lease SET lease_until = NOW() + INTERVAL %s SECOND, updated_at = NOW()
+        WHERE lease_id = %s AND worker_id = %s
+    """, (lease_seconds, lease_id, worker_id))
+    conn.commit()
+
+def finish_shard(conn, cursor, lease_id, worker_id, status, row_count, process_id):
+    """False nếu lease đã hết hạn và bị worker khác nhận lại (không được ghi đè kết quả của họ)"""
+    cursor.execute("""
+        UPDATE crawl_lease SET status = %s, row_count = %s, process_id = %s, updated_at = NOW()
+        WHERE lease_id = %s AND worker_id = %s AND status = 'RUNNING'
+    """, (status, row_count, process_id, lease_id, worker_id))
+    conn.commit()
+    return cursor.rowcount > 0
+
+def skip_after(conn, cursor, data_date, page):
+    """Gặp trang rỗng → các dải phía sau chắc chắn rỗng, đánh dấu DONE luôn"""
+    cursor.execute("""
+        UPDATE crawl_lease SET status = 'DONE', updated_at = NOW()
+        WHERE data_date = %s AND page_start > %s AND status IN ('PENDING', 'FL')
+    """, (data_date, page))
+    conn.commit()
+
+# ------------------ GỘP SNAPSHOT ------------------
+@contextmanager
+def merge_lock(cursor, data_date):
+    """Chỉ 1 worker được chốt kết quả của data_date tại 1 thời điểm; yield False nếu chờ khóa quá lâu"""
+    cursor.execute("SELECT GET_LOCK(%s, 30) AS got", (f"crawl_merge_{data_date}",))
+    if not cursor.fetchone()["got"]:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (f"crawl_merge_{data_date}",))
+        cursor.fetchall()
+
+def merge_if_complete(conn, cursor, data_date):
+    """Dải cuối cùng xong thì compact snapshot và ghi file_log (ER) như stagging.py"""
+    with merge_lock(cursor, data_date) as locked:
+        if not locked:
+            return None
+        cursor.execute("""
+            SELECT COUNT(*) AS remaining FROM crawl_lease
+            WHERE data_date = %s AND status <> 'DONE'
+        """, (data_date,))
+        if cursor.fetchone()["remaining"] > 0:
+            conn.commit()
+            return None
+
+        row_count = compact_snapshot(data_date) if snapshot_exists(data_date) else 0
+        conn.commit()
+        file_path = snapshot_path(data_date)
+        file_id = get_control_log().upsert_file(file_path, data_date, row_count, 'ER')
+        print(f"Đã gộp snapshot {file_path}: {row_count} dòng (file_id={file_id})")
+        return file_id
+
+def abort_if_exhausted(conn, cursor, data_date):
+    """
+    Không còn dải nào nhận được nữa nhưng có dải đã lỗi/chết đủ MAX_ATTEMPTS lần →
+    snapshot của ngày không bao giờ gộp được. Đánh dấu các dải đó ABORTED rồi ghi
+    process_log FL + gửi mail 1 lần (worker nào chốt được thì báo), thay vì để dữ
+    liệu ngày đó âm thầm không vào file_log. Trả về danh sách dải bị bỏ.
+    """
+    with merge_lock(cursor, data_date) as locked:
+        if not locked:
+            return []
+        cursor.execute("""
+            SELECT
+                SUM(status = 'PENDING' OR (status IN ('FL', 'RUNNING') AND attempts < %s)
+                    OR (status = 'RUNNING' AND lease_until >= NOW())) AS remaining,
+                SUM(attempts >= %s AND (status = 'FL' OR (status = 'RUNNING' AND lease_until < NOW()))) AS exhausted
+            FROM crawl_lease WHERE data_date = %s
+        """, (MAX_ATTEMPTS, MAX_ATTEMPTS, data_date))
+        counts = cursor.fetchone()
+        if counts["remaining"] or not counts["exhausted"]:
+            conn.commit()
+            return []
+
+        cursor.execute("""
+            SELECT page_start, page_end FROM crawl_lease
+            WHERE data_date = %s AND status IN ('FL', 'RUNNING')
+            ORDER BY page_start
+        """, (data_date,))
+        shards = [f"{s['page_start']}-{s['page_end']}" for s in cursor.fetchall()]
+        cursor.execute("""
+            UPDATE crawl_lease SET status = 'ABORTED', updated_at = NOW()
+            WHERE data_date = %s AND status IN ('FL', 'RUNNING')
+        """, (data_date,))
+        conn.commit()
+
+    error = (f"Dải trang {', '.join(shards)} lỗi {MAX_ATTEMPTS} lần, snapshot {snapshot_path(data_date)} "
+             "không được gộp và không ghi file_log")
+    control_log = get_control_log()
+    process_id = control_log.start_process(f"Crawl Data [{data_date}]")
+    control_log.process_fail(process_id, error)
+    send_error_email("CRAWL ABORTED", error)
+    print(error)
+    return shards
+
+# ------------------ WORKER ------------------
+def crawl_shard(conn, cursor, shard, data_date, worker_id, lease_seconds, delay):
+    writer = SnapshotWriter(data_date)
+    # Trang lỗi hẳn sau retry → CrawlFailed → dải bị đánh dấu FL để worker khác lấy lại
+    controller = FetchController(delay=delay, concurrency=1, max_concurrency=1)
+    for page in range(shard["page_start"], shard["page_end"] + 1):
+        print(f"[{worker_id}] Đang crawl trang {page}...")
+        data = crawl_page(page, controller=controller)
+        if not data:
+            print(f"[{worker_id}] Trang {page} không có dữ liệu hoặc đã hết.")
+            skip_after(conn, cursor, data_date, page)
+            break
+        writer.write_page(page, data)
+        renew_lease(conn, cursor, shard["lease_id"], worker_id, lease_seconds)
+    return writer.rows_written
+
+def run_worker(worker_id, data_date, pages, shard_size, lease_seconds, delay):
+    conn, cursor = connect_control()
+    control_log = get_control_log()
+    try:
+        plan_shards(conn, cursor, data_date, pages, shard_size)
+        while True:
+            shard = claim_shard(conn, cursor, data_date, worker_id, lease_seconds)
+            if not shard:
+                break
+            name = f"Crawl Data [{data_date} trang {shard['page_start']}-{shard['page_end']}]"
+            process_id = control_log.start_process(name)
+            try:
+                rows = crawl_shard(conn, cursor, shard, data_date, worker_id, lease_seconds, delay)
+                if not finish_shard(conn, cursor, shard["lease_id"], worker_id, 'DONE', rows, process_id):
+                    raise RuntimeError("Mất lease (hết hạn và đã có worker khác nhận dải này)")
+                file_id = merge_if_complete(conn, cursor, data_date)
+                control_log.process_success(process_id, file_id, message=f"{rows} dòng")
+            except Exception as e:
+                conn.rollback()
+                finish_shard(conn, cursor, shard["lease_id"], worker_id, 'FL', 0, process_id)
+                control_log.process_fail(process_id, str(e))
+                send_error_email("CRAWL SHARD ERROR", f"{name}: {e}")
+                print(f"[{worker_id}] Lỗi dải trang {shard['page_start']}-{shard['page_end']}: {e}")
+        abort_if_exhausted(conn, cursor, data_date)
+        print(f"[{worker_id}] Không còn dải trang nào cho {data_date}.")
+    finally:
+        control_log.flush()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawler worker chia dải trang qua control DB")
+    parser.add_argument("--data-date", default=datetime.now(VN_TZ).strftime('%Y-%m-%d'))
+    parser.add_argument("--pages", type=int, default=100, help="Tổng số trang tối đa cần crawl")
+    parser.add_argument("--shard-size", type=int, default=10, help="Số trang mỗi lease")
+    parser.add_argument("--processes", type=int, default=1, help="Số worker process trên máy này")
+    parser.add_argument("--lease-seconds", type=int, default=300)
+    parser.add_argument("--delay", type=float, default=1.5)
+    args = parser.parse_args()
+
+    host = socket.gethostname()
+    worker_args = (args.data_date, args.pages, args.shard_size, args.lease_seconds, args.delay)
+    if args.processes <= 1:
+        run_worker(f"{host}-{os.getpid()}", *worker_args)
+    else:
+        workers = [Process(target=run_worker, args=(f"{host}-{os.getpid()}-{i}",) + worker_args)
+                   for i in range(args.processes)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
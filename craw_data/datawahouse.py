@@ -1,9 +1,15 @@
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import time
+import sys, os
 from datetime import datetime
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from craw_data.http_client import get_client
+from craw_data.address_parser import parse_location
+from craw_data.classifier import PropertyTypeClassifier, BOTH_FIELDS, clean_text_series
+
 
 def parse_datetime(dt_str):
     try:
@@ -13,79 +19,14 @@ def parse_datetime(dt_str):
         return 'N/A'
 
 
-def get_property_type(title, description):
-    title = title.lower()
-    description = description.lower()
-    if "căn hộ" in title or "căn hộ" in description:
-        return "Căn hộ"
-    elif "nhà phố" in title or "nhà phố" in description:
-        return "Nhà phố"
-    elif "biệt thự" in title:
-        return "Biệt thự"
-    elif "đất nền" in title or "đất nền" in description:
-        return "Đất nền"
-    else:
-        return "Khác"
-
-
-def parse_location(address):
-    """Tách địa chỉ thành Đường, Phường, Quận, Thành phố"""
-    ward = ''
-    district = ''
-    city = ''
-    street = ''
-
-    parts = [p.strip() for p in address.split(',') if p.strip()]
-    parts_lower = [p.lower() for p in parts]
-
-    ward_tokens = ['phường', 'p.', 'phuong', 'xã', 'xa']
-    district_tokens = ['quận', 'q.', 'quan', 'huyện', 'h.']
-    street_tokens = ['đường', 'duong', 'đ.', 'đường số', 'đường vào', 'đường lớn', 'đường nhỏ']
-    city_tokens = ['thành phố', 'tp', 'tp.', 'thanh pho', 'tp hcm', 'hồ chí minh', 'ho chi minh']
-
-    for i, p in enumerate(parts):
-        low = parts_lower[i]
-        if any(tok in low for tok in city_tokens):
-            city = p
-            continue
-        if any(tok in low for tok in district_tokens):
-            district = p
-            continue
-        if any(tok in low for tok in ward_tokens):
-            ward = p
-            continue
-        if any(tok in low for tok in street_tokens):
-            street = p
-            continue
-
-    if not city:
-        city = "Hồ Chí Minh"
-
-    # Nếu thiếu phường/quận thì lấy theo thứ tự từ cuối
-    if not district or not ward:
-        candidates = [p for p in parts if p and p != city]
-        if len(candidates) >= 1 and not district:
-            district = candidates[-1]
-        if len(candidates) >= 2 and not ward:
-            ward = candidates[-2]
-
-    # Nếu chưa có đường thì lấy phần đầu
-    if not street:
-        if parts:
-            first = parts[0]
-            if first not in (ward, district, city):
-                street = first
-
-    # Xử lý trùng lặp
-    if ward == district:
-        ward = ''
-
-    ward = ward.strip() if ward else ''
-    district = district.strip() if district else ''
-    city = city.strip() if city else 'Hồ Chí Minh'
-    street = street.strip() if street else ''
-
-    return street, ward, district, city
+# Bản DW chỉ xét "biệt thự" trong tiêu đề
+TYPE_TABLE = [
+    ("Căn hộ", ["căn hộ"], BOTH_FIELDS),
+    ("Nhà phố", ["nhà phố"], BOTH_FIELDS),
+    ("Biệt thự", ["biệt thự"], ("title",)),
+    ("Đất nền", ["đất nền"], BOTH_FIELDS),
+]
+type_classifier = PropertyTypeClassifier(TYPE_TABLE)
 
 
 def crawl_page(page_num):
@@ -94,13 +35,21 @@ def crawl_page(page_num):
         if page_num == 1
         else f"https://alonhadat.com.vn/can-ban-nha-dat/ho-chi-minh/trang-{page_num}"
     )
-    resp = requests.get(url)
-    resp.encoding = "utf-8"
+    client = get_client()
+    resp = client.get(url)
     if resp.status_code != 200:
         print(f"Không lấy được trang {page_num} — status: {resp.status_code}")
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    results = client.cached_records(resp, "datawarehouse")
+    if results is None:
+        results = parse_listing_html(resp.text)
+        client.store_records(resp, "datawarehouse", results)
+    return results
+
+
+def parse_listing_html(html):
+    soup = BeautifulSoup(html, "html.parser")
     section = soup.find("section", class_="list-property-box")
     if not section:
         return []
@@ -156,7 +105,6 @@ def crawl_page(page_num):
         created = item.find("time", class_="created-date")
         p["Ngày đăng"] = parse_datetime(created["datetime"]) if created and created.has_attr("datetime") else "N/A"
 
-        p["Loại nhà"] = get_property_type(p["Tên"], p["Mô tả"])
         results.append(p)
 
     return results
@@ -179,6 +127,13 @@ def crawl_all(pages=5, delay=1.0):
 props = crawl_all(pages=10, delay=1.5)
 df = pd.DataFrame(props)
 
+# Làm sạch (bỏ icon/emoji) + phân loại loại nhà cho cả batch một lần thay vì từng
+# tin trong vòng parse; giữ nguyên ô "N/A"
+for col in ('Tên', 'Mô tả'):
+    has_text = df[col] != 'N/A'
+    df.loc[has_text, col] = clean_text_series(df.loc[has_text, col])
+df['Loại nhà'] = type_classifier.classify_series(df['Tên'], df['Mô tả'])
+
 # ===== Tạo các bảng dimension và fact =====
 dim_date = df[['Ngày đăng']].drop_duplicates().reset_index(drop=True)
 dim_date['date_id'] = dim_date.index + 1
@@ -0,0 +1,173 @@
+import random
+import threading
+import time
+
+import requests
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+FINAL_STATUSES = (200, 404)
+
+
+class CrawlFailed(Exception):
+    """Trang vẫn lỗi sau khi đã retry hết số lần cho phép"""
+
+    def __init__(self, url, status, message=None):
+        self.url = url
+        self.status = status
+        super().__init__(message or f"{url} — status: {status}")
+
+
+class CircuitOpen(Exception):
+    """Circuit breaker mở lại sau khi đã tạm dừng: dừng crawl, giữ phần đã crawl"""
+
+
+class CrawlInterrupted(Exception):
+    """Crawl dừng giữa chừng, `partial` là các tin đã lấy được trước trang lỗi"""
+
+    def __init__(self, page, cause, partial):
+        self.page = page
+        self.cause = cause
+        self.partial = partial
+        super().__init__(f"Crawl dừng ở trang {page}: {cause}")
+
+
+# ------------------ ĐIỀU KHIỂN FETCH THÍCH ỨNG ------------------
+class FetchController:
+    """
+    Bọc việc gọi client.get với:
+    - retry + exponential backoff có jitter (ưu tiên Retry-After của server),
+    - AIMD: gặp 429/5xx thì giảm nửa số request đồng thời và nhân đôi delay,
+      thành công liên tiếp thì tăng dần lại,
+    - circuit breaker: lỗi liên tiếp quá ngưỡng thì tạm dừng `cooldown` giây,
+      thử lại 1 request; vẫn lỗi quá `max_opens` lần thì ném CircuitOpen.
+    min_delay mặc định bằng delay: AIMD chỉ giãn thêm khi bị 429/5xx rồi hạ dần
+    về lại delay cấu hình (mức lịch sự với site), không tự chạy nhanh hơn.
+    """
+
+    def __init__(self, max_retries=4, backoff_base=1.0, backoff_max=60.0,
+                 delay=1.5, min_delay=None, max_delay=30.0, delay_step=0.1,
+                 concurrency=4, max_concurrency=8, increase_every=10,
+                 failure_threshold=5, cooldown=60.0, max_opens=3):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.delay = delay
+        self.min_delay = delay if min_delay is None else min_delay
+        self.max_delay = max_delay
+        self.delay_step = delay_step
+
+        self.concurrency = max(1, min(concurrency, max_concurrency))
+        self.max_concurrency = max_concurrency
+        self.increase_every = increase_every
+
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_opens = max_opens
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._next_at = 0.0
+        self._successes = 0
+        self._consecutive_failures = 0
+        self._opens = 0
+        self._open_until = 0.0
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "errors": 0, "breaker_opens": 0}
+
+    # ----- slot đồng thời + giãn cách request -----
+    def _acquire(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self._open_until:
+                    self._cond.wait(self._open_until - now)
+                    continue
+                if self._in_flight >= self.concurrency:
+                    self._cond.wait()
+                    continue
+                if now < self._next_at:
+                    self._cond.wait(self._next_at - now)
+                    continue
+                self._in_flight += 1
+                self._next_at = now + self.delay
+                self.stats["requests"] += 1
+                return
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    # ----- AIMD -----
+    def _on_success(self):
+        with self._cond:
+            self._consecutive_failures = 0
+            self._opens = 0
+            self._successes += 1
+            self.delay = max(self.min_delay, self.delay - self.delay_step)
+            if self._successes % self.increase_every == 0 and self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+            self._cond.notify_all()
+
+    def _on_failure(self, throttled):
+        with self._cond:
+            self.stats["throttled" if throttled else "errors"] += 1
+            self._successes = 0
+            self._consecutive_failures += 1
+            self.concurrency = max(1, self.concurrency // 2)
+            self.delay = min(self.max_delay, max(self.delay * 2, self.min_delay))
+
+            if self._consecutive_failures >= self.failure_threshold:
+                self._opens += 1
+                self.stats["breaker_opens"] += 1
+                if self._opens > self.max_opens:
+                    raise CircuitOpen(f"Circuit breaker mở {self._opens} lần liên tiếp, dừng crawl")
+                print(f"Circuit breaker mở: tạm dừng {self.cooldown:.0f}s sau "
+                      f"{self._consecutive_failures} lỗi liên tiếp")
+                self._open_until = time.monotonic() + self.cooldown
+                # Sau cooldown chỉ cho 1 request thử (half-open)
+                self._consecutive_failures = self.failure_threshold - 1
+                self.concurrency = 1
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter: ngẫu nhiên trong [0, base * 2^attempt]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def fetch(self, client, url):
+        """Trả về response 200/404, ném CrawlFailed nếu hết retry, CircuitOpen nếu breaker bỏ cuộc"""
+        status = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._cond:
+                    self.stats["retries"] += 1
+            retry_after = None
+            self._acquire()
+            try:
+                resp = client.get(url)
+                status = resp.status_code
+            except requests.RequestException as e:
+                resp, status = None, str(e)
+            finally:
+                self._release()
+
+            if resp is not None and status in FINAL_STATUSES:
+                self._on_success()
+                return resp
+            if resp is not None and status not in RETRY_STATUSES:
+                raise CrawlFailed(url, status)
+
+            self._on_failure(throttled=status == 429)
+            if attempt == self.max_retries:
+                break
+            if resp is not None:
+                retry_after = resp.headers.get("Retry-After")
+            wait = self._backoff(attempt, retry_after)
+            print(f"Lỗi {status} khi lấy {url} — thử lại sau {wait:.1f}s "
+                  f"(lần {attempt + 1}/{self.max_retries})")
+            time.sleep(wait)
+        raise CrawlFailed(url, status)
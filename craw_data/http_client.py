@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CACHE_DIR = os.getenv("CRAWL_CACHE_DIR", os.path.join(ROOT_DIR, ".cache", "http"))
+DEFAULT_CACHE_MAX_BYTES = int(float(os.getenv("CRAWL_CACHE_MAX_MB", "200")) * 1024 * 1024)
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+CACHE_ENABLED = os.getenv("CRAWL_CACHE", "on").lower() not in ("off", "0", "false")
+
+
+def _digest(value):
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return hashlib.sha1(value).hexdigest()
+
+
+# ------------------ CACHE TRÊN Ổ ĐĨA (LRU) ------------------
+class ResponseCache:
+    """
+    Lưu body + ETag/Last-Modified của từng URL ra đĩa, kèm kết quả parse theo
+    namespace. Tổng dung lượng bị giới hạn bởi max_bytes, vượt thì xóa entry
+    ít được dùng nhất (theo thời điểm truy cập).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> size, cũ nhất ở đầu
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".html"
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            key = name[:-5]
+            meta_path, body_path = self._paths(key)
+            try:
+                size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+                entries.append((os.path.getmtime(meta_path), key, size))
+            except OSError:
+                continue
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+
+    def _touch(self, key):
+        self._index.move_to_end(key)
+        try:
+            os.utime(self._paths(key)[0])
+        except OSError:
+            pass
+
+    def _evict(self):
+        total = sum(self._index.values())
+        while total > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    def get(self, url):
+        """Trả về (meta, body) hoặc None nếu chưa có trong cache"""
+        key = _digest(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            meta_path, body_path = self._paths(key)
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                with open(body_path, "r", encoding="utf-8") as f:
+                    body = f.read()
+            except (OSError, ValueError):
+                self._index.pop(key, None)
+                return None
+            self._touch(key)
+            return meta, body
+
+    def put(self, url, meta, body=None):
+        """Ghi meta (và body nếu có) cho url, sau đó dọn cache theo LRU"""
+        key = _digest(url)
+        meta_path, body_path = self._paths(key)
+        with self._lock:
+            if body is not None:
+                with open(body_path, "w", encoding="utf-8") as f:
+                    f.write(body)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            try:
+                self._index[key] = os.path.getsize(meta_path) + os.path.getsize(body_path)
+            except OSError:
+                self._index.pop(key, None)
+                return
+            self._index.move_to_end(key)
+            self._evict()
+
+
+# ------------------ RESPONSE ------------------
+class CrawlResponse:
+    def __init__(self, url, status_code, text, body_hash=None, not_modified=False, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.body_hash = body_hash
+        self.not_modified = not_modified  # True nếu server trả 304 và dùng body trong cache
+
+
+# ------------------ HTTP CLIENT DÙNG CHUNG ------------------
+class CrawlerClient:
+    """
+    Client HTTP cho crawler: giữ kết nối keep-alive qua requests.Session, gửi
+    If-None-Match/If-Modified-Since khi URL đã có trong cache và dùng lại body
+    cũ khi nhận 304.
+    """
+
+    def __init__(self, cache=None, pool_size=10, headers=None, timeout=30):
+        # cache=None → cache mặc định trên đĩa, cache=False → tắt cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self.cache = cache if cache is not None else ResponseCache()
+        self.timeout = timeout
+
+    def get(self, url):
+        cached = self.cache.get(url) if self.cache else None
+        headers = {}
+        if cached:
+            meta, _ = cached
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp = self.session.get(url, headers=headers, timeout=self.timeout)
+
+        if resp.status_code == 304 and cached:
+            meta, body = cached
+            return CrawlResponse(url, 200, body, meta.get("body_hash"), not_modified=True)
+
+        resp.encoding = "utf-8"
+        text = resp.text
+        if resp.status_code != 200:
+            return CrawlResponse(url, resp.status_code, text, headers=resp.headers)
+
+        body_hash = _digest(text)
+        if self.cache:
+            meta = {
+                "url": url,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "body_hash": body_hash,
+                "records": {},
+            }
+            # Body không đổi thì giữ lại kết quả parse cũ
+            if cached and cached[0].get("body_hash") == body_hash:
+                meta["records"] = cached[0].get("records", {})
+            self.cache.put(url, meta, text)
+        return CrawlResponse(url, 200, text, body_hash, headers=resp.headers)
+
+    def cached_records(self, resp, namespace):
+        """Kết quả parse đã lưu cho đúng body này, None nếu phải parse lại"""
+        if not self.cache or not resp.body_hash:
+            return None
+        cached = self.cache.get(resp.url)
+        if not cached or cached[0].get("body_hash") != resp.body_hash:
+            return None
+        return cached[0].get("records", {}).get(namespace)
+
+    def store_records(self, resp, namespace, records):
+        if not self.cache or not resp.body_hash:
+            return
+        cached = self.cache.get(resp.url)
+        if not cached or cached[0].get("body_hash") != resp.body_hash:
+            return
+        meta = cached[0]
+        meta.setdefault("records", {})[namespace] = records
+        self.cache.put(resp.url, meta)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Client dùng chung trong 1 process (tạo khi gọi lần đầu)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CrawlerClient(cache=None if CACHE_ENABLED else False)
+        return _client
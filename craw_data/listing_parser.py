@@ -0,0 +1,235 @@
+import os
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from craw_data.classifier import clean_text, PropertyTypeClassifier
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml là tùy chọn, thiếu thì chỉ dùng được backend bs4
+    lxml = None
+
+SITE_URL = "https://alonhadat.com.vn"
+
+# ------------------ HÀM HỖ TRỢ ------------------
+def parse_datetime(dt_str):
+    try:
+        dt_obj = datetime.fromisoformat(dt_str)
+        return dt_obj.strftime('%Y-%m-%d')
+    except:
+        return 'N/A'
+
+_type_classifier = PropertyTypeClassifier()
+
+def get_property_type(title, description):
+    return _type_classifier.classify(title, description)
+
+def parse_location(address):
+    parts = [x.strip() for x in address.split(',')]
+    ward = parts[0] if len(parts) > 0 else ''
+    district = parts[1] if len(parts) > 1 else ''
+    city = parts[2] if len(parts) > 2 else 'Hồ Chí Minh'
+    return ward, district, city
+
+# ------------------ DỰNG 1 RECORD ------------------
+def build_record(raw):
+    """
+    Dựng record từ các trường thô mà backend đã trích (None = không có thẻ).
+    Mọi backend dùng chung hàm này nên cho ra record giống hệt nhau.
+    """
+    p = {}
+
+    # ===== LINK + ID =====
+    url = raw['href']
+    if url is not None:
+        p['URL'] = SITE_URL + url
+        p['Key'] = url.split('-')[-1].replace('.html', '')
+    else:
+        p['URL'] = 'N/A'
+        p['Key'] = 'N/A'
+
+    p['Tên'] = clean_text(raw['title']) if raw['title'] is not None else 'N/A'
+    p['Giá'] = raw['price'] if raw['price'] is not None else 'N/A'
+    p['Diện tích'] = f"{raw['area']} m²" if raw['area'] is not None else 'N/A'
+
+    if raw['address_parts'] is not None:
+        full_address = ', '.join(raw['address_parts'])
+        p['Địa chỉ'] = full_address
+        ward, district, city = parse_location(full_address)
+        p['Phường'] = ward
+        p['Quận'] = district
+        p['Thành phố'] = city
+    else:
+        p['Địa chỉ'] = p['Phường'] = p['Quận'] = p['Thành phố'] = 'N/A'
+
+    p['Phòng ngủ'] = raw['bedrooms'] if raw['bedrooms'] is not None else 'N/A'
+    p['Tầng'] = raw['floors'] if raw['floors'] is not None else 'N/A'
+    p['Lộ giới'] = raw['street_width'] if raw['street_width'] is not None else 'N/A'
+
+    if raw['description'] is not None:
+        txt = raw['description']
+        txt = txt[:100] + '...' if len(txt) > 100 else txt
+        p['Mô tả'] = clean_text(txt)
+    else:
+        p['Mô tả'] = 'N/A'
+
+    created = raw['created']
+    p['Ngày đăng'] = parse_datetime(created) if created is not None else 'N/A'
+
+    p['Loại nhà'] = get_property_type(p['Tên'], p['Mô tả'])
+    return p
+
+# ------------------ BACKEND BEAUTIFULSOUP ------------------
+def _bs4_items(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    section = soup.find('section', class_='list-property-box')
+    if not section:
+        return
+
+    for item in section.find_all('article', class_='property-item'):
+        link = item.find('a', href=True)
+        title = item.find('h3', class_='property-title')
+
+        price = item.find('span', class_='price')
+        pt = price.find('span', itemprop='price') if price else None
+
+        area = item.find('span', class_='area')
+        at = area.find('span', itemprop='value') if area else None
+
+        address = item.find('p', class_='new-address')
+        address_parts = None
+        if address:
+            address_parts = [x.get_text(strip=True) for x in address.find_all('span') if x.get_text(strip=True)]
+
+        bedrooms = item.find('span', class_='bedroom')
+        vb = bedrooms.find('span', itemprop='value') if bedrooms else None
+
+        floors = item.find('span', class_='floors')
+        street = item.find('span', class_='street-width')
+
+        desc = item.find('p', class_='brief')
+        description = None
+        if desc:
+            vd = desc.find('span', class_='view-detail')
+            if vd: vd.decompose()
+            description = desc.get_text(strip=True)
+
+        created = item.find('time', class_='created-date')
+
+        yield {
+            'href': link['href'] if link else None,
+            'title': title.get_text(strip=True) if title else None,
+            'price': pt.get_text(strip=True) if pt else None,
+            'area': at.get_text(strip=True) if at else None,
+            'address_parts': address_parts,
+            'bedrooms': vb.get_text(strip=True) if vb else None,
+            'floors': floors.get_text(strip=True) if floors else None,
+            'street_width': street.get_text(strip=True) if street else None,
+            'description': description,
+            'created': created['datetime'] if created and created.has_attr('datetime') else None,
+        }
+
+# ------------------ BACKEND LXML ------------------
+def _has_class(tag, cls):
+    return f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+
+if lxml is not None:
+    _X_SECTION = etree.XPath("(" + _has_class("section", "list-property-box") + ")[1]")
+    _X_ITEMS = etree.XPath(_has_class("article", "property-item"))
+    _X_LINK = etree.XPath(".//a[@href]")
+    _X_TITLE = etree.XPath(_has_class("h3", "property-title"))
+    _X_PRICE = etree.XPath(_has_class("span", "price"))
+    _X_PRICE_VALUE = etree.XPath(".//span[@itemprop='price']")
+    _X_AREA = etree.XPath(_has_class("span", "area"))
+    _X_VALUE = etree.XPath(".//span[@itemprop='value']")
+    _X_ADDRESS = etree.XPath(_has_class("p", "new-address"))
+    _X_SPANS = etree.XPath(".//span")
+    _X_BEDROOM = etree.XPath(_has_class("span", "bedroom"))
+    _X_FLOORS = etree.XPath(_has_class("span", "floors"))
+    _X_STREET = etree.XPath(_has_class("span", "street-width"))
+    _X_BRIEF = etree.XPath(_has_class("p", "brief"))
+    _X_VIEW_DETAIL = etree.XPath(_has_class("span", "view-detail"))
+    _X_CREATED = etree.XPath(_has_class("time", "created-date"))
+
+_SKIP_TEXT_TAGS = ("script", "style", "template")
+
+def _first(xpath, node):
+    if node is None:
+        return None
+    found = xpath(node)
+    return found[0] if found else None
+
+def _text(node, skip=None):
+    """Tương đương get_text(strip=True) của bs4: bỏ comment/script, bỏ chuỗi rỗng"""
+    parts = []
+
+    def walk(el):
+        if el.text:
+            parts.append(el.text.strip())
+        for child in el:
+            if isinstance(child.tag, str) and child is not skip and child.tag not in _SKIP_TEXT_TAGS:
+                walk(child)
+            if child.tail:
+                parts.append(child.tail.strip())
+
+    walk(node)
+    return ''.join(parts)
+
+def _lxml_items(html):
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    root = lxml.html.document_fromstring(html, parser=lxml.html.HTMLParser(encoding='utf-8'))
+    section = _first(_X_SECTION, root)
+    if section is None:
+        return
+
+    for item in _X_ITEMS(section):
+        link = _first(_X_LINK, item)
+        title = _first(_X_TITLE, item)
+        pt = _first(_X_PRICE_VALUE, _first(_X_PRICE, item))
+        at = _first(_X_VALUE, _first(_X_AREA, item))
+
+        address = _first(_X_ADDRESS, item)
+        address_parts = None
+        if address is not None:
+            address_parts = [t for t in (_text(x) for x in _X_SPANS(address)) if t]
+
+        vb = _first(_X_VALUE, _first(_X_BEDROOM, item))
+        floors = _first(_X_FLOORS, item)
+        street = _first(_X_STREET, item)
+
+        desc = _first(_X_BRIEF, item)
+        description = None
+        if desc is not None:
+            description = _text(desc, skip=_first(_X_VIEW_DETAIL, desc))
+
+        created = _first(_X_CREATED, item)
+
+        yield {
+            'href': link.get('href') if link is not None else None,
+            'title': _text(title) if title is not None else None,
+            'price': _text(pt) if pt is not None else None,
+            'area': _text(at) if at is not None else None,
+            'address_parts': address_parts,
+            'bedrooms': _text(vb) if vb is not None else None,
+            'floors': _text(floors) if floors is not None else None,
+            'street_width': _text(street) if street is not None else None,
+            'description': description,
+            'created': created.get('datetime') if created is not None else None,
+        }
+
+# ------------------ CHỌN BACKEND ------------------
+BACKENDS = {"bs4": _bs4_items}
+if lxml is not None:
+    BACKENDS["lxml"] = _lxml_items
+
+DEFAULT_BACKEND = os.getenv("CRAWL_PARSER", "lxml" if lxml is not None else "bs4")
+
+def parse_listing_html(html, backend=None):
+    """Parse 1 trang danh sách của alonhadat thành list record (backend: bs4 | lxml)"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Parser backend không hợp lệ: {backend} (có: {', '.join(BACKENDS)})")
+    return [build_record(raw) for raw in BACKENDS[backend](html)]
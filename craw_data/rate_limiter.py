@@ -0,0 +1,56 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+# ------------------ TOKEN BUCKET ------------------
+class TokenBucket:
+    """Giới hạn số request/giây: nạp `rate` token mỗi giây, tối đa `capacity` token"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Chờ tới khi lấy được 1 token (chặn luồng hiện tại)"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# ------------------ GIỚI HẠN THEO HOST ------------------
+class HostRateLimiter:
+    """Mỗi host có một TokenBucket riêng, dùng chung giữa các luồng crawl"""
+
+    def __init__(self, rate=1.0, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url):
+        self.bucket_for(url).acquire()
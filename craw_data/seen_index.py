@@ -0,0 +1,64 @@
+import json
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INDEX_PATH = os.getenv("CRAWL_SEEN_INDEX", os.path.join(ROOT_DIR, ".cache", "seen_index.json"))
+
+
+# ------------------ CHỈ MỤC TIN ĐÃ CRAWL ------------------
+class SeenIndex:
+    """
+    Lưu Key của các tin đã crawl kèm `Ngày đăng` mới nhất. Dùng cho crawl tăng
+    dần: gặp trang mà mọi tin đều đã biết và chưa đăng lại thì dừng phân trang.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.keys = {}
+
+    @staticmethod
+    def _key(record):
+        key = str(record.get('Key', '')).strip()
+        return '' if key in ('', 'N/A', 'nan') else key
+
+    @staticmethod
+    def _posted(record):
+        posted = str(record.get('Ngày đăng', '') or '')[:10]
+        return '' if posted in ('N/A', 'nan') else posted
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.keys = json.load(f)
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.keys, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def is_known(self, record):
+        key = self._key(record)
+        if not key or key not in self.keys:
+            return False
+        # Ngày đăng mới hơn lần trước → tin được đăng lại/cập nhật
+        return self._posted(record) <= self.keys[key]
+
+    def page_is_known(self, records):
+        return bool(records) and all(self.is_known(r) for r in records)
+
+    def update(self, records):
+        for r in records:
+            key = self._key(r)
+            if not key:
+                continue
+            posted = self._posted(r)
+            if posted > self.keys.get(key, ''):
+                self.keys[key] = posted
+            else:
+                self.keys.setdefault(key, posted)
+
+    def __len__(self):
+        return len(self.keys)
@@ -0,0 +1,79 @@
+import glob
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+SNAPSHOT_ROOT = os.path.join("data", "snapshots")
+
+
+# ------------------ ĐƯỜNG DẪN PARTITION ------------------
+def snapshot_path(crawl_date, root=SNAPSHOT_ROOT):
+    """Thư mục partition của 1 ngày crawl, vd data/snapshots/crawl_date=2025-11-25"""
+    return os.path.join(root, f"crawl_date={crawl_date}")
+
+def snapshot_parts(crawl_date, root=SNAPSHOT_ROOT):
+    # Tên part có run_id theo thời gian nên sort tên = sort theo thứ tự ghi
+    return sorted(glob.glob(os.path.join(snapshot_path(crawl_date, root), "part-*.parquet")))
+
+def snapshot_exists(crawl_date, root=SNAPSHOT_ROOT):
+    return len(snapshot_parts(crawl_date, root)) > 0
+
+
+# ------------------ GHI TỪNG TRANG ------------------
+class SnapshotWriter:
+    """
+    Ghi mỗi trang crawl được thành 1 file parquet riêng trong partition của ngày
+    crawl (append-only). Crawl bị dừng giữa chừng vẫn giữ được các trang đã ghi;
+    việc lọc trùng Key để dành cho lúc đọc/compact.
+    """
+
+    def __init__(self, crawl_date, root=SNAPSHOT_ROOT):
+        self.crawl_date = crawl_date
+        self.path = snapshot_path(crawl_date, root)
+        self.run_id = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        self.rows_written = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def write_page(self, page_num, records):
+        if not records:
+            return
+        df = pd.DataFrame(records).astype(str)
+        part = os.path.join(self.path, f"part-{self.run_id}-{page_num:05d}.parquet")
+        tmp_part = part + ".tmp"
+        df.to_parquet(tmp_part, index=False)
+        os.replace(tmp_part, part)
+        with self._lock:
+            self.rows_written += len(df)
+
+
+# ------------------ ĐỌC / COMPACT ------------------
+def read_snapshot(crawl_date, root=SNAPSHOT_ROOT, columns=None):
+    """Đọc toàn bộ partition của ngày, lọc trùng Key (giữ bản ghi mới nhất)"""
+    parts = snapshot_parts(crawl_date, root)
+    if not parts:
+        raise FileNotFoundError(f"Snapshot {snapshot_path(crawl_date, root)} không tồn tại!")
+    if columns is not None and "Key" not in columns:
+        columns = ["Key"] + list(columns)
+    df = pd.concat([pd.read_parquet(p, columns=columns) for p in parts], ignore_index=True)
+    df['Key'] = df['Key'].astype(str).str.strip()
+    return df.drop_duplicates(subset="Key", keep="last").reset_index(drop=True)
+
+def count_snapshot_rows(crawl_date, root=SNAPSHOT_ROOT):
+    return len(read_snapshot(crawl_date, root, columns=["Key"]))
+
+def compact_snapshot(crawl_date, root=SNAPSHOT_ROOT):
+    """Gộp các part của ngày thành 1 file đã lọc trùng, trả về số dòng"""
+    parts = snapshot_parts(crawl_date, root)
+    if len(parts) <= 1:
+        return count_snapshot_rows(crawl_date, root) if parts else 0
+    df = read_snapshot(crawl_date, root)
+    run_id = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    compacted = os.path.join(snapshot_path(crawl_date, root), f"part-{run_id}-compacted.parquet")
+    df.to_parquet(compacted + ".tmp", index=False)
+    os.replace(compacted + ".tmp", compacted)
+    for p in parts:
+        os.remove(p)
+    return len(df)
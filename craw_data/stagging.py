@@ -1,18 +1,22 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from zoneinfo import ZoneInfo
 import sys, os
-import re
-import mysql.connector
-import json
 from dotenv import load_dotenv
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ROOT_DIR)
 from template.notification import send_error_email
+from template.control_log import get_control_log
+from craw_data.rate_limiter import HostRateLimiter
+from craw_data.http_client import get_client
+from craw_data.seen_index import SeenIndex
+from craw_data.listing_parser import parse_listing_html, SITE_URL
+from craw_data.snapshot_store import SnapshotWriter, snapshot_path, snapshot_exists, count_snapshot_rows
+from craw_data.fetch_controller import FetchController, CrawlFailed, CircuitOpen, CrawlInterrupted
 
 # Chạy gửi mail báo lỗi tại local
 env_path = os.path.join(os.path.dirname(__file__), '.env')
@@ -21,245 +25,247 @@ load_dotenv(env_path)
 # Giờ Việt Nam
 VN_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
 
-# ------------------ HÀM LOẠI BỎ ICON / EMOJI ------------------
-def clean_text(text):
-    cleaned = re.sub(r'[^a-zA-Z0-9À-ỹà-ỹ\s.,;:!?()-]', '', text)
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-    return cleaned
-
-# ------------------ HÀM HỖ TRỢ ------------------
-def parse_datetime(dt_str):
-    try:
-        dt_obj = datetime.fromisoformat(dt_str)
-        return dt_obj.strftime('%Y-%m-%d')
-    except:
-        return 'N/A'
-
-def get_property_type(title, description):
-    title = title.lower()
-    description = description.lower()
-    if "căn hộ" in title or "căn hộ" in description:
-        return "Căn hộ"
-    elif "nhà phố" in title or "nhà phố" in description:
-        return "Nhà phố"
-    elif "biệt thự" in title or "biệt thự" in description:
-        return "Biệt thự"
-    elif "đất nền" in title or "đất nền" in description:
-        return "Đất nền"
-    else:
-        return "Khác"
-
-def parse_location(address):
-    parts = [x.strip() for x in address.split(',')]
-    ward = parts[0] if len(parts) > 0 else ''
-    district = parts[1] if len(parts) > 1 else ''
-    city = parts[2] if len(parts) > 2 else 'Hồ Chí Minh'
-    return ward, district, city
+# Trang nguồn (có thể trỏ sang replay server khi benchmark)
+BASE_URL = os.getenv("CRAWL_BASE_URL", SITE_URL)
 
 # ------------------ HÀM CRAWL 1 TRANG ------------------
-def crawl_page(page_num):
-    crawl_date = datetime.now(VN_TZ).strftime('%Y-%m-%d')
+def page_url(page_num, base_url=BASE_URL):
     if page_num == 1:
-        url = "https://alonhadat.com.vn/can-ban-nha-dat/ho-chi-minh"
-    else:
-        url = f"https://alonhadat.com.vn/can-ban-nha-dat/ho-chi-minh/trang-{page_num}"
+        return f"{base_url}/can-ban-nha-dat/ho-chi-minh"
+    return f"{base_url}/can-ban-nha-dat/ho-chi-minh/trang-{page_num}"
 
-    headers = {"User-Agent": "Mozilla/5.0"}
-    resp = requests.get(url, headers=headers)
-    resp.encoding = 'utf-8'
+def crawl_page(page_num, base_url=BASE_URL, limiter=None, controller=None):
+    crawl_date = datetime.now(VN_TZ).strftime('%Y-%m-%d')
+    url = page_url(page_num, base_url)
+    if limiter:
+        limiter.acquire(url)
+
+    client = get_client()
+    # Có controller thì lỗi tạm thời được retry, hết retry thì ném CrawlFailed
+    resp = controller.fetch(client, url) if controller else client.get(url)
     if resp.status_code != 200:
         print(f"Không lấy được trang {page_num} — status: {resp.status_code}")
         return []
 
-    soup = BeautifulSoup(resp.text, 'html.parser')
-    section = soup.find('section', class_='list-property-box')
-    if not section:
-        return []
-
-    results = []
-    for item in section.find_all('article', class_='property-item'):
-        p = {}
-
-        # ===== LINK + ID =====
-        link = item.find('a', href=True)
-        if link:
-            url = link['href']
-            p['URL'] = "https://alonhadat.com.vn" + url
-            try:
-                p['Key'] = url.split('-')[-1].replace('.html', '')
-            except:
-                p['Key'] = 'N/A'
-        else:
-            p['URL'] = 'N/A'
-            p['Key'] = 'N/A'
-
-        title = item.find('h3', class_='property-title')
-        p['Tên'] = clean_text(title.get_text(strip=True)) if title else 'N/A'
-
-        price = item.find('span', class_='price')
-        pt = price.find('span', itemprop='price') if price else None
-        p['Giá'] = pt.get_text(strip=True) if pt else 'N/A'
-
-        area = item.find('span', class_='area')
-        at = area.find('span', itemprop='value') if area else None
-        p['Diện tích'] = f"{at.get_text(strip=True)} m²" if at else 'N/A'
-
-        address = item.find('p', class_='new-address')
-        if address:
-            parts = [x.get_text(strip=True) for x in address.find_all('span') if x.get_text(strip=True)]
-            full_address = ', '.join(parts)
-            p['Địa chỉ'] = full_address
-            ward, district, city = parse_location(full_address)
-            p['Phường'] = ward
-            p['Quận'] = district
-            p['Thành phố'] = city
-        else:
-            p['Địa chỉ'] = p['Phường'] = p['Quận'] = p['Thành phố'] = 'N/A'
-
-        bedrooms = item.find('span', class_='bedroom')
-        vb = bedrooms.find('span', itemprop='value') if bedrooms else None
-        p['Phòng ngủ'] = vb.get_text(strip=True) if vb else 'N/A'
-
-        floors = item.find('span', class_='floors')
-        p['Tầng'] = floors.get_text(strip=True) if floors else 'N/A'
-
-        street = item.find('span', class_='street-width')
-        p['Lộ giới'] = street.get_text(strip=True) if street else 'N/A'
-
-        desc = item.find('p', class_='brief')
-        if desc:
-            vd = desc.find('span', class_='view-detail')
-            if vd: vd.decompose()
-            txt = desc.get_text(strip=True)
-            txt = txt[:100] + '...' if len(txt) > 100 else txt
-            p['Mô tả'] = clean_text(txt)
-        else:
-            p['Mô tả'] = 'N/A'
-
-        created = item.find('time', class_='created-date')
-        p['Ngày đăng'] = parse_datetime(created['datetime']) if created and created.has_attr('datetime') else 'N/A'
+    # Trang không đổi so với lần crawl trước trong ngày → dùng lại kết quả parse
+    results = client.cached_records(resp, "staging")
+    if results is None:
+        results = parse_listing_html(resp.text)
+        client.store_records(resp, "staging", results)
 
-        p['Loại nhà'] = get_property_type(p['Tên'], p['Mô tả'])
+    for p in results:
         p['Ngày cào'] = crawl_date
-
-        results.append(p)
-
     return results
 
 # ------------------ CRAWL TẤT CẢ ------------------
-def crawl_all(pages=5, delay=1.0):
+def crawl_all(pages=5, delay=1.0, base_url=BASE_URL, seen_index=None, on_page=None, controller=None):
     all_props = []
     for i in range(1, pages + 1):
         print(f"Đang crawl trang {i}...")
-        data = crawl_page(i)
+        try:
+            data = crawl_page(i, base_url, controller=controller)
+        except (CrawlFailed, CircuitOpen) as e:
+            raise CrawlInterrupted(i, e, all_props)
         if not data:
             print(f"Trang {i} không có dữ liệu hoặc đã hết.")
             break
+        if seen_index and seen_index.page_is_known(data):
+            print(f"Trang {i} chỉ toàn tin đã crawl — dừng crawl tăng dần.")
+            break
         all_props.extend(data)
-        time.sleep(delay)
+        if on_page:
+            on_page(i, data)
+        # Controller tự giãn cách request theo tình trạng server
+        if not controller:
+            time.sleep(delay)
     return all_props
 
-# ------------------ MAIN ------------------
-try:
-    # Load config
-    with open("config/config.json", "r", encoding="utf-8") as f:
-        cfg = json.load(f)
-
-    control_config = cfg["control"]
-
-    conn = mysql.connector.connect(**control_config)
-    cursor = conn.cursor()
-
-    # ✅ Set timezone MySQL về Việt Nam
-    cursor.execute("SET time_zone = '+07:00';")
-
-    # ========== 1) GHI LOG BẮT ĐẦU PROCESS (PS) ==========
-    cursor.execute("""
-        INSERT INTO process_log (process_name, status, file_id, started_at, updated_at)
-        VALUES ('Crawl Data', 'PS', NULL, NOW(), NOW())
-    """)
-    process_id = cursor.lastrowid
-    conn.commit()
-
-    # ========== 2) CRAWL DỮ LIỆU ==========
-    props = crawl_all(pages=10, delay=1.5)
-    df = pd.DataFrame(props)
-
-    # ===== Chuẩn hóa Key để tránh trùng =====
-    df['Key'] = df['Key'].astype(str).str.strip()
-
-    # ===== TÊN FILE THEO NGÀY =====
-    today_str_file = datetime.now(VN_TZ).strftime('%d_%m_%Y')
-    file_name = f"bds_{today_str_file}.xlsx"
-    if not os.path.exists("data"):
-        os.makedirs("data")
-    file_path = os.path.join("data", file_name)
+# ------------------ CRAWL SONG SONG ------------------
+def crawl_all_concurrent(pages=5, max_workers=4, rate=1.0, burst=1, base_url=BASE_URL, seen_index=None,
+                         on_page=None, controller=None):
+    """
+    Crawl nhiều trang cùng lúc (tối đa max_workers luồng), mỗi host bị giới hạn
+    `rate` request/giây bằng token bucket. Dừng ở trang rỗng đầu tiên (hoặc trang
+    toàn tin đã biết khi có seen_index) và trả về kết quả theo đúng thứ tự trang
+    như crawl_all. on_page(page, data) được gọi theo thứ tự trang, ngay khi trang đó
+    và mọi trang trước nó đã về, nên snapshot khớp đúng kết quả trả về (trang về
+    sớm nằm sau điểm dừng không bao giờ được ghi).
+    Trang lỗi hẳn (sau retry của controller) → ném CrawlInterrupted kèm các trang liền trước nó.
+    """
+    limiter = HostRateLimiter(rate=rate, burst=burst)
+    results = {}
+    pending = {}
+    first_empty = pages + 1
+    next_page = 1
+    flushed = 0
+    failure = None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or next_page < first_empty:
+            # Chỉ giao thêm trang khi còn slot và chưa gặp trang rỗng
+            while next_page < first_empty and len(pending) < max_workers:
+                print(f"Đang crawl trang {next_page}...")
+                future = pool.submit(crawl_page, next_page, base_url, limiter, controller)
+                pending[future] = next_page
+                next_page += 1
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = pending.pop(future)
+                try:
+                    data = future.result()
+                except (CrawlFailed, CircuitOpen) as e:
+                    if page < first_empty:
+                        print(f"Trang {page} lỗi: {e}")
+                        first_empty = page
+                        failure = (page, e)
+                    continue
+                if not data:
+                    if page < first_empty:
+                        print(f"Trang {page} không có dữ liệu hoặc đã hết.")
+                        first_empty = page
+                elif seen_index and seen_index.page_is_known(data):
+                    if page < first_empty:
+                        print(f"Trang {page} chỉ toàn tin đã crawl — dừng crawl tăng dần.")
+                        first_empty = page
+                else:
+                    results[page] = data
+
+            # Đoạn trang liền nhau từ đầu đã về đủ thì không còn bị điểm dừng cắt bớt
+            while flushed + 1 < first_empty and flushed + 1 in results:
+                flushed += 1
+                if on_page:
+                    on_page(flushed, results[flushed])
 
-    # ===== GỘP DỮ LIỆU CŨ + MỚI VÀ LỌC TRÙNG =====
-    if os.path.exists(file_path):
-        old_df = pd.read_excel(file_path)
-        old_df['Key'] = old_df['Key'].astype(str).str.strip()
-        merged_df = pd.concat([old_df, df], ignore_index=True)
-        final_df = merged_df.drop_duplicates(subset="Key", keep="last")
-    else:
-        final_df = df
-
-    # ===== LƯU FILE =====
-    final_df.to_excel(file_path, index=False, engine="xlsxwriter")
-    print(f"Staging đã lưu snapshot mới: {file_path}")
-
-    # ------------------ GHI LOG VÀO BẢNG file_log ------------------
-    normalized_path = file_path.replace("\\", "/")
-    current_datetime = datetime.now(VN_TZ).strftime("%Y-%m-%d %H:%M:%S")
-    today_date = datetime.now(VN_TZ).strftime("%Y-%m-%d")
-    row_count = len(final_df)
-
-    check_sql = "SELECT file_id FROM file_log WHERE file_path = %s AND DATE(data_date) = %s"
-    cursor.execute(check_sql, (normalized_path, today_date))
-    rows = cursor.fetchall()
-    existing_log = rows[0] if rows else None
-
-    if existing_log:
-        file_id = existing_log[0]
-        update_sql = """
-            UPDATE file_log 
-            SET row_count = %s, status = 'ER', updated_at = %s, author = 'System'
-            WHERE file_id = %s
-        """
-        cursor.execute(update_sql, (row_count, current_datetime, file_id))
-        print(f"Đã cập nhật file_log (ID: {file_id}) thành trạng thái ER.")
-    else:
-        insert_sql = """
-            INSERT INTO file_log (file_path, data_date, row_count, status, author, created_at, updated_at)
-            VALUES (%s, %s, %s, 'ER', 'System', %s, %s)
-        """
-        cursor.execute(insert_sql, (normalized_path, current_datetime, row_count, current_datetime, current_datetime))
-        file_id = cursor.lastrowid
-        print(f"Đã tạo mới log trong file_log với trạng thái ER.")
-
-    conn.commit()
+    all_props = []
+    for page in range(1, first_empty):
+        all_props.extend(results[page])
+    # Chỉ báo lỗi nếu trang lỗi chính là điểm dừng (không có trang rỗng nào trước nó)
+    if failure and failure[0] == first_empty:
+        raise CrawlInterrupted(first_empty, failure[1], all_props)
+    return all_props
 
-    # ========== 4) UPDATE PROCESS_LOG → SC ==========
-    cursor.execute("""
-        UPDATE process_log
-        SET status='SC', file_id=%s, updated_at=%s
-        WHERE process_id=%s
-    """, (file_id, current_datetime, process_id))
-    conn.commit()
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawl dữ liệu BĐS từ alonhadat")
+    parser.add_argument("--pages", type=int, default=10, help="Số trang tối đa")
+    parser.add_argument("--delay", type=float, default=1.5, help="Thời gian nghỉ giữa các trang (chế độ tuần tự)")
+    parser.add_argument("--min-delay", type=float, default=None,
+                        help="Giãn cách tối thiểu giữa 2 request khi tự tăng tốc (mặc định = --delay)")
+    parser.add_argument("--workers", type=int, default=1, help="Số luồng crawl song song (1 = tuần tự)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Số request/giây tối đa cho mỗi host")
+    parser.add_argument("--burst", type=int, default=1, help="Số request được phép dồn cùng lúc")
+    parser.add_argument("--mode", choices=["incremental", "full"], default="incremental",
+                        help="incremental: dừng khi gặp trang toàn tin đã crawl; full: crawl đủ số trang (backfill)")
+    parser.add_argument("--output", choices=["parquet", "excel"], default="parquet",
+                        help="parquet: ghi từng trang vào data/snapshots/crawl_date=...; excel: gộp vào data/bds_DD_MM_YYYY.xlsx")
+    parser.add_argument("--max-retries", type=int, default=4, help="Số lần thử lại khi gặp 429/5xx")
+    parser.add_argument("--cooldown", type=float, default=60.0, help="Thời gian tạm dừng khi circuit breaker mở (giây)")
+    return parser.parse_args()
 
-    cursor.close()
-    conn.close()
+# ------------------ MAIN ------------------
+if __name__ == "__main__":
+    args = parse_args()
 
-except Exception as e:
+    control_log = get_control_log()
+    process_id = None
     try:
-        cursor.execute("""
-            UPDATE process_log
-            SET status='FL', error_message=%s, updated_at=%s
-            WHERE process_id=%s
-        """, (str(e), datetime.now(VN_TZ).strftime("%Y-%m-%d %H:%M:%S"), process_id))
-        conn.commit()
-    except:
-        pass
-
-    send_error_email("CRAWL ERROR", str(e))
-    raise
+        # ========== 1) GHI LOG BẮT ĐẦU PROCESS (PS) ==========
+        process_id = control_log.start_process('Crawl Data')
+
+        # ===== TÊN FILE THEO NGÀY =====
+        crawl_date = datetime.now(VN_TZ).strftime('%Y-%m-%d')
+        today_str_file = datetime.now(VN_TZ).strftime('%d_%m_%Y')
+        if not os.path.exists("data"):
+            os.makedirs("data")
+        if args.output == "parquet":
+            file_path = snapshot_path(crawl_date)
+            has_snapshot = snapshot_exists(crawl_date)
+            writer = SnapshotWriter(crawl_date)
+        else:
+            file_path = os.path.join("data", f"bds_{today_str_file}.xlsx")
+            has_snapshot = os.path.exists(file_path)
+            writer = None
+
+        # ========== 2) CRAWL DỮ LIỆU ==========
+        # Lần crawl đầu tiên trong ngày luôn chạy full để snapshot ngày đủ dữ liệu
+        seen_index = SeenIndex().load()
+        incremental = args.mode == "incremental" and has_snapshot
+        print(f"Chế độ crawl: {'incremental' if incremental else 'full'} ({len(seen_index)} key đã biết)")
+
+        # Ghi parquet thì mỗi trang được lưu ngay khi crawl xong
+        on_page = writer.write_page if writer else None
+        # Delay/số luồng ban đầu lấy theo tham số, sau đó tự điều chỉnh theo 429/5xx
+        controller = FetchController(max_retries=args.max_retries, delay=args.delay,
+                                     min_delay=args.min_delay, concurrency=args.workers,
+                                     max_concurrency=args.workers, cooldown=args.cooldown)
+        interrupted = None
+        try:
+            if args.workers > 1:
+                props = crawl_all_concurrent(pages=args.pages, max_workers=args.workers,
+                                             rate=args.rate, burst=args.burst,
+                                             seen_index=seen_index if incremental else None,
+                                             on_page=on_page, controller=controller)
+            else:
+                props = crawl_all(pages=args.pages, delay=args.delay,
+                                  seen_index=seen_index if incremental else None,
+                                  on_page=on_page, controller=controller)
+        except CrawlInterrupted as e:
+            # Vẫn lưu + ghi log phần đã crawl, cuối cùng mới báo lỗi
+            print(f"{e} — giữ lại {len(e.partial)} tin đã crawl.")
+            props = e.partial
+            interrupted = e
+        print(f"Thống kê fetch: {controller.stats}")
+
+        if writer:
+            # ===== SNAPSHOT PARQUET: lọc trùng Key khi đọc =====
+            row_count = count_snapshot_rows(crawl_date) if snapshot_exists(crawl_date) else 0
+            print(f"Staging đã ghi {writer.rows_written} dòng vào snapshot: {file_path}")
+        else:
+            df = pd.DataFrame(props)
+
+            # ===== Chuẩn hóa Key để tránh trùng =====
+            if not df.empty:
+                df['Key'] = df['Key'].astype(str).str.strip()
+
+            # ===== GỘP DỮ LIỆU CŨ + MỚI VÀ LỌC TRÙNG =====
+            if os.path.exists(file_path) and df.empty:
+                final_df = pd.read_excel(file_path)
+                print("Không có tin mới so với lần crawl trước.")
+            elif os.path.exists(file_path):
+                old_df = pd.read_excel(file_path)
+                old_df['Key'] = old_df['Key'].astype(str).str.strip()
+                merged_df = pd.concat([old_df, df], ignore_index=True)
+                final_df = merged_df.drop_duplicates(subset="Key", keep="last")
+            else:
+                final_df = df
+
+            # ===== LƯU FILE =====
+            final_df.to_excel(file_path, index=False, engine="xlsxwriter")
+            print(f"Staging đã lưu snapshot mới: {file_path}")
+            row_count = len(final_df)
+
+        # Chỉ cập nhật chỉ mục sau khi snapshot đã lưu thành công
+        seen_index.update(props)
+        seen_index.save()
+
+        # ------------------ GHI LOG VÀO BẢNG file_log ------------------
+        file_id = control_log.upsert_file(file_path, crawl_date, row_count, 'ER')
+        print(f"Đã ghi file_log (ID: {file_id}) với trạng thái ER.")
+
+        if interrupted:
+            raise interrupted
+
+        # ========== 4) UPDATE PROCESS_LOG → SC ==========
+        control_log.process_success(process_id, file_id)
+        control_log.flush()
+
+    except Exception as e:
+        try:
+            if process_id:
+                control_log.process_fail(process_id, str(e))
+                control_log.flush()
+        except:
+            pass
+
+        send_error_email("CRAWL ERROR", str(e))
+        raise
@@ -10,7 +10,8 @@ control_config = cfg["control"]
 conn = mysql.connector.connect(**control_config)
 cursor = conn.cursor()
 
-# DROP TABLE nếu đã tồn tại
+# DROP TABLE nếu đã tồn tại (DB đang có dữ liệu: chạy migrate_control_log.py thay vì file này)
+cursor.execute("DROP TABLE IF EXISTS crawl_lease;")
 cursor.execute("DROP TABLE IF EXISTS file_log;")
 cursor.execute("DROP TABLE IF EXISTS process_log;")
 conn.commit()
@@ -22,10 +23,11 @@ CREATE TABLE IF NOT EXISTS file_log (
     file_path VARCHAR(255),
     data_date DATE,                 
     row_count INT DEFAULT 0,       
-    status VARCHAR(50),            
+    status VARCHAR(50),             -- ER, ST/EF, TP → TR/TF, LP → OK/LF (TP/LP: work_queue đang xử lý)
     created_at DATETIME DEFAULT NOW(), 
     updated_at DATETIME DEFAULT NOW(),
-    author VARCHAR(50) DEFAULT 'System'
+    author VARCHAR(50) DEFAULT 'System',
+    INDEX idx_file_status (status, file_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 """)
 # CREATE TABLE process_log
@@ -35,14 +37,35 @@ CREATE TABLE IF NOT EXISTS process_log (
     file_id INT,                        
     process_name VARCHAR(100),          -- Tên quy trình (VD: "Load to Staging")
     status VARCHAR(20),                 -- PS, FL, SC           
+    error_message TEXT,                 -- lỗi khi status = FL
+    message TEXT,                       -- thống kê thêm khi chạy xong (số dòng, cache...)
     started_at DATETIME DEFAULT NOW(),
     updated_at DATETIME DEFAULT NOW(),
     FOREIGN KEY (file_id) REFERENCES file_log(file_id)
 );
 """)
+# CREATE TABLE crawl_lease: chia dải trang cho các crawler worker
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS crawl_lease (
+    lease_id INT PRIMARY KEY AUTO_INCREMENT,
+    data_date DATE NOT NULL,
+    page_start INT NOT NULL,
+    page_end INT NOT NULL,
+    status VARCHAR(20) DEFAULT 'PENDING',  -- PENDING, RUNNING, DONE, FL, ABORTED (lỗi quá số lần thử)
+    worker_id VARCHAR(100),
+    lease_until DATETIME,               -- hết hạn mà chưa DONE thì worker khác được lấy lại
+    attempts INT DEFAULT 0,
+    row_count INT DEFAULT 0,
+    process_id INT,
+    created_at DATETIME DEFAULT NOW(),
+    updated_at DATETIME DEFAULT NOW(),
+    UNIQUE KEY ux_date_page (data_date, page_start),
+    INDEX idx_date_status (data_date, status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+""")
 
 conn.commit()
 cursor.close()
 conn.close()
 
-print("Đã tạo bảng file_log và process_log thành công!")
+print("Đã tạo bảng file_log, process_log và crawl_lease thành công!")
@@ -1,5 +1,10 @@
 import json
 import mysql.connector
+import os, sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from loadData.scd2_merge import hashdiff_sql
 
 # --- Cấu hình Railway mới ---
 # ------------------ Load config.json ------------------
@@ -49,7 +54,7 @@ create_queries = [
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
     """,
 
-    """
+    f"""
     CREATE TABLE PropertyListing (
         sk BIGINT AUTO_INCREMENT PRIMARY KEY,
 
@@ -73,6 +78,12 @@ create_queries = [
         endDay DATE DEFAULT NULL,
         isCurrent TINYINT(1) DEFAULT 1,
 
+        -- Hash các cột SCD2 theo dõi: so 1 giá trị thay vì 11 cột
+        hashdiff CHAR(40) AS ({hashdiff_sql()}) STORED,
+
+        -- Tra bản hiện hành của 1 key + hashdiff chỉ bằng index (covering)
+        INDEX idx_listing_current (`key`, isCurrent, hashdiff),
+
         FOREIGN KEY (property_type_id) REFERENCES PropertyType(property_type_id),
         FOREIGN KEY (location_id) REFERENCES Location(location_id),
         FOREIGN KEY (date_id) REFERENCES PostingDate(date_id)
@@ -10,7 +10,7 @@ staging_config = cfg["staging"]
 conn = mysql.connector.connect(**staging_config)
 cursor = conn.cursor()
 
-# DROP TABLE
+# DROP TABLE (DB đang có dữ liệu: chạy migrate_staging.py thay vì file này)
 cursor.execute("DROP TABLE IF EXISTS Property;")
 cursor.execute("DROP TABLE IF EXISTS Property_Temp;")
 conn.commit()
@@ -35,7 +35,9 @@ CREATE TABLE IF NOT EXISTS Property_Temp (
     old_address TEXT,
     property_type TEXT,
     posting_date TEXT,
-    create_date TEXT
+    create_date TEXT,
+    data_date DATE,                 -- ngày của file nguồn, mỗi ngày là 1 phân vùng
+    INDEX idx_temp_data_date (data_date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 """)
 
@@ -59,7 +61,8 @@ CREATE TABLE IF NOT EXISTS Property (
     old_address TEXT,
     property_type VARCHAR(100),
     posting_date DATE,
-    create_date DATE
+    create_date DATE,
+    content_hash CHAR(40)           -- SHA1 các cột thô bên Property_Temp (trừ create_date), cho transform incremental
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 """)
 
@@ -0,0 +1,48 @@
+import json
+import mysql.connector
+
+# Nâng cấp control DB đã có dữ liệu (tạo bằng create_table_control.py bản cũ):
+# thêm cột error_message + message vào process_log mà ControlLog.process_fail /
+# process_success đang ghi. create_table_control.py DROP bảng trước khi tạo nên
+# không dùng được cho DB đang chạy.
+# Chạy lại nhiều lần không sao: phần nào đã có thì bỏ qua.
+
+# ------------------ Load config.json ------------------
+with open("config/config.json", "r", encoding="utf-8") as f:
+    cfg = json.load(f)
+
+control_config = cfg["control"]
+
+conn = mysql.connector.connect(**control_config)
+cursor = conn.cursor()
+
+
+def has_column(table, column):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+try:
+    if has_column("process_log", "error_message"):
+        print("process_log đã có cột error_message.")
+    else:
+        cursor.execute("""
+            ALTER TABLE process_log
+            ADD COLUMN error_message TEXT AFTER status
+        """)
+        print("Đã thêm cột error_message vào process_log.")
+
+    if has_column("process_log", "message"):
+        print("process_log đã có cột message.")
+    else:
+        cursor.execute("""
+            ALTER TABLE process_log
+            ADD COLUMN message TEXT AFTER error_message
+        """)
+        print("Đã thêm cột message vào process_log.")
+finally:
+    cursor.close()
+    conn.close()
@@ -0,0 +1,63 @@
+import json
+import mysql.connector
+import os, sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from loadData.scd2_merge import hashdiff_sql
+
+# Nâng cấp PropertyListing đã có dữ liệu (tạo bằng create_table_dw.py bản cũ):
+# thêm cột sinh sẵn hashdiff + index (`key`, isCurrent, hashdiff) cho SCD2.
+# Chạy lại nhiều lần không sao: phần nào đã có thì bỏ qua.
+
+# ------------------ Load config.json ------------------
+with open("config/config.json", "r", encoding="utf-8") as f:
+    cfg = json.load(f)
+
+dw_config = cfg["datawarehouse"]
+
+conn = mysql.connector.connect(**dw_config)
+cursor = conn.cursor()
+
+
+def has_column(table, column):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+def has_index(table, index):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+
+try:
+    # Cột STORED được tính cho mọi dòng hiện có ngay trong câu ALTER (rebuild bảng)
+    if has_column("PropertyListing", "hashdiff"):
+        print("PropertyListing đã có cột hashdiff.")
+    else:
+        cursor.execute(f"""
+            ALTER TABLE PropertyListing
+            ADD COLUMN hashdiff CHAR(40) AS ({hashdiff_sql()}) STORED
+        """)
+        print("Đã thêm cột hashdiff vào PropertyListing.")
+
+    if has_index("PropertyListing", "idx_listing_current"):
+        print("PropertyListing đã có index idx_listing_current.")
+    else:
+        cursor.execute("""
+            ALTER TABLE PropertyListing
+            ADD INDEX idx_listing_current (`key`, isCurrent, hashdiff)
+        """)
+        print("Đã tạo index idx_listing_current (`key`, isCurrent, hashdiff).")
+
+    cursor.execute("SELECT COUNT(*), SUM(isCurrent = 1) FROM PropertyListing")
+    total, current = cursor.fetchone()
+    print(f"PropertyListing: {total} dòng lịch sử, {current or 0} bản hiện hành.")
+finally:
+    cursor.close()
+    conn.close()
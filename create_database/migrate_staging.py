@@ -0,0 +1,78 @@
+import json
+import mysql.connector
+
+# Nâng cấp staging DB đã có dữ liệu (tạo bằng create_table_stagging.py bản cũ):
+# - thêm cột data_date (phân vùng theo ngày của file nguồn) + index vào
+#   Property_Temp mà load_data_stagging.py / backfill đang ghi;
+# - thêm cột content_hash vào Property cho transform --incremental. Dòng cũ để
+#   NULL: incremental coi NULL là "đã đổi" (<=>) nên lần chạy đầu transform lại
+#   các key đó 1 lần và ghi hash đúng, từ lần sau mới bỏ qua key không đổi.
+# create_table_stagging.py DROP bảng trước khi tạo nên không dùng được cho DB đang chạy.
+# Chạy lại nhiều lần không sao: phần nào đã có thì bỏ qua.
+
+# ------------------ Load config.json ------------------
+with open("config/config.json", "r", encoding="utf-8") as f:
+    cfg = json.load(f)
+
+staging_config = cfg["staging"]
+
+conn = mysql.connector.connect(**staging_config)
+cursor = conn.cursor()
+
+
+def has_column(table, column):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+def has_index(table, index):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+
+try:
+    # ------------------ Property_Temp.data_date ------------------
+    if has_column("Property_Temp", "data_date"):
+        print("Property_Temp đã có cột data_date.")
+    else:
+        cursor.execute("ALTER TABLE Property_Temp ADD COLUMN data_date DATE")
+        print("Đã thêm cột data_date vào Property_Temp.")
+
+    # Bản cũ TRUNCATE mỗi lần load nên dòng đang có là của 1 file, ngày cào (create_date)
+    # chính là ngày của file đó
+    cursor.execute("""
+        UPDATE Property_Temp SET data_date = STR_TO_DATE(create_date, %s)
+        WHERE data_date IS NULL AND create_date IS NOT NULL
+    """, ("%Y-%m-%d",))
+    conn.commit()
+    print(f"Đã gán data_date cho {cursor.rowcount} dòng Property_Temp cũ.")
+
+    if has_index("Property_Temp", "idx_temp_data_date"):
+        print("Property_Temp đã có index idx_temp_data_date.")
+    else:
+        cursor.execute("ALTER TABLE Property_Temp ADD INDEX idx_temp_data_date (data_date)")
+        print("Đã tạo index idx_temp_data_date (data_date).")
+
+    cursor.execute("SELECT COUNT(*), SUM(data_date IS NULL) FROM Property_Temp")
+    total, missing = cursor.fetchone()
+    print(f"Property_Temp: {total} dòng, {missing or 0} dòng chưa có data_date.")
+
+    # ------------------ Property.content_hash ------------------
+    if has_column("Property", "content_hash"):
+        print("Property đã có cột content_hash.")
+    else:
+        cursor.execute("ALTER TABLE Property ADD COLUMN content_hash CHAR(40)")
+        print("Đã thêm cột content_hash vào Property.")
+
+    cursor.execute("SELECT COUNT(*), SUM(content_hash IS NULL) FROM Property")
+    total, missing = cursor.fetchone()
+    print(f"Property: {total} dòng, {missing or 0} dòng chưa có content_hash "
+          "(lần transform --incremental đầu tiên sẽ tính lại).")
+finally:
+    cursor.close()
+    conn.close()
@@ -0,0 +1,133 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import mysql.connector
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from template.notification import send_error_email
+from template.control_log import get_control_log
+from craw_data.snapshot_store import SNAPSHOT_ROOT, snapshot_exists, snapshot_path, read_snapshot
+from loadData.bulk_loader import bulk_load
+from loadData.staging_rows import PROPERTY_TEMP_COLUMNS, build_property_rows
+from loadData.xlsx_reader import iter_xlsx_batches
+
+# Chạy gửi mail báo lỗi tại local
+env_path = os.path.join(os.path.dirname(__file__), '.env')
+load_dotenv(env_path)
+
+XLSX_NAME = re.compile(r"bds_(\d{2})_(\d{2})_(\d{4})\.xlsx$")
+SNAPSHOT_NAME = re.compile(r"crawl_date=(\d{4}-\d{2}-\d{2})$")
+
+# Nạp lại các ngày cũ vào Property_Temp: mỗi file là 1 phân vùng data_date,
+# nhiều file được đọc + load song song trong process pool, mỗi file ghi 1 dòng file_log (ST/EF).
+
+
+def load_config():
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# ------------------ TÌM FILE ------------------
+def find_sources(start=None, end=None, data_dir="data"):
+    """
+    Trả về [(data_date, path)] trong khoảng [start, end] (YYYY-MM-DD), sắp theo ngày.
+    Ngày nào có snapshot parquet thì ưu tiên snapshot, giống load_data_stagging.py.
+    """
+    sources = {}
+    for path in glob.glob(os.path.join(data_dir, "bds_*.xlsx")):
+        m = XLSX_NAME.search(os.path.basename(path))
+        if m:
+            day, month, year = m.groups()
+            sources[f"{year}-{month}-{day}"] = path
+    for path in glob.glob(os.path.join(SNAPSHOT_ROOT, "crawl_date=*")):
+        m = SNAPSHOT_NAME.search(os.path.basename(path))
+        if m and snapshot_exists(m.group(1)):
+            sources[m.group(1)] = snapshot_path(m.group(1))
+
+    return [(d, p) for d, p in sorted(sources.items())
+            if (not start or d >= start) and (not end or d <= end)]
+
+# ------------------ LOAD 1 FILE (chạy trong process con) ------------------
+def load_source(data_date, path, method="insert", batch_size=1000, chunk_size=5000):
+    cfg = load_config()
+    conn = mysql.connector.connect(**cfg["staging"], allow_local_infile=(method == "infile"))
+    cursor = conn.cursor()
+    # Mỗi process con có ControlLog (pool) riêng
+    control_log = get_control_log()
+    process_id = control_log.start_process(f"Backfill Staging [{data_date}]")
+    try:
+        cursor.execute("DELETE FROM Property_Temp WHERE data_date = %s", (data_date,))
+        conn.commit()
+
+        if os.path.isdir(path):
+            batches = [read_snapshot(data_date)]
+        else:
+            batches = iter_xlsx_batches(path, chunk_size)
+
+        row_count = 0
+        for df in batches:
+            df.columns = df.columns.str.strip()
+            rows = build_property_rows(df, data_date)
+            row_count += bulk_load(conn, cursor, "Property_Temp", PROPERTY_TEMP_COLUMNS, rows,
+                                   method=method, batch_size=batch_size,
+                                   label=f"Property_Temp [{data_date}]")
+
+        # Chạy backfill lại cùng 1 ngày thì cập nhật dòng file_log cũ thay vì thêm dòng mới
+        file_id = control_log.upsert_file(path, data_date, row_count, "ST")
+        control_log.process_success(process_id, file_id)
+        return data_date, path, row_count, None
+    except Exception as e:
+        conn.rollback()
+        file_id = control_log.upsert_file(path, data_date, 0, "EF")
+        control_log.process_fail(process_id, str(e), file_id=file_id)
+        return data_date, path, 0, str(e)
+    finally:
+        cursor.close()
+        conn.close()
+        control_log.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill các file bds_*.xlsx / snapshot cũ vào staging")
+    parser.add_argument("--start", help="Ngày bắt đầu YYYY-MM-DD (mặc định: file cũ nhất)")
+    parser.add_argument("--end", help="Ngày kết thúc YYYY-MM-DD (mặc định: file mới nhất)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Số dòng mỗi lô INSERT")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Số dòng đọc từ file Excel mỗi lô")
+    parser.add_argument("--method", choices=["insert", "infile"], default="insert")
+    parser.add_argument("--dry-run", action="store_true", help="Chỉ liệt kê các file sẽ được load")
+    args = parser.parse_args()
+
+    sources = find_sources(args.start, args.end)
+    if not sources:
+        print("Không có file nào trong khoảng ngày đã chọn.")
+        sys.exit(0)
+    for data_date, path in sources:
+        print(f"  {data_date}: {path}")
+    if args.dry_run:
+        sys.exit(0)
+
+    failures = []
+    total = 0
+    with ProcessPoolExecutor(max_workers=min(args.processes, len(sources))) as pool:
+        futures = [pool.submit(load_source, data_date, path, args.method, args.batch_size, args.chunk_size)
+                   for data_date, path in sources]
+        for future in as_completed(futures):
+            data_date, path, row_count, error = future.result()
+            if error:
+                failures.append(f"{data_date} ({path}): {error}")
+                print(f"Lỗi backfill {data_date}: {error}")
+            else:
+                total += row_count
+                print(f"Xong {data_date}: {row_count} dòng từ {path}")
+
+    print(f"Backfill {len(sources) - len(failures)}/{len(sources)} ngày, tổng {total} dòng.")
+    if failures:
+        send_error_email("Backfill Staging Failed", "\n".join(failures))
+        sys.exit(1)
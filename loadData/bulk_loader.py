@@ -0,0 +1,79 @@
+import os
+import tempfile
+import time
+
+import mysql.connector
+
+
+# ------------------ INSERT THEO LÔ ------------------
+def insert_batches(conn, cursor, table, columns, rows, batch_size=1000, label=None):
+    """
+    Insert rows (list tuple) theo từng lô batch_size dòng. mysql-connector gộp
+    executemany của câu INSERT thành 1 câu INSERT nhiều dòng, nên mỗi lô chỉ
+    tốn 1 round trip thay vì 1 round trip / dòng.
+    """
+    col_sql = ", ".join(f"`{c}`" for c in columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    sql = f"INSERT INTO {table} ({col_sql}) VALUES ({placeholders})"
+
+    total = len(rows)
+    label = label or table
+    start = time.perf_counter()
+    for offset in range(0, total, batch_size):
+        batch = rows[offset:offset + batch_size]
+        cursor.executemany(sql, batch)
+        done = offset + len(batch)
+        elapsed = time.perf_counter() - start
+        print(f"Đã load {done}/{total} dòng vào {label} ({done / elapsed:,.0f} dòng/s)")
+    conn.commit()
+    return total
+
+
+# ------------------ LOAD DATA LOCAL INFILE ------------------
+def _csv_field(value):
+    if value is None:
+        return "NULL"
+    return '"' + str(value).replace('"', '""') + '"'
+
+def write_temp_csv(rows):
+    """Ghi rows ra file CSV tạm theo đúng định dạng câu LOAD DATA bên dưới"""
+    fd, path = tempfile.mkstemp(prefix="load_", suffix=".csv")
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+        for row in rows:
+            f.write(",".join(_csv_field(v) for v in row))
+            f.write("\n")
+    return path
+
+def load_data_infile(conn, cursor, table, columns, rows, label=None):
+    """
+    Đẩy toàn bộ rows qua 1 câu LOAD DATA LOCAL INFILE. Kết nối phải được mở với
+    allow_local_infile=True và server bật local_infile.
+    """
+    label = label or table
+    path = write_temp_csv(rows)
+    try:
+        col_sql = ", ".join(f"`{c}`" for c in columns)
+        start = time.perf_counter()
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '\\n'
+            ({col_sql})
+        """, (path.replace("\\", "/"),))
+        conn.commit()
+        elapsed = time.perf_counter() - start
+        print(f"Đã load {len(rows)} dòng vào {label} bằng LOAD DATA ({len(rows) / max(elapsed, 1e-9):,.0f} dòng/s)")
+        return len(rows)
+    finally:
+        os.remove(path)
+
+def bulk_load(conn, cursor, table, columns, rows, method="insert", batch_size=1000, label=None):
+    """method='infile' thử LOAD DATA trước, server không cho thì quay về insert theo lô"""
+    if method == "infile":
+        try:
+            return load_data_infile(conn, cursor, table, columns, rows, label)
+        except mysql.connector.Error as e:
+            conn.rollback()
+            print(f"LOAD DATA LOCAL INFILE không dùng được ({e}), chuyển sang insert theo lô.")
+    return insert_batches(conn, cursor, table, columns, rows, batch_size, label)
@@ -0,0 +1,133 @@
+import unicodedata
+from datetime import datetime
+from functools import lru_cache
+
+# Tra surrogate key cho các dimension của DW (PropertyType, Location, PostingDate)
+# bằng map natural key → id nạp sẵn trong bộ nhớ 1 lần mỗi lần chạy, thay cho
+# SELECT (+ INSERT) từng dòng staging. Member chưa có được gom lại và INSERT
+# 1 câu cho mỗi dimension.
+#
+# So khớp trong bộ nhớ theo cùng luật với collation utf8mb4 *_ai_ci của bảng
+# dimension (như câu SELECT ... WHERE col = %s cũ): không phân biệt hoa/thường,
+# dấu ("Quận 1" = "quan 1", "đ" = "d") và khoảng trắng cuối chuỗi — xem
+# collation_key. Riêng NULL được coi là bằng NULL (như <=>), nên Location có cột
+# NULL không còn bị INSERT thêm 1 dòng mới mỗi lần gặp. Member mới được INSERT
+# bằng giá trị gặp đầu tiên, các biến thể hoa/thường/dấu sau đó dùng chung id.
+
+CACHE_SIZE = 100_000
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _fold_text(value):
+    # NFD tách dấu thành ký tự kết hợp rồi bỏ đi; "đ" không tách được nên map tay
+    value = unicodedata.normalize("NFD", value.casefold().replace("đ", "d"))
+    return "".join(c for c in value if not unicodedata.combining(c)).rstrip(" ")
+
+def collation_key(key):
+    """Tuple natural key → dạng so khớp như *_ai_ci; giá trị không phải chuỗi (ngày, NULL) giữ nguyên"""
+    return tuple(_fold_text(v) if isinstance(v, str) else v for v in key)
+
+
+class DimensionCache:
+    def __init__(self, table, id_col, natural_cols):
+        self.table = table
+        self.id_col = id_col
+        self.natural_cols = natural_cols
+        self.ids = {}
+        self.pending = {}
+        self.max_id = 0
+        self.hits = 0
+        self.inserted = 0
+
+    def load(self, cursor, after_id=0):
+        """Nạp (hoặc nạp thêm các dòng có id > after_id) map natural key → id"""
+        cols = ", ".join(self.natural_cols)
+        cursor.execute(f"""
+            SELECT {self.id_col}, {cols} FROM {self.table}
+            WHERE {self.id_col} > %s ORDER BY {self.id_col}
+        """, (after_id,))
+        for row in cursor.fetchall():
+            # Trùng natural key (theo collation) trong bảng thì giữ id nhỏ nhất
+            self.ids.setdefault(collation_key(row[1:]), row[0])
+            self.max_id = max(self.max_id, row[0])
+
+    def collect(self, key):
+        folded = collation_key(key)
+        if folded not in self.ids:
+            self.pending.setdefault(folded, key)
+
+    def insert_pending(self, cursor):
+        """INSERT các member chưa có (1 câu nhiều dòng), rồi nạp lại id của chúng"""
+        if not self.pending:
+            return 0
+        cols = ", ".join(self.natural_cols)
+        placeholders = ", ".join(["%s"] * len(self.natural_cols))
+        cursor.executemany(f"INSERT INTO {self.table} ({cols}) VALUES ({placeholders})",
+                           sorted(self.pending.values(), key=repr))
+        self.load(cursor, self.max_id)
+        count = len(self.pending)
+        self.inserted += count
+        self.pending.clear()
+        return count
+
+    def resolve(self, key, new_keys):
+        folded = collation_key(key)
+        if folded not in new_keys:
+            self.hits += 1
+        return self.ids[folded]
+
+
+# ------------------ NATURAL KEY CỦA 1 DÒNG STAGING ------------------
+def property_type_key(row):
+    return (row["property_type"] or "Unknown",)
+
+def location_key(row):
+    return (row["street"], row["ward"], row["district"], row["city"], row["old_address"])
+
+def posting_date_key(row):
+    return (row["posting_date"] or datetime.today().date(),)
+
+
+class DimensionResolver:
+    def __init__(self, conn):
+        self.conn = conn
+        self.dimensions = [
+            (DimensionCache("PropertyType", "property_type_id", ["type_name"]), property_type_key),
+            (DimensionCache("Location", "location_id",
+                            ["street", "ward", "district", "city", "old_address"]), location_key),
+            (DimensionCache("PostingDate", "date_id", ["posting_date"]), posting_date_key),
+        ]
+        cursor = conn.cursor()
+        try:
+            for cache, _ in self.dimensions:
+                cache.load(cursor)
+        finally:
+            cursor.close()
+
+    def resolve_rows(self, rows):
+        """
+        Trả về [(property_type_id, location_id, date_id)] theo thứ tự rows.
+        Member mới được INSERT trên self.conn nhưng chưa commit — commit cùng bảng fact.
+        """
+        cursor = self.conn.cursor()
+        try:
+            new_keys = []
+            for cache, key_of in self.dimensions:
+                for row in rows:
+                    cache.collect(key_of(row))
+                new_keys.append(set(cache.pending))
+                cache.insert_pending(cursor)
+        finally:
+            cursor.close()
+
+        return [tuple(cache.resolve(key_of(row), new)
+                      for (cache, key_of), new in zip(self.dimensions, new_keys))
+                for row in rows]
+
+    def stats(self):
+        return {cache.table: {"hits": cache.hits, "inserted": cache.inserted, "size": len(cache.ids)}
+                for cache, _ in self.dimensions}
+
+    def format_stats(self):
+        return "; ".join(f"{table}: {s['hits']} hit, {s['inserted']} inserted, {s['size']} cached"
+                         for table, s in self.stats().items())
@@ -0,0 +1,100 @@
+from loadData.dimension_cache import DimensionResolver
+from loadData.scd2_merge import fact_rows, merge_rows, merge_set, format_stats as format_scd2_stats
+from loadData.xlsx_reader import prefetch
+
+# Load staging Property → DW (dimension + PropertyListing SCD2) trên 2 kết nối có
+# sẵn, dùng chung cho load_data_datawarehouse.py (1 file) và work_queue.py (nhiều
+# file liên tiếp trên cùng kết nối).
+#
+# pipeline=True: 1 thread đọc Property bằng cursor không buffer (server trả dần
+# từng lô batch_size dòng) vào queue giới hạn, thread chính vừa nhận vừa tra
+# dimension + merge SCD2 từng lô lên DW. Đọc staging và ghi DW chạy chồng lên
+# nhau, bộ nhớ chỉ cỡ vài lô thay vì cả bảng.
+
+PIPELINE_DEPTH = 2
+
+
+def fetch_all(staging_conn):
+    cursor = staging_conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT * FROM Property;")
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+def stream_staging(staging_conn, batch_size):
+    """Sinh từng lô dòng Property; chỉ dùng kết nối staging trong thread đang đọc"""
+    cursor = staging_conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT * FROM Property;")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        # Dừng giữa chừng: đọc nốt phần còn lại để kết nối dùng lại được
+        staging_conn.consume_results()
+        cursor.close()
+
+def load_dw(staging_conn, dw_conn, scd2="set", resolver=None, pipeline=False, batch_size=5000):
+    """
+    Trả về (stats SCD2, resolver). Truyền lại resolver của lần load trước (đã
+    commit) để khỏi nạp lại dimension; lần load lỗi thì bỏ resolver đó đi vì
+    id các member mới đã bị rollback. Cả lần load là 1 transaction trên DW.
+    """
+    # ------------------ LOAD FROM STAGING ------------------
+    if pipeline:
+        stream = stream_staging(staging_conn, batch_size)
+        batches = prefetch(stream, PIPELINE_DEPTH)
+    else:
+        batches = [fetch_all(staging_conn)]
+        print(f"Fetched {len(batches[0])} rows from staging DB.")
+
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+    total = 0
+    try:
+        # ------------------ DIM (cache trong bộ nhớ) ------------------
+        # Nạp sẵn natural key → id của 3 dimension, member mới INSERT 1 lần mỗi bảng (mỗi lô)
+        resolver = resolver or DimensionResolver(dw_conn)
+        for staging_data in batches:
+            dim_ids = resolver.resolve_rows(staging_data)
+
+            # ------------------ FACT PropertyListing (SCD2) ------------------
+            rows = fact_rows(staging_data, dim_ids)
+            if scd2 == "row":
+                batch_stats = merge_rows(dw_conn, rows)
+            else:
+                # Đóng bản cũ + thêm bản mới bằng vài câu SQL trên bảng tạm, không lặp từng key
+                batch_stats = merge_set(dw_conn, rows)
+            for k in stats:
+                stats[k] += batch_stats[k]
+            total += len(staging_data)
+            if pipeline:
+                print(f"Đã merge {total} dòng vào DW ({format_scd2_stats(stats)})")
+
+        print(f"Dimension: {resolver.format_stats()}")
+        print(format_scd2_stats(stats))
+
+        # ------------------ Commit ------------------
+        dw_conn.commit()
+    except Exception:
+        dw_conn.rollback()
+        raise
+    finally:
+        # Lỗi khi dọn kết nối staging không được che mất lỗi gốc của lần load
+        # (process_log + mail phải báo đúng lỗi), kết nối hỏng sẽ được ping lại ở file sau
+        try:
+            if pipeline:
+                # Dừng thread đọc (nếu ghi DW lỗi giữa chừng) rồi đóng stream để đọc nốt
+                # kết quả còn dở, trước khi dùng lại kết nối staging
+                batches.close()
+                stream.close()
+            # Kết nối được dùng lại nhiều lần: kết thúc transaction đọc để lần sau thấy dữ liệu mới
+            staging_conn.commit()
+        except Exception as e:
+            print(f"Không dọn được kết nối staging: {e}")
+    return stats, resolver
+
+def format_stats(stats, resolver):
+    return f"{format_scd2_stats(stats)}; {resolver.format_stats()}"
@@ -1,5 +1,5 @@
+import argparse
 import json
-import pandas as pd
 import mysql.connector
 from datetime import datetime
 from zoneinfo import ZoneInfo 
@@ -9,6 +9,12 @@ from dotenv import load_dotenv
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ROOT_DIR)
 from template.notification import send_error_email
+from template.control_log import get_control_log
+from template.table_swap import prepare_shadow, discard_shadow, publish_partition
+from craw_data.snapshot_store import snapshot_exists, snapshot_path, read_snapshot
+from loadData.bulk_loader import bulk_load
+from loadData.staging_rows import PROPERTY_TEMP_COLUMNS, build_property_rows
+from loadData.xlsx_reader import iter_xlsx_batches, prefetch
 
 # Chạy gửi mail báo lỗi tại local
 env_path = os.path.join(os.path.dirname(__file__), '.env')
@@ -16,164 +22,92 @@ load_dotenv(env_path)
 
 VN_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
 
+parser = argparse.ArgumentParser(description="Load dữ liệu crawl vào Property_Temp")
+parser.add_argument("--batch-size", type=int, default=1000, help="Số dòng mỗi lô INSERT")
+parser.add_argument("--method", choices=["insert", "infile"], default="insert",
+                    help="insert: INSERT nhiều dòng theo lô; infile: LOAD DATA LOCAL INFILE từ CSV tạm")
+parser.add_argument("--chunk-size", type=int, default=5000, help="Số dòng đọc từ file Excel mỗi lô")
+parser.add_argument("--swap", action="store_true",
+                    help="Load ngày hôm nay vào Property_Temp_next rồi thay đúng phân vùng đó trong 1 transaction "
+                         "(bản cũ của ngày giữ ở Property_Temp_old)")
+args = parser.parse_args()
+
 # ===== Load cấu hình từ config.json =====
 with open("config/config.json", "r", encoding="utf-8") as f:
     config_all = json.load(f)
 
 staging_cfg = config_all["staging"]
-control_cfg = config_all["control"]
 
 # DB Staging
-conn = mysql.connector.connect(**staging_cfg)
+conn = mysql.connector.connect(**staging_cfg, allow_local_infile=(args.method == "infile"))
 cursor = conn.cursor()
 
 # DB Control
-ctl_conn = mysql.connector.connect(**control_cfg)
-ctl_cursor = ctl_conn.cursor()
-
-# ============================
-#  HÀM GHI LOG
-# ============================
-def normalize_path(path: str) -> str:
-    return path.replace("\\", "/")
-
-def now_vn_str():
-    return datetime.now(VN_TZ).strftime('%Y-%m-%d %H:%M:%S')
-
-def start_process_log(process_name, file_id=None):
-    now_str = now_vn_str()
-    sql = """
-        INSERT INTO process_log (file_id, process_name, status, started_at, updated_at)
-        VALUES (%s, %s, 'PS', %s, %s)
-    """
-    ctl_cursor.execute(sql, (file_id, process_name, now_str, now_str))
-    ctl_conn.commit()
-    return ctl_cursor.lastrowid
-
-def update_process_success(process_id, file_id): 
-    now_str = now_vn_str()
-    sql = """
-        UPDATE process_log 
-        SET status='SC', file_id=%s, updated_at=%s 
-        WHERE process_id=%s
-    """
-    ctl_cursor.execute(sql, (file_id, now_str, process_id))
-    ctl_conn.commit()
-
-def update_process_fail(process_id, error_msg):
-    now_str = now_vn_str()
-    sql = """
-        UPDATE process_log 
-        SET status='FL', updated_at=%s, error_msg=%s
-        WHERE process_id=%s
-    """
-    ctl_cursor.execute(sql, (now_str, error_msg, process_id))
-    ctl_conn.commit()
-
-def create_file_log(file_path, row_count, status):
-    now_str = now_vn_str()
-    sql = """
-        INSERT INTO file_log (file_path, data_date, row_count, status, created_at, updated_at)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    """
-    ctl_cursor.execute(sql, (normalize_path(file_path), now_str[:10], row_count, status, now_str, now_str))
-    ctl_conn.commit()
-    return ctl_cursor.lastrowid
-
-def update_file_log(file_id, status):
-    now_str = now_vn_str()
-    sql = "UPDATE file_log SET status=%s, updated_at=%s WHERE file_id=%s"
-    ctl_cursor.execute(sql, (status, now_str, file_id))
-    ctl_conn.commit()
+control_log = get_control_log()
 
 # ============================
 # MAIN LOAD DATA
 # ============================
-process_id = start_process_log("Load to Staging")
+process_id = control_log.start_process("Load to Staging")
+today_str = datetime.now(VN_TZ).strftime('%d_%m_%Y')
+crawl_date = datetime.now(VN_TZ).strftime('%Y-%m-%d')
+file_name = f"bds_{today_str}.xlsx"
+file_path = os.path.join("data", file_name)
 
 try:
-    today_str = datetime.now(VN_TZ).strftime('%d_%m_%Y')
-    file_name = f"bds_{today_str}.xlsx"
-    file_path = os.path.join("data", file_name)
-
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File {file_path} không tồn tại!")
-
-    print(f"Đang đọc file: {file_path}")
-    df = pd.read_excel(file_path, engine='openpyxl')
-    df.columns = df.columns.str.strip()
-
-    bedroom_col = next((c for c in df.columns if "PN" in c or "Phòng ngủ" in c), "PN")
-    area_col = next((c for c in df.columns if "DT" in c or "Diện tích" in c), "DT")
-
-    def parse_date(val):
-        if pd.isna(val):
-            return None
-        if isinstance(val, datetime):
-            return val.astimezone(VN_TZ).strftime('%Y-%m-%d')
-        try:
-            return pd.to_datetime(val).tz_localize('UTC').astimezone(VN_TZ).strftime('%Y-%m-%d')
-        except:
-            return None
-
-    if 'Ngày đăng' in df.columns:
-        df['Ngày đăng'] = df['Ngày đăng'].apply(parse_date)
-    if 'Ngày cào' in df.columns:
-        df['Ngày cào'] = df['Ngày cào'].apply(parse_date)
-
-    cursor.execute("TRUNCATE TABLE Property_Temp")
-    print("Đã làm sạch bảng Property_Temp.")
-
-    insert_query = """
-    INSERT INTO Property_Temp 
-    (`key`, url, create_date, name, price, area, old_address, street, ward, district, city, bedrooms, floors, street_width, description, posting_date, property_type)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
-
-    def clean_text(val, default="N/A"):
-        if pd.isna(val):
-            return default
-        val = str(val).strip()
-        if val == "" or val.lower() == "nan":
-            return default
-        return val
-
-    for idx, row in df.iterrows():
-        cursor.execute(insert_query, (
-            clean_text(row.get('Key')),
-            clean_text(row.get('URL')),
-            parse_date(row.get('Ngày cào')),
-            clean_text(row.get('Tên')),
-            clean_text(row.get('Giá')),
-            clean_text(row.get(area_col)),
-            clean_text(row.get('Địa chỉ')),
-            clean_text(row.get('Đường')) if 'Đường' in df.columns else 'N/A',
-            clean_text(row.get('Phường')),
-            clean_text(row.get('Quận')),
-            clean_text(row.get('Thành phố', 'Hồ Chí Minh')),
-            clean_text(row.get(bedroom_col)),
-            clean_text(row.get('Tầng')),
-            clean_text(row.get('Lộ giới')),
-            clean_text(row.get('Mô tả')),
-            parse_date(row.get('Ngày đăng')),
-            clean_text(row.get('Loại nhà', 'Khác'))
-        ))
-        print(f"Đã load row {idx + 1}/{len(df)}: {row.get('Tên', 'N/A')}")
-    conn.commit()
-
-    file_id = create_file_log(file_path, len(df), "ST")
-    update_process_success(process_id, file_id)
-    print(f"Đã load {len(df)} dòng vào bảng 'Property_Temp'.")
+
+    # Ưu tiên snapshot parquet của crawler, không có thì đọc file Excel cũ
+    if snapshot_exists(crawl_date):
+        file_path = snapshot_path(crawl_date)
+        print(f"Đang đọc snapshot: {file_path}")
+        batches = [read_snapshot(crawl_date)]
+    else:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File {file_path} không tồn tại!")
+
+        print(f"Đang đọc file: {file_path}")
+        # Đọc từng lô: lô đầu đã vào MySQL trong khi phần sau của file còn đang đọc
+        batches = prefetch(iter_xlsx_batches(file_path, args.chunk_size))
+
+    target = "Property_Temp"
+    if args.swap:
+        # Bảng nháp chỉ chứa ngày hôm nay, các ngày khác không bị chép lại; Property_Temp
+        # vẫn đọc được bình thường trong lúc load
+        target = prepare_shadow(cursor, "Property_Temp")
+    else:
+        # Chỉ thay phân vùng của ngày hôm nay, các ngày backfill khác giữ nguyên
+        cursor.execute("DELETE FROM Property_Temp WHERE data_date = %s", (crawl_date,))
+        conn.commit()
+        print(f"Đã xóa dữ liệu cũ ngày {crawl_date} trong bảng Property_Temp.")
+
+    row_count = 0
+    for i, df in enumerate(batches, start=1):
+        df.columns = df.columns.str.strip()
+        rows = build_property_rows(df, crawl_date)
+        row_count += bulk_load(conn, cursor, target, PROPERTY_TEMP_COLUMNS, rows,
+                               method=args.method, batch_size=args.batch_size,
+                               label=f"{target} (lô file {i})")
+        print(f"Tổng cộng đã load {row_count} dòng.")
+
+    if args.swap:
+        publish_partition(conn, cursor, "Property_Temp", "data_date", crawl_date,
+                          PROPERTY_TEMP_COLUMNS, "temp_id")
+
+    file_id = control_log.create_file(file_path, crawl_date, row_count, "ST")
+    control_log.process_success(process_id, file_id)
+    print(f"Đã load {row_count} dòng vào bảng 'Property_Temp'.")
 
 except Exception as e:
     error_msg = str(e)
-    update_process_fail(process_id, error_msg)
-    file_id = create_file_log(file_path, 0, "EF")
+    if args.swap:
+        # Bảng đang chạy chưa bị đụng tới, chỉ cần bỏ bản load dở
+        discard_shadow(cursor, "Property_Temp")
+    control_log.process_fail(process_id, error_msg)
+    file_id = control_log.create_file(file_path, crawl_date, 0, "EF")
     send_error_email("Load Staging Failed", error_msg)
     print("Lỗi:", error_msg)
 
 finally:
     cursor.close()
     conn.close()
-    ctl_cursor.close()
-    ctl_conn.close()
+    control_log.flush()
@@ -0,0 +1,185 @@
+from datetime import datetime
+
+# SCD2 cho bảng fact PropertyListing, 2 cách cho cùng 1 kết quả:
+# - merge_rows: cách cũ, mỗi key 1 SELECT bản isCurrent + so sánh trong Python
+#   + UPDATE/INSERT riêng → O(số dòng) round trip.
+# - merge_set: chép cả lô vào bảng tạm scd2_work trên DW rồi phân loại bằng so
+#   hashdiff, đóng bản cũ bằng 1 UPDATE ... JOIN và thêm bản mới bằng 1 INSERT ... SELECT.
+# Cả 2 đều không commit: dimension + fact được commit chung 1 transaction ở caller.
+
+FACT_COLUMNS = [
+    "key", "url", "create_date", "name", "price", "area", "bedrooms", "floors",
+    "description", "street_width", "property_type_id", "location_id", "date_id",
+]
+# Các cột so sánh để biết tin có đổi hay không (giống has_changes cũ)
+TRACKED_COLUMNS = [
+    "url", "name", "price", "area", "bedrooms", "floors",
+    "description", "street_width",
+    "property_type_id", "location_id", "date_id",
+]
+BATCH_SIZE = 1000
+WORK_TABLE = "scd2_work"
+
+
+def hashdiff_sql():
+    """
+    Biểu thức SHA1 của TRACKED_COLUMNS, dùng cho cột sinh sẵn (STORED) hashdiff
+    của PropertyListing và bảng tạm scd2_work. Chuỗi được băm theo đúng từng byte
+    (khác hoa/thường hay khoảng trắng cuối vẫn là thay đổi, như != của Python),
+    NULL thay bằng CHAR(0) để khác với chuỗi rỗng.
+    """
+    parts = ", ".join(f"COALESCE(CAST(`{c}` AS CHAR), CHAR(0))" for c in TRACKED_COLUMNS)
+    return f"SHA1(CONCAT_WS(CHAR(31), {parts}))"
+
+
+def fact_rows(staging_rows, dim_ids):
+    """Dòng staging Property + (property_type_id, location_id, date_id) → tuple theo FACT_COLUMNS"""
+    today = datetime.today().date()
+    rows = []
+    for row, (property_type_id, location_id, date_id) in zip(staging_rows, dim_ids):
+        rows.append((
+            row["key"], row["url"], row["create_date"] or today, row["name"],
+            row["price"], row["area"], row["bedrooms"], row["floors"],
+            row["description"], row["street_width"],
+            property_type_id, location_id, date_id,
+        ))
+    return rows
+
+def _insert_sql(target):
+    col_sql = ", ".join(f"`{c}`" for c in FACT_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(FACT_COLUMNS))
+    return f"INSERT INTO {target} ({col_sql}, startDay, isCurrent) VALUES ({placeholders}, CURDATE(), 1)"
+
+
+# ------------------ TỪNG DÒNG (cách cũ) ------------------
+def has_changes(old, new):
+    for f in TRACKED_COLUMNS:
+        if old[f] != new[f]:
+            return True
+    return False
+
+def merge_rows(conn, rows, target="PropertyListing", verbose=True):
+    cursor = conn.cursor(dictionary=True)
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+    try:
+        for values in rows:
+            new_record = dict(zip(FACT_COLUMNS, values))
+            key = new_record["key"]
+            cursor.execute(f"SELECT * FROM {target} WHERE `key`=%s AND isCurrent=1", (key,))
+            old_record = cursor.fetchone()
+            cursor.fetchall()
+
+            # ---------- B1: Nếu không có record cũ → insert mới (TH tin lần đầu xuất hiện) ----------
+            if not old_record:
+                cursor.execute(_insert_sql(target), values)
+                stats["inserted"] += 1
+                continue
+
+            # ---------- B2: Nếu có record cũ nhưng dữ liệu KHÔNG đổi → bỏ qua ----------
+            if not has_changes(old_record, new_record):
+                if verbose:
+                    print(f"SKIP: No change for key = {key}")
+                stats["unchanged"] += 1
+                continue
+
+            # ---------- B3: Nếu dữ liệu thay đổi → đóng bản cũ + tạo bản mới ----------
+            if verbose:
+                print(f"UPDATE: Changes detected → key = {key}")
+            cursor.execute(f"UPDATE {target} SET endDay = CURDATE(), isCurrent = 0 WHERE sk = %s",
+                           (old_record["sk"],))
+            cursor.execute(_insert_sql(target), values)
+            stats["updated"] += 1
+        return stats
+    finally:
+        cursor.close()
+
+
+# ------------------ THEO TẬP (set-based) ------------------
+def create_work_table(cursor):
+    # Cột chuỗi để TEXT: giữ nguyên giá trị staging như khi so trong Python
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {WORK_TABLE}")
+    cursor.execute(f"""
+        CREATE TEMPORARY TABLE {WORK_TABLE} (
+            seq INT AUTO_INCREMENT PRIMARY KEY,
+            `key` VARCHAR(100),
+            url TEXT,
+            create_date DATE,
+            name TEXT,
+            price DOUBLE,
+            area DOUBLE,
+            bedrooms INT,
+            floors INT,
+            description TEXT,
+            street_width TEXT,
+            property_type_id INT,
+            location_id INT,
+            date_id INT,
+            hashdiff CHAR(40) AS ({hashdiff_sql()}) STORED,
+            action CHAR(1),
+            old_sk BIGINT,
+            INDEX idx_work_key (`key`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+def load_work_table(cursor, rows, batch_size=BATCH_SIZE):
+    col_sql = ", ".join(f"`{c}`" for c in FACT_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(FACT_COLUMNS))
+    sql = f"INSERT INTO {WORK_TABLE} ({col_sql}) VALUES ({placeholders})"
+    for offset in range(0, len(rows), batch_size):
+        cursor.executemany(sql, rows[offset:offset + batch_size])
+
+def merge_set(conn, rows, target="PropertyListing", batch_size=BATCH_SIZE):
+    """
+    Giả định mỗi key chỉ có tối đa 1 bản isCurrent=1 (như cách cũ tạo ra) và
+    mỗi key xuất hiện 1 lần trong rows (staging Property có `key` là khóa chính).
+    """
+    cursor = conn.cursor()
+    try:
+        create_work_table(cursor)
+        load_work_table(cursor, rows, batch_size)
+
+        # I = key chưa có bản hiện hành, U = có và đã đổi, S = không đổi.
+        # Tra bản hiện hành + so hashdiff chỉ đọc index idx_listing_current
+        # (`key`, isCurrent, hashdiff), không phải đọc dòng đầy đủ
+        cursor.execute(f"""
+            UPDATE {WORK_TABLE} w
+            LEFT JOIN {target} p ON p.`key` = w.`key` AND p.isCurrent = 1
+            SET w.old_sk = p.sk,
+                w.action = CASE
+                    WHEN p.sk IS NULL THEN 'I'
+                    WHEN NOT (p.hashdiff <=> w.hashdiff) THEN 'U'
+                    ELSE 'S'
+                END
+        """)
+        cursor.execute(f"SELECT action, COUNT(*) FROM {WORK_TABLE} GROUP BY action")
+        counts = dict(cursor.fetchall())
+
+        # Đóng bản cũ của các key đã đổi
+        cursor.execute(f"""
+            UPDATE {target} p
+            JOIN {WORK_TABLE} w ON p.sk = w.old_sk
+            SET p.endDay = CURDATE(), p.isCurrent = 0
+            WHERE w.action = 'U'
+        """)
+
+        # Thêm bản mới cho key mới + key đã đổi, đúng thứ tự dòng staging (sk tăng như cách cũ)
+        col_sql = ", ".join(f"`{c}`" for c in FACT_COLUMNS)
+        select_cols = ", ".join(f"w.`{c}`" for c in FACT_COLUMNS)
+        cursor.execute(f"""
+            INSERT INTO {target} ({col_sql}, startDay, isCurrent)
+            SELECT {select_cols}, CURDATE(), 1
+            FROM {WORK_TABLE} w
+            WHERE w.action IN ('I', 'U')
+            ORDER BY w.seq
+        """)
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {WORK_TABLE}")
+        return {
+            "inserted": counts.get("I", 0),
+            "updated": counts.get("U", 0),
+            "unchanged": counts.get("S", 0),
+        }
+    finally:
+        cursor.close()
+
+def format_stats(stats):
+    return f"SCD2: {stats['inserted']} inserted, {stats['updated']} updated, {stats['unchanged']} unchanged"
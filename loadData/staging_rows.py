@@ -0,0 +1,124 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+VN_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
+# Múi giờ máy chạy, datetime.astimezone() dùng nó cho giá trị không có múi giờ
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+PROPERTY_TEMP_COLUMNS = [
+    "key", "url", "create_date", "name", "price", "area", "old_address", "street", "ward",
+    "district", "city", "bedrooms", "floors", "street_width", "description", "posting_date",
+    "property_type", "data_date",
+]
+
+
+# ------------------ CHUẨN HÓA TỪNG GIÁ TRỊ (CÁCH CŨ) ------------------
+def parse_date(val):
+    if pd.isna(val):
+        return None
+    if isinstance(val, datetime):
+        return val.astimezone(VN_TZ).strftime('%Y-%m-%d')
+    try:
+        return pd.to_datetime(val).tz_localize('UTC').astimezone(VN_TZ).strftime('%Y-%m-%d')
+    except:
+        return None
+
+def clean_text(val, default="N/A"):
+    if pd.isna(val):
+        return default
+    val = str(val).strip()
+    if val == "" or val.lower() == "nan":
+        return default
+    return val
+
+
+# ------------------ CHUẨN HÓA THEO CỘT ------------------
+def _vn_days(stamps):
+    """Series datetime64 có múi giờ → 'YYYY-MM-DD' theo giờ VN, NaT → None"""
+    days = stamps.dt.tz_convert(VN_TZ).dt.strftime('%Y-%m-%d')
+    return days.astype(object).where(days.notna(), None)
+
+def normalize_dates(col):
+    """
+    Bản vector hóa của parse_date: chuỗi không có múi giờ được coi là UTC,
+    datetime không có múi giờ được coi là giờ máy, giá trị không đọc được → None.
+    """
+    if is_datetime64_any_dtype(col):
+        stamps = col if col.dt.tz is not None else col.dt.tz_localize(LOCAL_TZ)
+        return _vn_days(stamps)
+
+    # pd.Series(None, ...) sẽ thành NaN → khởi tạo bằng list None để ô trống giữ đúng None
+    out = pd.Series([None] * len(col), index=col.index, dtype=object)
+    present = col.notna()
+
+    # Ô Excel kiểu ngày đọc ra datetime; hiếm gặp nên xử lý riêng theo cách cũ
+    is_dt = col.map(lambda v: isinstance(v, datetime), na_action="ignore").fillna(False).astype(bool)
+    if is_dt.any():
+        out[is_dt] = col[is_dt].map(parse_date)
+
+    others = col[present & ~is_dt]
+    if others.empty:
+        return out
+    try:
+        parsed = pd.to_datetime(others, errors="coerce", format="mixed")
+    except (ValueError, TypeError):
+        parsed = None
+    if parsed is None or not is_datetime64_any_dtype(parsed):
+        # Lẫn nhiều múi giờ, pandas không gom được thành 1 cột → quay về từng giá trị
+        out[others.index] = others.map(parse_date)
+    elif parsed.dt.tz is None:
+        out[others.index] = _vn_days(parsed.dt.tz_localize("UTC"))
+    # Chuỗi đã có múi giờ: parse_date cũ lỗi ở tz_localize → giữ None
+    return out.astype(object).where(out.notna(), None)
+
+def clean_column(col, default="N/A"):
+    """Bản vector hóa của clean_text"""
+    text = col.astype(str).str.strip()
+    bad = col.isna() | (text == "") | (text.str.lower() == "nan")
+    return text.astype(object).mask(bad, default)
+
+
+# ------------------ DỰNG THAM SỐ CHO Property_Temp ------------------
+def build_property_rows(df, data_date):
+    """
+    DataFrame đọc từ snapshot/Excel (tên cột đã strip) → list tuple theo đúng
+    thứ tự PROPERTY_TEMP_COLUMNS, data_date là ngày của file (phân vùng staging).
+    Mọi xử lý đều theo cột, không lặp từng ô.
+    """
+    bedroom_col = next((c for c in df.columns if "PN" in c or "Phòng ngủ" in c), "PN")
+    area_col = next((c for c in df.columns if "DT" in c or "Diện tích" in c), "DT")
+    n = len(df)
+
+    def text(name, missing="N/A"):
+        if name not in df.columns:
+            return [missing] * n
+        return clean_column(df[name]).tolist()
+
+    def date(name):
+        if name not in df.columns:
+            return [None] * n
+        return normalize_dates(df[name]).tolist()
+
+    return list(zip(
+        text('Key'),
+        text('URL'),
+        date('Ngày cào'),
+        text('Tên'),
+        text('Giá'),
+        text(area_col),
+        text('Địa chỉ'),
+        text('Đường'),
+        text('Phường'),
+        text('Quận'),
+        text('Thành phố', 'Hồ Chí Minh'),
+        text(bedroom_col),
+        text('Tầng'),
+        text('Lộ giới'),
+        text('Mô tả'),
+        date('Ngày đăng'),
+        text('Loại nhà', 'Khác'),
+        [data_date] * n,
+    ))
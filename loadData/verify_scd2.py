@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import sys
+
+import mysql.connector
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from loadData.dimension_cache import DimensionResolver
+from loadData.scd2_merge import FACT_COLUMNS, fact_rows, merge_rows, merge_set, format_stats
+
+# Đối chiếu SCD2 set-based (merge_set) với cách cũ từng dòng (merge_rows):
+# chép PropertyListing vào 2 bảng tạm, chạy 2 vòng merge cùng dữ liệu staging lên
+# mỗi bảng rồi so từng dòng (kể cả sk). Giữa 2 vòng, bản hiện hành bị sửa giống
+# nhau ở cả 2 bảng (đổi giá, đổi hoa/thường, NULL, xóa) để đi qua đủ nhánh
+# insert / update / không đổi. Mọi thay đổi được rollback, DW không bị đụng tới.
+
+TABLES = {"row": "verify_scd2_row", "set": "verify_scd2_set"}
+COPY_COLUMNS = ", ".join(f"`{c}`" for c in ["sk"] + FACT_COLUMNS + ["startDay", "endDay", "isCurrent"])
+MUTATIONS = [
+    "UPDATE {t} SET price = COALESCE(price, 0) + 1 WHERE isCurrent = 1 AND MOD(sk, {n}) = 0",
+    "UPDATE {t} SET name = UPPER(name) WHERE isCurrent = 1 AND MOD(sk, {n}) = 1",
+    "UPDATE {t} SET street_width = NULL WHERE isCurrent = 1 AND MOD(sk, {n}) = 2",
+    "DELETE FROM {t} WHERE isCurrent = 1 AND MOD(sk, {n}) = 3",
+]
+
+
+def merge(conn, method, rows):
+    if method == "row":
+        return merge_rows(conn, rows, TABLES["row"], verbose=False)
+    return merge_set(conn, rows, TABLES["set"])
+
+def compare(cursor, label):
+    results = []
+    for table in TABLES.values():
+        cursor.execute(f"SELECT * FROM {table} ORDER BY sk")
+        results.append(cursor.fetchall())
+    row_rows, set_rows = results
+    diff = [(a, b) for a, b in zip(row_rows, set_rows) if a != b]
+    same = len(row_rows) == len(set_rows) and not diff
+    print(f"{label}: row={len(row_rows)} dòng, set={len(set_rows)} dòng, {len(diff)} dòng khác")
+    for a, b in diff[:10]:
+        print(f"  row={a}\n  set={b}")
+    return same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Đối chiếu SCD2 set-based với cách cũ từng dòng")
+    parser.add_argument("--limit", type=int, help="Chỉ lấy N dòng đầu của staging Property")
+    parser.add_argument("--mutate-every", type=int, default=7,
+                        help="Sửa bản hiện hành có MOD(sk, N) = 0..3 giữa 2 vòng merge")
+    args = parser.parse_args()
+
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+
+    staging_conn = mysql.connector.connect(**cfg["staging"])
+    cursor = staging_conn.cursor(dictionary=True)
+    sql = "SELECT * FROM Property ORDER BY `key`"
+    if args.limit:
+        sql += f" LIMIT {int(args.limit)}"
+    cursor.execute(sql)
+    staging_data = cursor.fetchall()
+    cursor.close()
+    staging_conn.close()
+    print(f"Fetched {len(staging_data)} rows from staging DB.")
+
+    conn = mysql.connector.connect(**cfg["datawarehouse"])
+    cursor = conn.cursor()
+    ok = True
+    try:
+        resolver = DimensionResolver(conn)
+        rows = fact_rows(staging_data, resolver.resolve_rows(staging_data))
+        for table in TABLES.values():
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {table}")
+            cursor.execute(f"CREATE TEMPORARY TABLE {table} LIKE PropertyListing")
+            # hashdiff là cột sinh sẵn, không INSERT trực tiếp được
+            cursor.execute(f"INSERT INTO {table} ({COPY_COLUMNS}) SELECT {COPY_COLUMNS} FROM PropertyListing")
+
+        for round_no in (1, 2):
+            if round_no == 2:
+                for table in TABLES.values():
+                    for mutation in MUTATIONS:
+                        cursor.execute(mutation.format(t=table, n=args.mutate_every))
+            stats = {method: merge(conn, method, rows) for method in TABLES}
+            for method, s in stats.items():
+                print(f"Vòng {round_no} [{method}] {format_stats(s)}")
+            ok = compare(cursor, f"Vòng {round_no}") and stats["row"] == stats["set"] and ok
+        conn.rollback()
+    finally:
+        for table in TABLES.values():
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {table}")
+        cursor.close()
+        conn.close()
+    print("KHỚP" if ok else "KHÔNG KHỚP")
+    sys.exit(0 if ok else 1)
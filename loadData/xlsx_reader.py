@@ -0,0 +1,83 @@
+import queue
+import threading
+
+import pandas as pd
+from openpyxl import load_workbook
+
+_DONE = object()
+
+
+def _cell(value):
+    # Giống pd.read_excel: số thực tròn (4.0) đọc thành int
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def iter_xlsx_batches(path, batch_size=5000, sheet_name=None):
+    """
+    Đọc file .xlsx theo từng lô batch_size dòng (openpyxl read_only), mỗi lô là
+    1 DataFrame dtype object với header lấy từ dòng đầu. Bộ nhớ chỉ phụ thuộc
+    batch_size chứ không phụ thuộc kích thước file.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+        width = len(columns)
+
+        batch = []
+        for values in rows:
+            # pd.read_excel bỏ qua dòng trống hoàn toàn
+            if all(v is None for v in values):
+                continue
+            values = [_cell(v) for v in values[:width]]
+            values += [None] * (width - len(values))
+            batch.append(values)
+            if len(batch) >= batch_size:
+                yield pd.DataFrame(batch, columns=columns, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, dtype=object)
+    finally:
+        wb.close()
+
+def prefetch(batches, depth=2):
+    """
+    Đọc trước tối đa `depth` lô trong 1 thread riêng, để việc parse lô sau
+    chạy song song với lúc MySQL đang nhận lô trước.
+    """
+    q = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def producer():
+        try:
+            for batch in batches:
+                if stop.is_set():
+                    return
+                q.put(batch)
+            q.put(_DONE)
+        except BaseException as e:
+            q.put(e)
+
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Bên nhận dừng giữa chừng (lỗi insert) → báo thread đọc dừng, xả queue cho nó thoát
+        stop.set()
+        while thread.is_alive():
+            try:
+                q.get(timeout=0.1)
+            except queue.Empty:
+                pass
@@ -0,0 +1,226 @@
+# control_log.py
+import atexit
+import json
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from mysql.connector import pooling
+
+VN_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
+
+# Ghi process_log / file_log vào control DB cho mọi bước ETL (crawl, staging,
+# transform, DW) qua 1 pool kết nối nhỏ, thay cho việc mỗi lần ghi log lại mở
+# kết nối mới tới DB ở xa.
+#
+# async_mode=True: các cập nhật process_log (SC/FL/đếm) được đẩy vào hàng đợi
+# và 1 thread nền ghi dần, bước ETL không phải chờ. start_process và mọi thao
+# tác file_log vẫn ghi ngay vì bước sau cần kết quả (process_id, file_id, status).
+
+
+def now_vn_str():
+    return datetime.now(VN_TZ).strftime('%Y-%m-%d %H:%M:%S')
+
+def normalize_path(path):
+    return path.replace("\\", "/")
+
+
+class ControlLog:
+    def __init__(self, config, pool_size=2, async_mode=False):
+        self.pool = pooling.MySQLConnectionPool(pool_name=f"control_{os.getpid()}_{id(self)}",
+                                                pool_size=pool_size, **config)
+        # mysql.connector không chờ khi pool hết kết nối mà ném PoolError ngay, nên
+        # số thread mượn kết nối cùng lúc (thread ghi nền + thread gọi) bị giới hạn ở đây
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self.async_mode = async_mode
+        self._queue = None
+        self._worker = None
+        if async_mode:
+            self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._drain, daemon=True)
+            self._worker.start()
+            atexit.register(self.close)
+
+    # ------------------ KẾT NỐI ------------------
+    @contextmanager
+    def connection(self):
+        """Mượn 1 kết nối trong pool (trả lại pool khi thoát with), pool đang hết thì chờ"""
+        with self._slots:
+            conn = self.pool.get_connection()
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+    def _execute(self, sql, params=()):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                conn.commit()
+                return cursor.lastrowid
+            finally:
+                cursor.close()
+
+    def _fetchone(self, sql, params=()):
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+                cursor.fetchall()
+                return row
+            finally:
+                cursor.close()
+
+    # ------------------ GHI NỀN ------------------
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                sql, params = item
+                try:
+                    self._execute(sql, params)
+                except Exception as e:
+                    # Mất 1 dòng log không được làm hỏng bước ETL đang chạy
+                    print(f"Không ghi được process_log: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write_process(self, sql, params):
+        if self.async_mode:
+            self._queue.put((sql, params))
+        else:
+            self._execute(sql, params)
+
+    def flush(self):
+        """Chờ các cập nhật đang xếp hàng ghi xong"""
+        if self.async_mode:
+            self._queue.join()
+
+    def close(self):
+        if self.async_mode and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+
+    # ------------------ process_log ------------------
+    def start_process(self, process_name, file_id=None):
+        now_str = now_vn_str()
+        return self._execute("""
+            INSERT INTO process_log (file_id, process_name, status, started_at, updated_at)
+            VALUES (%s, %s, 'PS', %s, %s)
+        """, (file_id, process_name, now_str, now_str))
+
+    def process_success(self, process_id, file_id=None, message=None):
+        # file_id=None giữ nguyên file_id đã ghi lúc start_process
+        self._write_process("""
+            UPDATE process_log
+            SET status='SC', file_id=COALESCE(%s, file_id), message=COALESCE(%s, message), updated_at=%s
+            WHERE process_id=%s
+        """, (file_id, message, now_vn_str(), process_id))
+
+    def process_fail(self, process_id, error_message, file_id=None):
+        self._write_process("""
+            UPDATE process_log
+            SET status='FL', file_id=COALESCE(%s, file_id), error_message=%s, updated_at=%s
+            WHERE process_id=%s
+        """, (file_id, error_message, now_vn_str(), process_id))
+
+    # ------------------ file_log ------------------
+    def create_file(self, file_path, data_date, row_count, status):
+        now_str = now_vn_str()
+        return self._execute("""
+            INSERT INTO file_log (file_path, data_date, row_count, status, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (normalize_path(file_path), data_date, row_count, status, now_str, now_str))
+
+    def upsert_file(self, file_path, data_date, row_count, status):
+        """Cùng file_path + data_date thì cập nhật dòng cũ thay vì thêm dòng mới"""
+        file_path = normalize_path(file_path)
+        existing = self._fetchone("SELECT file_id FROM file_log WHERE file_path = %s AND DATE(data_date) = %s",
+                                  (file_path, data_date))
+        if not existing:
+            return self.create_file(file_path, data_date, row_count, status)
+        self._execute("""
+            UPDATE file_log SET row_count=%s, status=%s, author='System', updated_at=%s WHERE file_id=%s
+        """, (row_count, status, now_vn_str(), existing["file_id"]))
+        return existing["file_id"]
+
+    def update_file_status(self, file_id, status):
+        self._execute("UPDATE file_log SET status=%s, updated_at=%s WHERE file_id=%s",
+                      (status, now_vn_str(), file_id))
+
+    def claim_files(self, statuses, claim_status, limit=None, stale_minutes=None):
+        """
+        Nhận các file đang ở statuses (cũ nhất trước, tối đa limit file) bằng
+        SELECT ... FOR UPDATE SKIP LOCKED rồi chuyển sang claim_status trong cùng
+        transaction: runner chạy song song bỏ qua dòng đang bị khóa nên không bao giờ
+        nhận trùng file. File nằm ở claim_status quá stale_minutes (runner chết giữa
+        chừng) được nhận lại. Trả về các dòng file_log với status trước khi nhận.
+        """
+        placeholders = ", ".join(["%s"] * len(statuses))
+        where = f"status IN ({placeholders})"
+        params = list(statuses)
+        if stale_minutes:
+            stale_before = (datetime.now(VN_TZ) - timedelta(minutes=stale_minutes)).strftime('%Y-%m-%d %H:%M:%S')
+            where += " OR (status = %s AND updated_at < %s)"
+            params += [claim_status, stale_before]
+        sql = f"SELECT * FROM file_log WHERE {where} ORDER BY file_id ASC"
+        if limit:
+            sql += " LIMIT %s"
+            params.append(limit)
+        sql += " FOR UPDATE SKIP LOCKED"
+
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(sql, tuple(params))
+                rows = cursor.fetchall()
+                if rows:
+                    ids = [row["file_id"] for row in rows]
+                    cursor.execute(f"""
+                        UPDATE file_log SET status=%s, updated_at=%s
+                        WHERE file_id IN ({", ".join(["%s"] * len(ids))})
+                    """, (claim_status, now_vn_str(), *ids))
+                conn.commit()
+                return rows
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def next_file(self, statuses):
+        """File cũ nhất (theo file_id) đang ở 1 trong các trạng thái statuses, None nếu không có"""
+        placeholders = ", ".join(["%s"] * len(statuses))
+        return self._fetchone(f"""
+            SELECT * FROM file_log WHERE status IN ({placeholders})
+            ORDER BY file_id ASC LIMIT 1
+        """, tuple(statuses))
+
+
+# ------------------ DÙNG CHUNG TRONG 1 PROCESS ------------------
+_instance = None
+_instance_pid = None
+_instance_lock = threading.Lock()
+
+def get_control_log(async_mode=None):
+    """
+    ControlLog dùng chung trong process hiện tại (tạo lại sau fork vì pool không
+    dùng chung được giữa các process). async_mode mặc định lấy từ CONTROL_LOG_ASYNC.
+    """
+    global _instance, _instance_pid
+    with _instance_lock:
+        if _instance is None or _instance_pid != os.getpid():
+            if async_mode is None:
+                async_mode = os.getenv("CONTROL_LOG_ASYNC", "0").lower() in ("1", "true", "on")
+            with open("config/config.json", "r", encoding="utf-8") as f:
+                config = json.load(f)["control"]
+            _instance = ControlLog(config, async_mode=async_mode)
+            _instance_pid = os.getpid()
+        return _instance
@@ -84,7 +84,7 @@ def check_crawled_file_exists(today_date):
         f"*{today_date.strftime('%d_%m_%Y')}*"
     ]
     found_files = []
-    search_dirs = [".", "dataset", "data", "craw_data"]
+    search_dirs = [".", "dataset", "data", os.path.join("data", "snapshots"), "craw_data"]
     for folder in search_dirs:
         if os.path.exists(folder):
             for pattern in patterns:
@@ -0,0 +1,112 @@
+# table_swap.py
+import argparse
+import json
+
+import mysql.connector
+
+# Load kiểu "shadow table": ghi vào <bảng>_next, xong thì 1 câu RENAME TABLE
+# (nguyên tử trong MySQL) đưa bản mới lên thay bản đang chạy. Bản cũ giữ lại
+# dưới tên <bảng>_old để rollback tức thì.
+#
+# Bảng chia phân vùng theo ngày (Property_Temp) thì chỉ thay 1 phân vùng:
+# <bảng>_next chỉ chứa phân vùng mới, publish_partition DELETE + INSERT đúng
+# phân vùng đó trong 1 transaction (người đọc thấy trọn bản cũ hoặc bản mới của
+# ngày), <bảng>_old giữ bản cũ của riêng phân vùng đó. Chi phí theo kích thước 1
+# ngày, không tăng theo số ngày lịch sử đang giữ trong bảng.
+
+
+def next_name(table):
+    return f"{table}_next"
+
+def old_name(table):
+    return f"{table}_old"
+
+def prepare_shadow(cursor, table):
+    """Tạo lại <bảng>_next rỗng, cùng cấu trúc + index với bảng đang chạy"""
+    shadow = next_name(table)
+    cursor.execute(f"DROP TABLE IF EXISTS `{shadow}`")
+    cursor.execute(f"CREATE TABLE `{shadow}` LIKE `{table}`")
+    return shadow
+
+def discard_shadow(cursor, table):
+    cursor.execute(f"DROP TABLE IF EXISTS `{next_name(table)}`")
+
+def publish(cursor, table):
+    """
+    <bảng>_next → <bảng>, <bảng> → <bảng>_old trong 1 câu RENAME. Người đọc
+    luôn thấy bản cũ hoặc bản mới đầy đủ, không bao giờ thấy bảng đang load dở.
+    """
+    old = old_name(table)
+    cursor.execute(f"DROP TABLE IF EXISTS `{old}`")
+    cursor.execute(f"RENAME TABLE `{table}` TO `{old}`, `{next_name(table)}` TO `{table}`")
+    print(f"Đã publish {next_name(table)} → {table} (bản cũ giữ ở {old}).")
+
+def publish_partition(conn, cursor, table, column, value, columns, id_col):
+    """
+    Thay các dòng `column` = value của <bảng> bằng toàn bộ <bảng>_next. columns là
+    các cột được chép, không gồm id_col (AUTO_INCREMENT) để id mới không trùng id
+    đang có; dòng được chép theo thứ tự id_col của <bảng>_next.
+    """
+    old, shadow = old_name(table), next_name(table)
+    # DDL tự commit nên phải tạo bảng _old trước khi mở transaction
+    cursor.execute(f"DROP TABLE IF EXISTS `{old}`")
+    cursor.execute(f"CREATE TABLE `{old}` LIKE `{table}`")
+    col_sql = ", ".join(f"`{c}`" for c in columns)
+    try:
+        cursor.execute(f"INSERT INTO `{old}` SELECT * FROM `{table}` WHERE `{column}` = %s", (value,))
+        cursor.execute(f"DELETE FROM `{table}` WHERE `{column}` = %s", (value,))
+        cursor.execute(f"INSERT INTO `{table}` ({col_sql}) SELECT {col_sql} FROM `{shadow}` ORDER BY `{id_col}`")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    cursor.execute(f"DROP TABLE IF EXISTS `{shadow}`")
+    print(f"Đã publish {shadow} → {table} [{column} = {value}] (bản cũ giữ ở {old}).")
+
+def rollback(cursor, table):
+    """Đổi chỗ <bảng> và <bảng>_old (gọi lần nữa là quay lại bản mới)"""
+    old = old_name(table)
+    tmp = f"{table}_swap"
+    cursor.execute(f"RENAME TABLE `{table}` TO `{tmp}`, `{old}` TO `{table}`, `{tmp}` TO `{old}`")
+    print(f"Đã rollback {table} về bản trước (bản vừa thay giữ ở {old}).")
+
+def rollback_partition(conn, cursor, table, column, value):
+    """Đổi chỗ phân vùng `column` = value của <bảng> với <bảng>_old (gọi lần nữa là quay lại bản mới)"""
+    old = old_name(table)
+    tmp = f"{table}_swap"
+    cursor.execute(f"DROP TABLE IF EXISTS `{tmp}`")
+    cursor.execute(f"CREATE TABLE `{tmp}` LIKE `{table}`")
+    try:
+        cursor.execute(f"INSERT INTO `{tmp}` SELECT * FROM `{table}` WHERE `{column}` = %s", (value,))
+        cursor.execute(f"DELETE FROM `{table}` WHERE `{column}` = %s", (value,))
+        cursor.execute(f"INSERT INTO `{table}` SELECT * FROM `{old}`")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    cursor.execute(f"DROP TABLE `{old}`")
+    cursor.execute(f"RENAME TABLE `{tmp}` TO `{old}`")
+    print(f"Đã rollback {table} [{column} = {value}] về bản trước (bản vừa thay giữ ở {old}).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rollback bảng đã publish bằng RENAME TABLE")
+    parser.add_argument("table", help="Tên bảng, vd Property hoặc Property_Temp")
+    parser.add_argument("--db", default="staging", help="Khóa cấu hình trong config.json")
+    parser.add_argument("--partition", metavar="COLUMN=VALUE",
+                        help="Chỉ rollback 1 phân vùng, vd data_date=2025-11-20 cho Property_Temp")
+    args = parser.parse_args()
+
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        cfg = json.load(f)[args.db]
+    conn = mysql.connector.connect(**cfg)
+    cursor = conn.cursor()
+    try:
+        if args.partition:
+            column, value = args.partition.split("=", 1)
+            rollback_partition(conn, cursor, args.table, column, value)
+        else:
+            rollback(cursor, args.table)
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,148 @@
+# work_queue.py
+import argparse
+import json
+import os
+import sys
+
+import mysql.connector
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from template.notification import send_error_email
+from template.control_log import get_control_log
+from transform.partition import transform_partition
+from loadData.dw_loader import load_dw, format_stats
+
+# Xử lý hết các file_log đang chờ transform (ST/TF) và/hoặc load DW (TR/LF) trong
+# 1 lần chạy: nhận file bằng SELECT ... FOR UPDATE SKIP LOCKED (nhiều runner chạy
+# song song không nhận trùng), rồi xử lý lần lượt theo file_id trên cùng 1 kết nối
+# staging + DW. Mỗi file cập nhật trạng thái riêng, 1 file lỗi không chặn các file sau.
+#
+# Property chỉ giữ kết quả transform gần nhất, nên ở --stage all mỗi file được
+# transform rồi load DW ngay, trước khi sang file tiếp theo.
+
+# Chạy gửi mail báo lỗi tại local
+env_path = os.path.join(os.path.dirname(__file__), '.env')
+load_dotenv(env_path)
+
+TRANSFORM_READY = ("ST", "TF")
+DW_READY = ("TR", "LF")
+TRANSFORM_CLAIMED = "TP"
+DW_CLAIMED = "LP"
+
+
+def claim(control_log, stage, limit, stale_minutes):
+    """File chờ load DW (cũ hơn) nhận trước, phần limit còn lại dành cho file chờ transform"""
+    claimed = []
+    if stage in ("all", "dw"):
+        claimed += control_log.claim_files(DW_READY, DW_CLAIMED, limit, stale_minutes)
+    if stage in ("all", "transform"):
+        remaining = limit - len(claimed) if limit else None
+        if remaining is None or remaining > 0:
+            claimed += control_log.claim_files(TRANSFORM_READY, TRANSFORM_CLAIMED, remaining, stale_minutes)
+    return sorted(claimed, key=lambda f: f["file_id"])
+
+def run_transform(control_log, conn, staging_config, file_info, args, success_status="TR"):
+    file_id = file_info["file_id"]
+    print(f"Transforming file_id = {file_id}")
+    process_id = control_log.start_process("Transform Data", file_id)
+    try:
+        conn.ping(reconnect=True, attempts=3, delay=5)
+        _, message = transform_partition(conn, staging_config, file_info["data_date"], args.mode,
+                                         args.swap, args.incremental, args.processes, args.chunk_size)
+        control_log.update_file_status(file_id, success_status)
+        control_log.process_success(process_id, message=message)
+        return None
+    except Exception as e:
+        print("Transform Failed:", e)
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        control_log.update_file_status(file_id, "TF")
+        control_log.process_fail(process_id, str(e))
+        return str(e)
+
+def run_dw(control_log, staging_conn, dw_conn, file_info, args, resolver):
+    file_id = file_info["file_id"]
+    print(f"Loading DW for file_id = {file_id}")
+    process_id = control_log.start_process("Load to DW", file_id)
+    try:
+        staging_conn.ping(reconnect=True, attempts=3, delay=5)
+        dw_conn.ping(reconnect=True, attempts=3, delay=5)
+        stats, resolver = load_dw(staging_conn, dw_conn, args.scd2, resolver, args.pipeline, args.batch_size)
+        control_log.update_file_status(file_id, "OK")
+        control_log.process_success(process_id, message=format_stats(stats, resolver))
+        return None, resolver
+    except Exception as e:
+        print("DW Load FAILED:", str(e))
+        control_log.update_file_status(file_id, "LF")
+        control_log.process_fail(process_id, str(e))
+        # id member dimension mới trong cache đã bị rollback → nạp lại ở file sau
+        return str(e), None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transform + load DW mọi file_log đang chờ trong 1 lần chạy")
+    parser.add_argument("--stage", choices=["all", "transform", "dw"], default="all")
+    parser.add_argument("--limit", type=int, default=None, help="Nhận tối đa N file mỗi lần chạy (mặc định: tất cả)")
+    parser.add_argument("--stale-minutes", type=int, default=120,
+                        help="Nhận lại file kẹt ở TP/LP quá N phút (runner trước chết giữa chừng)")
+    parser.add_argument("--swap", action="store_true", help="Như transform_staging.py --swap")
+    parser.add_argument("--mode", choices=["python", "pushdown", "parallel"], default="python",
+                        help="Như transform_staging.py --mode")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--incremental", action="store_true", help="Như transform_staging.py --incremental")
+    parser.add_argument("--scd2", choices=["set", "row"], default="set",
+                        help="Như load_data_datawarehouse.py --scd2")
+    parser.add_argument("--pipeline", action="store_true", help="Như load_data_datawarehouse.py --pipeline")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Số dòng mỗi lô cho --pipeline")
+    args = parser.parse_args()
+
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    staging_config = cfg["staging"]
+
+    control_log = get_control_log()
+    files = claim(control_log, args.stage, args.limit, args.stale_minutes)
+    if not files:
+        print("Không có file nào đang chờ.")
+        sys.exit(0)
+    print(f"Đã nhận {len(files)} file: {', '.join(str(f['file_id']) for f in files)}")
+
+    staging_conn = mysql.connector.connect(**staging_config)
+    dw_conn = mysql.connector.connect(**cfg["datawarehouse"]) if args.stage != "transform" else None
+    resolver = None
+    failures = []
+    done = 0
+    try:
+        for file_info in files:
+            if file_info["status"] in TRANSFORM_READY + (TRANSFORM_CLAIMED,):
+                # --stage all: transform xong chuyển thẳng sang LP (không qua TR) để runner
+                # khác không nhận mất bước DW ngay sau đó
+                success_status = "TR" if args.stage == "transform" else DW_CLAIMED
+                error = run_transform(control_log, staging_conn, staging_config, file_info, args, success_status)
+                if error:
+                    failures.append(f"Transform file_id={file_info['file_id']}: {error}")
+                    continue
+                if args.stage == "transform":
+                    done += 1
+                    continue
+
+            error, resolver = run_dw(control_log, staging_conn, dw_conn, file_info, args, resolver)
+            if error:
+                failures.append(f"Load DW file_id={file_info['file_id']}: {error}")
+                continue
+            done += 1
+    finally:
+        staging_conn.close()
+        if dw_conn:
+            dw_conn.close()
+        control_log.flush()
+
+    print(f"Xong {done}/{len(files)} file.")
+    if failures:
+        send_error_email("Work Queue Failed", "\n".join(failures))
+        sys.exit(1)
@@ -0,0 +1,126 @@
+from transform.pushdown import PROPERTY_COLUMNS, hash_sql, column_exprs
+from transform.value_parser import parse_price, parse_area, parse_int_from_str
+
+# Transform incremental: so hash nội dung của từng dòng Property_Temp với
+# content_hash đang lưu ở Property, chỉ chuẩn hóa + ghi các key mới hoặc đã đổi.
+# Key không còn trong ngày hôm nay vẫn được giữ nguyên trong Property.
+# create_date (ngày cào) không nằm trong hash: key không đổi nội dung chỉ được
+# cập nhật lại create_date bằng 1 câu UPDATE ... JOIN, không đi qua delta.
+# Dòng Property chưa có content_hash (NULL, vd bảng vừa qua migrate_staging.py)
+# luôn được coi là đã đổi, nên lần chạy đầu ghi lại key đó kèm hash đúng.
+
+BATCH_SIZE = 1000
+
+
+def build_delta(cursor, target, data_date):
+    """
+    Tạo bảng tạm transform_delta: dòng đầu tiên (theo temp_id) của mỗi key trong
+    phân vùng, kèm content_hash và is_new, chỉ gồm key mới hoặc hash đã khác.
+    """
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS transform_delta")
+    cursor.execute(f"""
+        CREATE TEMPORARY TABLE transform_delta AS
+        SELECT d.*, (p.`key` IS NULL) AS is_new
+        FROM (
+            SELECT t.*, {hash_sql('t')} AS content_hash,
+                   ROW_NUMBER() OVER (PARTITION BY t.`key` ORDER BY t.temp_id) AS rn
+            FROM Property_Temp t
+            WHERE t.data_date = %s
+        ) d
+        LEFT JOIN {target} p ON p.`key` = d.`key`
+        WHERE d.rn = 1 AND (p.`key` IS NULL OR NOT (p.content_hash <=> d.content_hash))
+    """, (data_date,))
+
+def count_stats(cursor, data_date):
+    cursor.execute("""
+        SELECT COUNT(*) AS total, COUNT(DISTINCT `key`) AS distinct_keys
+        FROM Property_Temp WHERE data_date = %s
+    """, (data_date,))
+    total, distinct_keys = cursor.fetchone()
+    cursor.execute("SELECT COALESCE(SUM(is_new), 0), COUNT(*) FROM transform_delta")
+    inserted, delta = cursor.fetchone()
+    inserted = int(inserted)
+    return {
+        "inserted": inserted,
+        "updated": delta - inserted,
+        "unchanged": distinct_keys - delta,
+        # Key trùng trong cùng ngày: chỉ dòng đầu tiên được dùng, giống INSERT IGNORE cũ
+        "skipped": total - distinct_keys,
+    }
+
+# ------------------ ÁP DELTA ------------------
+def _apply_python(cursor, target):
+    cursor.execute("SELECT * FROM transform_delta ORDER BY temp_id")
+    names = [d[0] for d in cursor.description]
+    inserts, updates = [], []
+    for raw in cursor.fetchall():
+        row = dict(zip(names, raw))
+        row["price"] = parse_price(row["price"])
+        row["area"] = parse_area(row["area"])
+        row["bedrooms"] = parse_int_from_str(row["bedrooms"])
+        row["floors"] = parse_int_from_str(row["floors"])
+        values = tuple(row[c] for c in PROPERTY_COLUMNS)
+        if row["is_new"]:
+            inserts.append(values)
+        else:
+            updates.append(values[1:] + (row["key"],))
+
+    col_sql = ", ".join(f"`{c}`" for c in PROPERTY_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(PROPERTY_COLUMNS))
+    set_sql = ", ".join(f"`{c}` = %s" for c in PROPERTY_COLUMNS[1:])
+    for offset in range(0, len(inserts), BATCH_SIZE):
+        cursor.executemany(f"INSERT IGNORE INTO {target} ({col_sql}) VALUES ({placeholders})",
+                           inserts[offset:offset + BATCH_SIZE])
+    for offset in range(0, len(updates), BATCH_SIZE):
+        cursor.executemany(f"UPDATE {target} SET {set_sql} WHERE `key` = %s",
+                           updates[offset:offset + BATCH_SIZE])
+
+def _apply_pushdown(cursor, target):
+    exprs = column_exprs("d", hashed=True)
+    col_sql = ", ".join(f"`{c}`" for c in PROPERTY_COLUMNS)
+    select_cols = ", ".join(exprs[c] for c in PROPERTY_COLUMNS)
+    cursor.execute(f"""
+        INSERT IGNORE INTO {target} ({col_sql})
+        SELECT {select_cols} FROM transform_delta d
+        WHERE d.is_new = 1
+        ORDER BY d.temp_id
+    """)
+    set_sql = ", ".join(f"p.`{c}` = {exprs[c]}" for c in PROPERTY_COLUMNS[1:])
+    cursor.execute(f"""
+        UPDATE {target} p JOIN transform_delta d ON p.`key` = d.`key`
+        SET {set_sql}
+        WHERE d.is_new = 0
+    """)
+
+def refresh_create_date(cursor, target, data_date):
+    """create_date của mọi key trong phân vùng = create_date dòng đầu tiên của key đó; trả về số dòng đổi"""
+    cursor.execute(f"""
+        UPDATE {target} p
+        JOIN (
+            SELECT `key`, create_date FROM (
+                SELECT t.`key`, t.create_date,
+                       ROW_NUMBER() OVER (PARTITION BY t.`key` ORDER BY t.temp_id) AS rn
+                FROM Property_Temp t
+                WHERE t.data_date = %s
+            ) x WHERE x.rn = 1
+        ) d ON p.`key` = d.`key`
+        SET p.create_date = d.create_date
+        WHERE NOT (p.create_date <=> d.create_date)
+    """, (data_date,))
+    return cursor.rowcount
+
+def incremental_transform(conn, target, data_date, mode="python"):
+    """Trả về dict số dòng inserted / updated / unchanged / skipped / refreshed (chưa commit)"""
+    cursor = conn.cursor()
+    try:
+        build_delta(cursor, target, data_date)
+        stats = count_stats(cursor, data_date)
+        if mode == "pushdown":
+            _apply_pushdown(cursor, target)
+        else:
+            _apply_python(cursor, target)
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS transform_delta")
+        stats["refreshed"] = refresh_create_date(cursor, target, data_date)
+        return stats
+    finally:
+        cursor.close()
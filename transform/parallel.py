@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import uuid
+
+import mysql.connector
+
+from transform.pushdown import PROPERTY_COLUMNS, hash_sql
+from transform.value_parser import parse_price, parse_area, parse_int_from_str
+
+# Transform song song: chia phân vùng Property_Temp theo dải temp_id, mỗi process
+# đọc dải của mình bằng cursor không buffer (server trả dần từng phần), chuẩn hóa
+# rồi INSERT theo lô bằng kết nối riêng được giữ suốt đời process.
+# Bộ nhớ mỗi process chỉ cỡ BATCH_SIZE dòng, không phụ thuộc kích thước phân vùng.
+
+BATCH_SIZE = 1000
+FIRST_ROWS_PREFIX = "transform_first_rows"
+
+PRICE = PROPERTY_COLUMNS.index("price")
+AREA = PROPERTY_COLUMNS.index("area")
+BEDROOMS = PROPERTY_COLUMNS.index("bedrooms")
+FLOORS = PROPERTY_COLUMNS.index("floors")
+
+_reader = None
+_writer = None
+_target = None
+_first_rows = None
+
+
+# ------------------ PROCESS CON ------------------
+def _init_worker(staging_config, target, first_rows):
+    """Mỗi process mở 2 kết nối 1 lần: 1 để đọc stream, 1 để ghi (không ghi được khi stream chưa đọc hết)"""
+    global _reader, _writer, _target, _first_rows
+    _reader = mysql.connector.connect(**staging_config)
+    _writer = mysql.connector.connect(**staging_config)
+    _target = target
+    _first_rows = first_rows
+
+def transform_row(row):
+    row = list(row)
+    row[PRICE] = parse_price(row[PRICE])
+    row[AREA] = parse_area(row[AREA])
+    row[BEDROOMS] = parse_int_from_str(row[BEDROOMS])
+    row[FLOORS] = parse_int_from_str(row[FLOORS])
+    return tuple(row)
+
+def _transform_range(bounds):
+    lo, hi = bounds
+    select_cols = ", ".join(f"t.`{c}`" for c in PROPERTY_COLUMNS[:-1])
+    col_sql = ", ".join(f"`{c}`" for c in PROPERTY_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(PROPERTY_COLUMNS))
+    insert_sql = f"INSERT IGNORE INTO {_target} ({col_sql}) VALUES ({placeholders})"
+
+    reader = _reader.cursor()
+    writer = _writer.cursor()
+    written = 0
+    try:
+        # Chỉ lấy dòng đầu tiên của mỗi key (đã tính sẵn ở bảng _first_rows) để
+        # kết quả không phụ thuộc process nào ghi trước
+        reader.execute(f"""
+            SELECT {select_cols}, {hash_sql('t')} AS content_hash
+            FROM Property_Temp t
+            JOIN {_first_rows} f ON f.temp_id = t.temp_id
+            WHERE t.temp_id >= %s AND t.temp_id < %s
+            ORDER BY t.temp_id
+        """, (lo, hi))
+        while True:
+            rows = reader.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            # Chưa đọc hết dải thì kết nối đọc còn bận, nên ghi bằng kết nối thứ 2
+            writer.executemany(insert_sql, [transform_row(r) for r in rows])
+            written += len(rows)
+        _writer.commit()
+        return written
+    finally:
+        reader.close()
+        writer.close()
+
+
+# ------------------ PROCESS CHÍNH ------------------
+def plan_ranges(cursor, data_date, chunk_size):
+    cursor.execute("SELECT MIN(temp_id), MAX(temp_id) FROM Property_Temp WHERE data_date = %s",
+                   (data_date,))
+    lo, hi = cursor.fetchone()
+    if lo is None:
+        return []
+    return [(start, min(start + chunk_size, hi + 1)) for start in range(lo, hi + 1, chunk_size)]
+
+def parallel_transform(conn, staging_config, target, data_date, processes=None, chunk_size=20000):
+    """
+    Các process ghi bằng kết nối riêng nên mọi thay đổi trước đó trên conn (vd
+    DELETE) phải commit trước khi gọi. Mỗi dải commit riêng: lỗi giữa chừng sẽ để
+    lại dữ liệu dở trong target → nên chạy kèm --swap.
+
+    Process con chạy bằng spawn (Windows không có fork), nên script gọi hàm này
+    phải đặt code chạy trong if __name__ == "__main__".
+    """
+    processes = processes or os.cpu_count() or 1
+    # Bảng thật (process con đọc bằng kết nối riêng, không thấy bảng TEMPORARY),
+    # tên riêng cho mỗi lần chạy để 2 lần transform song song không ghi đè nhau
+    first_rows = f"{FIRST_ROWS_PREFIX}_{uuid.uuid4().hex[:12]}"
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            CREATE TABLE {first_rows} (temp_id INT PRIMARY KEY)
+            SELECT MIN(temp_id) AS temp_id FROM Property_Temp
+            WHERE data_date = %s GROUP BY `key`
+        """, (data_date,))
+        conn.commit()
+
+        ranges = plan_ranges(cursor, data_date, chunk_size)
+        total = 0
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes, initializer=_init_worker, initargs=(staging_config, target, first_rows)) as pool:
+            for i, written in enumerate(pool.imap_unordered(_transform_range, ranges), start=1):
+                total += written
+                print(f"Đã transform {i}/{len(ranges)} dải temp_id — {total} dòng")
+        return total
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {first_rows}")
+        cursor.close()
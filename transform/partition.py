@@ -0,0 +1,94 @@
+from template.table_swap import prepare_shadow, publish
+from transform.value_parser import parse_price, parse_area, parse_int_from_str, format_cache_stats
+from transform.pushdown import pushdown_transform, hash_sql
+from transform.incremental import incremental_transform
+from transform.parallel import parallel_transform
+
+# Transform 1 phân vùng Property_Temp (1 file_log) → Property trên 1 kết nối staging
+# có sẵn, dùng chung cho transform_staging.py (1 file) và work_queue.py (nhiều file
+# liên tiếp trên cùng kết nối).
+
+
+def transform_partition(conn, staging_config, data_date, mode="python", swap=False,
+                        incremental=False, processes=None, chunk_size=20000):
+    """Trả về (số dòng đã ghi, message cho process_log). Commit (và publish nếu swap) khi xong."""
+    cursor = conn.cursor(dictionary=True)
+    message = None
+    try:
+        if swap:
+            # Property vẫn phục vụ người đọc cho tới lúc RENAME
+            target = prepare_shadow(cursor, "Property")
+            if incremental:
+                cursor.execute(f"INSERT INTO {target} SELECT * FROM Property")
+        elif incremental:
+            target = "Property"
+        else:
+            # Xóa bảng Property trước khi ghi dữ liệu mới
+            target = "Property"
+            cursor.execute("DELETE FROM Property;")
+
+        if incremental:
+            stats = incremental_transform(conn, target, data_date, mode)
+            count = stats["inserted"] + stats["updated"]
+            message = (f"Incremental: {stats['inserted']} inserted, {stats['updated']} updated, "
+                       f"{stats['unchanged']} unchanged, {stats['skipped']} skipped (key trùng), "
+                       f"{stats['refreshed']} create_date refreshed")
+            print(message)
+        elif mode == "parallel":
+            # Các process ghi bằng kết nối riêng → DELETE phải commit trước, nếu không sẽ chờ khóa lẫn nhau
+            conn.commit()
+            count = parallel_transform(conn, staging_config, target, data_date, processes, chunk_size)
+        elif mode == "pushdown":
+            # Chuẩn hóa ngay trên server, không kéo dữ liệu về Python
+            count = pushdown_transform(cursor, target, data_date)
+        else:
+            # Lấy dữ liệu gốc từ Property_Temp (phân vùng đúng ngày của file)
+            cursor.execute(f"SELECT t.*, {hash_sql('t')} AS content_hash FROM Property_Temp t "
+                           "WHERE t.data_date = %s ORDER BY t.temp_id;", (data_date,))
+            temp_rows = cursor.fetchall()
+
+            print(f"Fetched {len(temp_rows)} rows from Property_Temp")
+
+            # Chuẩn bị insert
+            insert_sql = f"""
+            INSERT IGNORE INTO {target} (
+                `key`, url, create_date, name, price, area, bedrooms, floors,
+                description, street_width, property_type, street, ward, district,
+                city, old_address, posting_date, content_hash
+            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+            """
+
+            count = 0
+
+            for row in temp_rows:
+                cursor.execute(insert_sql, (
+                    row["key"],
+                    row["url"],
+                    row["create_date"],
+                    row["name"],
+                    parse_price(row["price"]),
+                    parse_area(row["area"]),
+                    parse_int_from_str(row["bedrooms"]),
+                    parse_int_from_str(row["floors"]),
+                    row["description"],
+                    row["street_width"],
+                    row["property_type"],
+                    row["street"],
+                    row["ward"],
+                    row["district"],
+                    row["city"],
+                    row["old_address"],
+                    row["posting_date"],
+                    row["content_hash"]
+                ))
+                count += 1
+
+            print(f"Cache chuẩn hóa: {format_cache_stats()}")
+
+        conn.commit()
+        if swap:
+            publish(cursor, "Property")
+        print(f"Transform completed → {count} rows inserted into Property")
+        return count, message or f"{count} rows ({mode})"
+    finally:
+        cursor.close()
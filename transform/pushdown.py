@@ -0,0 +1,85 @@
+# Transform kiểu "pushdown": chuẩn hóa giá / diện tích / số nguyên bằng biểu thức
+# SQL trong 1 câu INSERT ... SELECT, dữ liệu không rời server.
+# Cần MySQL >= 8.0.17 (REGEXP_SUBSTR, REGEXP_REPLACE, CAST AS DOUBLE).
+#
+# Mỗi biểu thức bám đúng hàm Python tương ứng trong transform/value_parser.py:
+# - so khớp "triệu"/"tỷ" bằng utf8mb4_bin, vì collation mặc định *_ai_ci coi "ty" = "tỷ";
+# - nhánh không đơn vị giữ ký tự số + dấu chấm rồi float(): ¹²³ cũng là isdigit()
+#   nên được giữ lại và làm float() lỗi → 0, chuỗi có nhiều dấu chấm cũng → 0.
+# Chỉ xét chữ số ASCII: chữ số Unicode khác (vd full-width) không có trong dữ liệu crawl.
+# Đối chiếu với bản Python: python transform/verify_pushdown.py [--data-date YYYY-MM-DD]
+
+NUMBER = "'[0-9]+[.]?[0-9]*'"
+FLOAT_LITERAL = "'^([0-9]+[.]?[0-9]*|[.][0-9]+)$'"
+
+# Các cột thô của Property_Temp mà transform dùng (cùng tên bên Property)
+RAW_COLUMNS = [
+    "key", "url", "create_date", "name", "price", "area", "bedrooms", "floors",
+    "description", "street_width", "property_type", "street", "ward", "district",
+    "city", "old_address", "posting_date",
+]
+PROPERTY_COLUMNS = RAW_COLUMNS + ["content_hash"]
+# Cột đưa vào content_hash: bỏ create_date (ngày cào) vì ngày nào cũng đổi, nếu
+# không mọi tin đều thành "updated" mỗi ngày
+HASHED_COLUMNS = [c for c in RAW_COLUMNS if c != "create_date"]
+
+
+def hash_sql(alias="t"):
+    """SHA1 của các cột thô trừ create_date (NULL khác chuỗi rỗng), dùng cho transform incremental"""
+    parts = ", ".join(f"IFNULL({alias}.`{c}`, CHAR(0 USING utf8mb4))" for c in HASHED_COLUMNS)
+    return f"SHA1(CONCAT_WS(CHAR(31 USING utf8mb4), {parts}))"
+
+def price_sql(col):
+    """Biểu thức SQL tương đương parse_price(col)"""
+    low = f"(LOWER(REPLACE({col}, ',', '.')) COLLATE utf8mb4_bin)"
+    first_number = f"COALESCE(CAST(REGEXP_SUBSTR({low}, {NUMBER}) AS DOUBLE), 0)"
+    kept = f"REGEXP_REPLACE({low}, '[^0-9.¹²³]', '')"
+    return f"""(CASE
+        WHEN {col} IS NULL OR CHAR_LENGTH({col}) = 0 THEN 0
+        WHEN INSTR({low}, 'triệu') > 0 THEN {first_number} * 1000000
+        WHEN INSTR({low}, 'tỷ') > 0 THEN {first_number} * 1000000000
+        WHEN {kept} REGEXP {FLOAT_LITERAL} THEN CAST({kept} AS DOUBLE)
+        ELSE 0
+    END)"""
+
+def area_sql(col):
+    """Biểu thức SQL tương đương parse_area(col)"""
+    return f"COALESCE(CAST(REGEXP_SUBSTR(REPLACE({col}, ',', '.'), {NUMBER}) AS DOUBLE), 0)"
+
+def int_sql(col):
+    """Biểu thức SQL tương đương parse_int_from_str(col)"""
+    return f"COALESCE(CAST(REGEXP_SUBSTR({col}, '[0-9]+') AS SIGNED), 0)"
+
+def column_exprs(alias="t", hashed=False):
+    """
+    Biểu thức SQL cho từng cột của Property, đọc từ bảng nguồn có alias.
+    hashed=True: bảng nguồn đã có sẵn cột content_hash (vd transform_delta).
+    """
+    exprs = {c: f"{alias}.`{c}`" for c in RAW_COLUMNS}
+    exprs["price"] = price_sql(f"{alias}.price")
+    exprs["area"] = area_sql(f"{alias}.area")
+    exprs["bedrooms"] = int_sql(f"{alias}.bedrooms")
+    exprs["floors"] = int_sql(f"{alias}.floors")
+    exprs["content_hash"] = f"{alias}.content_hash" if hashed else hash_sql(alias)
+    return exprs
+
+def select_sql():
+    """SELECT trên Property_Temp trả về đúng thứ tự cột PROPERTY_COLUMNS"""
+    exprs = column_exprs("t")
+    cols = ",\n        ".join(exprs[c] for c in PROPERTY_COLUMNS)
+    return f"""
+    SELECT
+        {cols}
+    FROM Property_Temp t
+    WHERE t.data_date = %s
+    ORDER BY t.temp_id
+    """
+
+def pushdown_transform(cursor, target, data_date):
+    """
+    INSERT IGNORE ... SELECT từ phân vùng data_date của Property_Temp vào target.
+    ORDER BY temp_id để key trùng giữ dòng đầu tiên giống vòng lặp Python.
+    """
+    col_sql = ", ".join(f"`{c}`" for c in PROPERTY_COLUMNS)
+    cursor.execute(f"INSERT IGNORE INTO {target} ({col_sql})" + select_sql(), (data_date,))
+    return cursor.rowcount
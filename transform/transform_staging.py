@@ -1,208 +1,74 @@
+import argparse
 import mysql.connector
 import json
-import re
 import os,sys
 from dotenv import load_dotenv
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ROOT_DIR)
 from template.notification import send_error_email
+from template.control_log import get_control_log
+from transform.partition import transform_partition
 
 #Chạy gửi mail báo lỗi tại local
 env_path = os.path.join(os.path.dirname(__file__), '.env')
 load_dotenv(env_path)
 
-# ------------------ Load config.json ------------------
-with open("config/config.json", "r", encoding="utf-8") as f:
-    cfg = json.load(f)
+# Code chạy đặt trong __main__: --mode parallel dùng spawn, process con import lại
+# script chính và không được chạy lại transform
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transform Property_Temp → Property")
+    parser.add_argument("--swap", action="store_true",
+                        help="Ghi vào Property_next rồi publish bằng RENAME TABLE (bản cũ giữ ở Property_old)")
+    parser.add_argument("--mode", choices=["python", "pushdown", "parallel"], default="python",
+                        help="python: chuẩn hóa từng dòng bằng Python; pushdown: 1 câu INSERT ... SELECT trên MySQL; "
+                             "parallel: chia dải temp_id cho nhiều process (nên dùng kèm --swap)")
+    parser.add_argument("--processes", type=int, default=None, help="Số process cho --mode parallel (mặc định: số core)")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Số temp_id mỗi dải cho --mode parallel")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Chỉ transform key mới hoặc có nội dung đổi (so content_hash), không xóa Property "
+                             "(--mode parallel dùng cách python cho phần delta)")
+    args = parser.parse_args()
+
+    # ------------------ Load config.json ------------------
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+
+    staging_config = cfg["staging"]
+    control_log = get_control_log()
+
+    # ------------------ RUN TRANSFORM ------------------
+    file_info = control_log.next_file(("ST", "TF"))
+
+    if not file_info:
+        print("Không có file nào cần transform (ST/TF).")
+        exit()
+
+    file_id = file_info["file_id"]
+    print(f"Transforming file_id = {file_id}")
+
+    # Ghi log bắt đầu
+    process_id = control_log.start_process("Transform Data", file_id)
 
-staging_config = cfg["staging"]
-control_config = cfg["control"]
-
-#Hàm ghi log vào bảng process_log và file_log
-def start_process_log(process_name, file_id):
-    """Insert log bắt đầu (PS)"""
-    conn = mysql.connector.connect(**control_config)
-    cursor = conn.cursor()
-    sql = """
-        INSERT INTO process_log (file_id, process_name, status, started_at)
-        VALUES (%s, %s, 'PS', NOW())
-    """
-    cursor.execute(sql, (file_id, process_name))
-    conn.commit()
-    process_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
-    return process_id
-
-
-def success_process_log(process_id):
-    """Cập nhật SC"""
-    conn = mysql.connector.connect(**control_config)
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE process_log 
-        SET status='SC', updated_at=NOW()
-        WHERE process_id=%s
-    """, (process_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-
-def failed_process_log(process_id, error_msg):
-    """Cập nhật FL"""
-    conn = mysql.connector.connect(**control_config)
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE process_log 
-        SET status='FL', updated_at=NOW()
-        WHERE process_id=%s
-    """, (process_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-
-def update_file_log_status(file_id, status):
-    conn = mysql.connector.connect(**control_config)
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE file_log
-        SET status=%s, updated_at=NOW()
-        WHERE file_id=%s
-    """, (status, file_id))
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-
-
-# ------------------ Hàm chuẩn hóa ------------------
-def parse_price(price_str):
-    if not price_str:
-        return 0.0
-    price_str = price_str.lower().replace(',', '.').strip()
-    try:
-        if "triệu" in price_str:
-            number = float(re.findall(r"\d+\.?\d*", price_str)[0])
-            return number * 1_000_000
-        elif "tỷ" in price_str:
-            number = float(re.findall(r"\d+\.?\d*", price_str)[0])
-            return number * 1_000_000_000
-        else:
-            cleaned = "".join(c for c in price_str if c.isdigit() or c == ".")
-            return float(cleaned)
-    except:
-        return 0.0
-
-def parse_area(area_str):
-    if not area_str:
-        return 0.0
-    area_str = area_str.lower().replace(",", ".").strip()
     try:
-        return float(re.findall(r"\d+\.?\d*", area_str)[0])
-    except:
-        return 0.0
-
-def parse_int_from_str(value_str):
-    if not value_str:
-        return 0
-    match = re.search(r"\d+", value_str)
-    return int(match.group()) if match else 0
-
-
-# ------------------ RUN TRANSFORM ------------------
-# 
-def get_transform_file():
-    conn = mysql.connector.connect(**control_config)
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("""
-        SELECT * FROM file_log 
-        WHERE status IN ('ST', 'TF')
-        ORDER BY file_id ASC
-        LIMIT 1;
-    """)
-
-    row = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    return row
-
-
-file_info = get_transform_file()
-
-if not file_info:
-    print("Không có file nào cần transform (ST/TF).")
-    exit()
-
-file_id = file_info["file_id"]
-print(f"Transforming file_id = {file_id}")
-
-# Ghi log bắt đầu
-process_id = start_process_log("Transform Data", file_id)
-
-try:
-    # Thực hiện transform
-    conn = mysql.connector.connect(**staging_config)
-    cursor = conn.cursor(dictionary=True)
-
-    # Lấy dữ liệu gốc từ Property_Temp
-    cursor.execute("SELECT * FROM Property_Temp;")
-    temp_rows = cursor.fetchall()
-
-    print(f"Fetched {len(temp_rows)} rows from Property_Temp")
-
-    # Xóa bảng Property trước khi ghi dữ liệu mới
-    cursor.execute("DELETE FROM Property;")
-
-    # Chuẩn bị insert
-    insert_sql = """
-    INSERT IGNORE INTO Property (
-        `key`, url, create_date, name, price, area, bedrooms, floors,
-        description, street_width, property_type, street, ward, district,
-        city, old_address, posting_date
-    ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-    """
-
-    count = 0
-
-    for row in temp_rows:
-        cursor.execute(insert_sql, (
-            row["key"],
-            row["url"],
-            row["create_date"],
-            row["name"],
-            parse_price(row["price"]),
-            parse_area(row["area"]),
-            parse_int_from_str(row["bedrooms"]),
-            parse_int_from_str(row["floors"]),
-            row["description"],
-            row["street_width"],
-            row["property_type"],
-            row["street"],
-            row["ward"],
-            row["district"],
-            row["city"],
-            row["old_address"],
-            row["posting_date"]
-        ))
-        count += 1
-
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-    print(f"Transform completed → {count} rows inserted into Property")
-
-# ====== LOG SUCCESS ======
-    update_file_log_status(file_id, "TR")
-    success_process_log(process_id)
-
-except Exception as e:
-    print("Transform Failed:", e)
-
-    # ====== LOG FAILED ======
-    update_file_log_status(file_id, "TF")
-    failed_process_log(process_id, str(e))    
+        # Thực hiện transform
+        conn = mysql.connector.connect(**staging_config)
+        try:
+            count, message = transform_partition(conn, staging_config, file_info["data_date"], args.mode,
+                                                 args.swap, args.incremental, args.processes, args.chunk_size)
+        finally:
+            conn.close()
+
+    # ====== LOG SUCCESS ======
+        control_log.update_file_status(file_id, "TR")
+        control_log.process_success(process_id, message=message)
+
+    except Exception as e:
+        print("Transform Failed:", e)
+
+        # ====== LOG FAILED ======
+        control_log.update_file_status(file_id, "TF")
+        control_log.process_fail(process_id, str(e))
+
+    finally:
+        control_log.flush()
@@ -0,0 +1,87 @@
+import os
+import re
+from functools import lru_cache
+
+# Chuẩn hóa giá / diện tích / số nguyên dùng chung cho các bước transform.
+# Giá trị thô lặp lại rất nhiều ("3,5 tỷ", "850 triệu", "60 m²"...) nên mỗi hàm
+# được memo theo chuỗi gốc (LRU có giới hạn), pattern compile 1 lần khi import.
+
+CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "65536"))
+
+_NUMBER = re.compile(r"\d+\.?\d*")
+_INTEGER = re.compile(r"\d+")
+
+
+# ------------------ Hàm chuẩn hóa ------------------
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_price(price_str):
+    if not price_str:
+        return 0.0
+    price_str = price_str.lower().replace(',', '.').strip()
+    try:
+        if "triệu" in price_str:
+            number = float(_NUMBER.search(price_str).group())
+            return number * 1_000_000
+        elif "tỷ" in price_str:
+            number = float(_NUMBER.search(price_str).group())
+            return number * 1_000_000_000
+        else:
+            cleaned = "".join(c for c in price_str if c.isdigit() or c == ".")
+            return float(cleaned)
+    except:
+        return 0.0
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_area(area_str):
+    if not area_str:
+        return 0.0
+    area_str = area_str.lower().replace(",", ".").strip()
+    try:
+        return float(_NUMBER.search(area_str).group())
+    except:
+        return 0.0
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_int_from_str(value_str):
+    if not value_str:
+        return 0
+    match = _INTEGER.search(value_str)
+    return int(match.group()) if match else 0
+
+
+# ------------------ Theo lô (list / Series) ------------------
+def parse_many(func, values):
+    """Áp func lên list hoặc pandas Series, mỗi giá trị khác nhau chỉ tính 1 lần"""
+    lookup = {v: func(v) for v in set(values)}
+    if hasattr(values, "map"):
+        return values.map(lookup)
+    return [lookup[v] for v in values]
+
+def parse_prices(values):
+    return parse_many(parse_price, values)
+
+def parse_areas(values):
+    return parse_many(parse_area, values)
+
+def parse_ints(values):
+    return parse_many(parse_int_from_str, values)
+
+
+# ------------------ Thống kê cache ------------------
+PARSERS = (parse_price, parse_area, parse_int_from_str)
+
+def cache_stats():
+    """{tên hàm: {hits, misses, maxsize, currsize}}"""
+    return {f.__wrapped__.__name__: f.cache_info()._asdict() for f in PARSERS}
+
+def format_cache_stats():
+    parts = []
+    for name, info in cache_stats().items():
+        calls = info["hits"] + info["misses"]
+        rate = info["hits"] / calls if calls else 0.0
+        parts.append(f"{name}: {info['hits']}/{calls} hit ({rate:.0%}), {info['currsize']} giá trị")
+    return "; ".join(parts)
+
+def clear_caches():
+    for f in PARSERS:
+        f.cache_clear()
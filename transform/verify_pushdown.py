@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import sys
+
+import mysql.connector
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from transform.value_parser import parse_price, parse_area, parse_int_from_str
+from transform.pushdown import PROPERTY_COLUMNS, price_sql, area_sql, int_sql, hash_sql, pushdown_transform
+
+# Đối chiếu transform pushdown (SQL) với bản Python:
+# 1. Từng giá trị: mọi chuỗi price/area/bedrooms/floors khác nhau trong Property_Temp
+#    + các ca khó, chạy qua biểu thức SQL và hàm Python rồi so sánh.
+# 2. End-to-end (--data-date): transform 1 phân vùng bằng cả 2 cách vào 2 bảng tạm, so từng dòng.
+
+EDGE_CASES = [
+    None, "", " ", "N/A", "Thỏa thuận", "3,5 tỷ", "3.5 Tỷ", "850 triệu", "850 TRIỆU", "1.200 triệu",
+    "2 ty", "2 trieu", "tỷ", "triệu/m²", "12000000", "12.000.000", "12,000,000 đ", ".5", "5.",
+    ".", "60 m²", "60m2", "2²", "1.5.2", "120 triệu/tháng", "giá 4 tỷ 500 triệu", "3 PN", "00012",
+    "-5", "1e3", "Lộ giới 8m", "mặt tiền 4,5m",
+]
+
+
+def probe_values(cursor, values):
+    """Chạy 4 biểu thức SQL trên 1 bảng tạm chứa values, trả về {id: (price, area, int)}"""
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS pushdown_probe")
+    cursor.execute("""
+        CREATE TEMPORARY TABLE pushdown_probe (id INT PRIMARY KEY, v TEXT)
+        DEFAULT CHARSET=utf8mb4
+    """)
+    cursor.executemany("INSERT INTO pushdown_probe (id, v) VALUES (%s, %s)", list(enumerate(values)))
+    cursor.execute(f"SELECT id, {price_sql('v')}, {area_sql('v')}, {int_sql('v')} FROM pushdown_probe")
+    return {row[0]: row[1:] for row in cursor.fetchall()}
+
+def check_values(cursor, data_date=None):
+    where = "WHERE data_date = %s" if data_date else ""
+    params = (data_date,) if data_date else ()
+    values = set(EDGE_CASES)
+    for col in ("price", "area", "bedrooms", "floors"):
+        cursor.execute(f"SELECT DISTINCT {col} FROM Property_Temp {where}", params)
+        values.update(r[0] for r in cursor.fetchall())
+    values = sorted(values, key=lambda v: (v is None, v or ""))
+
+    sql = probe_values(cursor, values)
+    mismatches = []
+    for i, v in enumerate(values):
+        expected = (parse_price(v), parse_area(v), parse_int_from_str(v))
+        got = tuple(float(x) if j < 2 else int(x) for j, x in enumerate(sql[i]))
+        if got != expected:
+            mismatches.append((v, expected, got))
+    print(f"So {len(values)} giá trị khác nhau: {len(mismatches)} khác biệt")
+    for v, expected, got in mismatches[:50]:
+        print(f"  {v!r}: python={expected} sql={got}")
+    return not mismatches
+
+def check_end_to_end(cursor, data_date):
+    cols = ", ".join(f"`{c}`" for c in PROPERTY_COLUMNS)
+    for table in ("verify_python", "verify_pushdown"):
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {table}")
+        cursor.execute(f"CREATE TEMPORARY TABLE {table} LIKE Property")
+
+    # Bản Python: giống vòng lặp trong transform_staging.py
+    cursor.execute(f"SELECT t.*, {hash_sql('t')} AS content_hash FROM Property_Temp t "
+                   "WHERE t.data_date = %s ORDER BY t.temp_id", (data_date,))
+    names = [d[0] for d in cursor.description]
+    rows = []
+    for raw in cursor.fetchall():
+        row = dict(zip(names, raw))
+        row["price"] = parse_price(row["price"])
+        row["area"] = parse_area(row["area"])
+        row["bedrooms"] = parse_int_from_str(row["bedrooms"])
+        row["floors"] = parse_int_from_str(row["floors"])
+        rows.append(tuple(row[c] for c in PROPERTY_COLUMNS))
+    placeholders = ", ".join(["%s"] * len(PROPERTY_COLUMNS))
+    for row in rows:
+        cursor.execute(f"INSERT IGNORE INTO verify_python ({cols}) VALUES ({placeholders})", row)
+
+    pushdown_transform(cursor, "verify_pushdown", data_date)
+
+    results = []
+    for table in ("verify_python", "verify_pushdown"):
+        cursor.execute(f"SELECT {cols} FROM {table} ORDER BY `key`")
+        results.append(cursor.fetchall())
+    python_rows, sql_rows = results
+    diff = [(a, b) for a, b in zip(python_rows, sql_rows) if a != b]
+    same = len(python_rows) == len(sql_rows) and not diff
+    print(f"End-to-end {data_date}: python={len(python_rows)} dòng, pushdown={len(sql_rows)} dòng, "
+          f"{len(diff)} dòng khác")
+    for a, b in diff[:10]:
+        print(f"  python={a}\n  sql   ={b}")
+    return same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Đối chiếu transform pushdown với bản Python")
+    parser.add_argument("--data-date", help="Phân vùng Property_Temp cần so end-to-end (bỏ trống: chỉ so giá trị)")
+    args = parser.parse_args()
+
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        staging_config = json.load(f)["staging"]
+    conn = mysql.connector.connect(**staging_config)
+    cursor = conn.cursor()
+    try:
+        ok = check_values(cursor, args.data_date)
+        if args.data_date:
+            ok = check_end_to_end(cursor, args.data_date) and ok
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+    print("KHỚP" if ok else "KHÔNG KHỚP")
+    sys.exit(0 if ok else 1)